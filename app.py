@@ -1,88 +1,110 @@
 from fastapi import FastAPI, Request, Form
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse, JSONResponse
+from urllib.parse import quote
+import asyncio
+import base64
+import json
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import uvicorn
 import os
-import threading
-import cloudinary
-import cloudinary.uploader
-from backend.database import get_events_for_roll, update_cert_url, init_db
-from backend.certificate import generate_local_certificate
-from backend.sync import sync_data
+from backend.database import update_cert_url, get_cert_url_by_fingerprint, init_db
+from backend.lookup_cache import get_events_cached, roll_cache
+from backend.http_cache import etag_for, etag_matches, not_modified, file_hash, REVALIDATE, IMMUTABLE
+from backend.certificate import render_fingerprint
+from backend.events import describe_event
+from backend.cert_store import get_certificate_store
+from backend.workers import start_pools, shutdown_pools, render_certificate, store_certificate, schedule_replication
+from backend.singleflight import generate_once
+from backend.sync_jobs import trigger_sync, sync_status
+from backend.sync_scheduler import start_scheduler, stop_scheduler
 
 app = FastAPI()
 
 # Config
 templates = Jinja2Templates(directory="templates")
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Part of every /verify ETag, so a template change on deploy invalidates cached pages
+VERIFY_TEMPLATE_TAG = file_hash(os.path.join(BASE_DIR, "templates", "verify.html"))
 
-# Cloudinary
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET"),
-    secure=True
-)
+# Certificate storage (Cloudinary or local files served at /c/, see backend/cert_store.py)
+cert_store = get_certificate_store()
+local_store = get_certificate_store("local")
 
 # Startup
 @app.on_event("startup")
 def startup():
-    if not os.path.exists("backend/generated"):
-        os.makedirs("backend/generated")
     init_db()
-    # Optional: Auto-sync on startup (can slow down boot, but good for MVP)
-    # threading.Thread(target=sync_data).start()
+    # Warm render processes (each decodes the template once) + upload threads
+    start_pools()
+
+@app.on_event("startup")
+async def start_periodic_sync():
+    # Incremental syncs in the background (first one after a delay, not at boot)
+    start_scheduler()
+
+@app.on_event("shutdown")
+async def stop_periodic_sync():
+    await stop_scheduler()
+
+@app.on_event("shutdown")
+def shutdown():
+    shutdown_pools()
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
-@app.post("/verify", response_class=HTMLResponse)
-async def verify(request: Request, roll_no: str = Form(...)):
+@app.get("/verify", response_class=HTMLResponse)
+async def verify(request: Request, roll_no: str = ""):
     roll_no = roll_no.strip().upper()
-    events = get_events_for_roll(roll_no)
-    
-    # Filter cleaning - exclude blocked participants
-    clean_events = []
-    for e in events:
-        # Skip blocked participants
-        if e.get("blocked") == 1:
-            continue
-        # Simplify display name
-        if "CHILL" in e["event"].upper():
-            d_name = "MINDSPRINT"
-        else:
-            d_name = e["event"].replace("MARKUS 2K26 - ", "").replace("(Responses)", "").strip()
-        e["display_name"] = d_name
-        clean_events.append(e)
-        
-    return templates.TemplateResponse("verify.html", {"request": request, "events": clean_events, "roll_no": roll_no})
+    if not roll_no:
+        return RedirectResponse("/", status_code=302)
+    events = get_events_cached(roll_no)
+    
+    # Exclude blocked participants (display names come from the events table)
+    clean_events = [e for e in events if e.get("blocked") != 1]
+    
+    # Same records (at the current data version) -> same page -> 304 on refresh
+    etag = etag_for(VERIFY_TEMPLATE_TAG, roll_no, clean_events)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    response = templates.TemplateResponse("verify.html", {"request": request, "events": clean_events, "roll_no": roll_no})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE
+    return response
+
+@app.post("/verify")
+async def verify_form(roll_no: str = Form(...)):
+    """Old POST form: redirect to the cacheable GET page"""
+    return RedirectResponse(f"/verify?roll_no={quote(roll_no.strip().upper())}", status_code=303)
+
+def find_event_record(roll_no, event_id):
+    """
+    The roll's record for an event, from the same cached lookup /verify made.
+    event_id is the event slug; links shared before slugs carry the event
+    name ("TECHNICAL QUIZ"), which maps to the same slug.
+    """
+    events = get_events_cached(roll_no)
+    record = next((e for e in events if e["event_slug"] == event_id), None)
+    if record is None:
+        slug = describe_event(event_id)[0]
+        record = next((e for e in events if e["event_slug"] == slug), None)
+    return record
 
 @app.get("/generate_cert")
 async def generate(request: Request, roll_no: str, event_id: str):
-    from backend.database import is_participant_blocked
-    
     # Sanitize inputs
     roll_no = roll_no.strip().upper()
     
-    # Fetch record from DB
-    events = get_events_for_roll(roll_no)
-    record = next((e for e in events if e["event"] == event_id), None)
-    
-    if not record:
-        # Fallback: Check if event_id is 'MINDSPRINT' but DB has 'CHILL & SKILL' or vice versa
-        # This handles transitional state if DB Sync logic changed
-        if event_id.upper() == "MINDSPRINT":
-            record = next((e for e in events if "CHILL" in e["event"].upper()), None)
-        elif "CHILL" in event_id.upper():
-            record = next((e for e in events if e["event"] == "MINDSPRINT"), None)
+    record = find_event_record(roll_no, event_id)
 
     if not record:
         return HTMLResponse(f"Record not found for {roll_no} - {event_id}", status_code=404)
     
     # Check if blocked by admin
-    if record.get("blocked") == 1 or is_participant_blocked(roll_no, event_id):
+    if record.get("blocked") == 1:
         return HTMLResponse("Certificate generation is disabled for this participant.", status_code=403)
         
     if record["cert_url"]:
@@ -90,31 +112,32 @@ async def generate(request: Request, roll_no: str, event_id: str):
         
     # Generate certificate
     try:
-        # Clean event name for display on certificate
-        # Replace Chill and Skill with Mindsprint
-        raw_event = record["event"]
-        if "CHILL" in raw_event.upper() and "SKILL" in raw_event.upper():
-            clean_event_name = "MINDSPRINT"
-        elif "MINDSPRINT" in raw_event.upper():
-            clean_event_name = "MINDSPRINT"
-        else:
-            clean_event_name = raw_event.replace("(Responses)", "").replace("MARKUS 2K26 - ", "").replace("MARKUS ", "").strip()
-        
-        local_path = generate_local_certificate(
-            name=record["name"], 
-            year=record["year"], 
-            event=clean_event_name, 
-            roll_no=roll_no,
-            department=record.get("department", "")
-        )
+        async def produce():
+            fingerprint = render_fingerprint(record["name"], record["year"], record["cert_label"],
+                                             record.get("department") or "")
+            # Identical text + template already rendered and uploaded: reuse that certificate
+            url = get_cert_url_by_fingerprint(fingerprint)
+            if not url:
+                # Rendered straight into memory; the PNG bytes go to the store as-is
+                png = await render_certificate(
+                    name=record["name"], 
+                    year=record["year"], 
+                    event=record["cert_label"], 
+                    department=record.get("department", "")
+                )
+                
+                # Upload to Cloudinary / write to the local store
+                print(f"Storing {roll_no} / {record['event']} ({len(png) // 1024} KB, {cert_store.name})...")
+                url = await store_certificate(png)
+            
+            # Update DB with certificate URL and what it was rendered from (a write: off the event loop)
+            await asyncio.to_thread(update_cert_url, roll_no, record["event"], url, fingerprint)
+            # Local certificate is served right away; the CDN copy (if enabled) replaces it later
+            schedule_replication(url, fingerprint)
+            return url
         
-        # Upload to Cloudinary
-        print(f"Uploading {local_path}...")
-        res = cloudinary.uploader.upload(local_path, folder="markus_certs")
-        url = res.get("secure_url")
-        
-        # Update DB with certificate URL
-        update_cert_url(roll_no, event_id, url)
+        # Concurrent requests for the same roll/event share a single render + upload
+        url = await generate_once(roll_no, record["event"], produce)
         
         return RedirectResponse(url)
         
@@ -124,14 +147,34 @@ async def generate(request: Request, roll_no: str, event_id: str):
         traceback.print_exc()
         return HTMLResponse(f"Error generating certificate: {e}", status_code=500)
 
+@app.get("/c/{digest}.png")
+async def stored_certificate(request: Request, digest: str):
+    """Certificates in the local store: content-addressed, so cacheable forever"""
+    path = local_store.path_for(digest)
+    if path is None or not os.path.isfile(path):
+        return HTMLResponse("Certificate not found", status_code=404)
+    
+    etag = f'"{digest}"'
+    if etag_matches(request, etag):
+        return not_modified(etag, IMMUTABLE)
+    return FileResponse(path, media_type="image/png", headers={"ETag": etag, "Cache-Control": IMMUTABLE})
+
 @app.get("/sync")
-async def manual_sync():
-    """Admin endpoint to trigger sync"""
-    threading.Thread(target=sync_data).start()
-    return {"status": "Sync started in background"}
+def manual_sync():
+    """Admin endpoint to trigger sync (coalesced into the running one, if any)"""
+    job = trigger_sync("manual")
+    if job["status"] == "started":
+        return {**job, "message": "Sync started in background"}
+    return {**job, "message": "Sync already running; one more run queued after it"}
 
 # ========== ADMIN PORTAL ==========
-from backend.database import get_all_participants, toggle_cert_visibility, bulk_toggle_cert_visibility, get_stats
+from backend.database import toggle_cert_visibility, bulk_toggle_cert_visibility, get_stats, get_participants_page, get_event_counts, search_participants, set_cert_visibility
+from backend.export import export_csv, export_xlsx
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
 
 ADMIN_USERNAME = "Madhan2006p"
 ADMIN_PASSWORD = "iamironman"
@@ -159,14 +202,51 @@ async def admin_dashboard(request: Request):
     if not is_admin(request):
         return RedirectResponse("/admin/login", status_code=302)
     
-    participants = get_all_participants()
+    # Participant rows are fetched page by page from /admin/api/participants
     stats = get_stats()
     return templates.TemplateResponse("admin_dashboard.html", {
         "request": request,
-        "participants": participants,
         "stats": stats
     })
 
+ADMIN_PAGE_SIZE = 50
+ADMIN_MAX_PAGE_SIZE = 500
+
+def _encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii") if key else None
+
+def _decode_cursor(cursor):
+    key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    if not (isinstance(key, list) and len(key) == 3):
+        raise ValueError("bad cursor")
+    return key
+
+@app.get("/admin/api/participants")
+async def admin_api_participants(request: Request, cursor: str = "", limit: int = ADMIN_PAGE_SIZE,
+                                 event: str = "", department: str = "",
+                                 blocked: bool = None, has_cert: bool = None):
+    """Keyset-paginated participants; pass back `next_cursor` to get the following page"""
+    if not is_admin(request):
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    
+    try:
+        after = _decode_cursor(cursor) if cursor else None
+    except ValueError:
+        return JSONResponse({"error": "Invalid cursor"}, status_code=400)
+    
+    rows, next_key = get_participants_page(
+        after=after, limit=max(1, min(limit, ADMIN_MAX_PAGE_SIZE)),
+        event=event or None, department=department or None, blocked=blocked, has_cert=has_cert
+    )
+    return {"items": rows, "next_cursor": _encode_cursor(next_key)}
+
+@app.get("/admin/api/event-counts")
+async def admin_api_event_counts(request: Request, department: str = "", blocked: bool = None, has_cert: bool = None):
+    if not is_admin(request):
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    
+    return {"events": get_event_counts(department=department or None, blocked=blocked, has_cert=has_cert)}
+
 @app.post("/admin/toggle/{participant_id}")
 async def admin_toggle_cert(request: Request, participant_id: int, visible: bool = True):
     if not is_admin(request):
@@ -183,6 +263,99 @@ async def admin_toggle_all(request: Request, visible: bool = True):
     bulk_toggle_cert_visibility(visible)
     return {"success": True, "visible": visible}
 
+@app.get("/admin/api/search")
+async def admin_api_search(request: Request, q: str = "", limit: int = 20):
+    """Ranked prefix search over roll number, name, department and event"""
+    if not is_admin(request):
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    
+    return {"items": search_participants(q, limit=max(1, min(limit, ADMIN_MAX_PAGE_SIZE)))}
+
+@app.get("/admin/cache-stats")
+async def admin_cache_stats(request: Request):
+    if not is_admin(request):
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    
+    return roll_cache.stats()
+
+class VisibilityChange(BaseModel):
+    visible: bool
+    event: Optional[str] = None        # event slug
+    department: Optional[str] = None
+    year: Optional[str] = None
+    ids: Optional[List[int]] = None
+
+@app.post("/admin/visibility")
+async def admin_set_visibility(request: Request, change: VisibilityChange):
+    """Show/hide certificates for everyone matching the selector (fields combine with AND)"""
+    if not is_admin(request):
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    
+    try:
+        # One UPDATE over possibly thousands of rows: keep it off the event loop
+        changed = await asyncio.to_thread(set_cert_visibility, change.visible, event=change.event,
+                                          department=change.department, year=change.year, ids=change.ids)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return {"success": True, "visible": change.visible, "changed": changed}
+
+def _export_filename(ext, event):
+    return f"participants_{event or 'all'}_{datetime.now():%Y%m%d_%H%M}.{ext}"
+
+@app.get("/admin/export.csv")
+def admin_export_csv(request: Request, event: str = "", department: str = "",
+                     blocked: bool = None, has_cert: bool = None):
+    """Participants + certificate status as CSV, streamed while the query runs"""
+    if not is_admin(request):
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    
+    chunks = export_csv(event=event or None, department=department or None, blocked=blocked, has_cert=has_cert)
+    return StreamingResponse(chunks, media_type="text/csv; charset=utf-8", headers={
+        "Content-Disposition": f'attachment; filename="{_export_filename("csv", event)}"',
+        "Cache-Control": "no-store",
+    })
+
+@app.get("/admin/export.xlsx")
+def admin_export_xlsx(request: Request, event: str = "", department: str = "",
+                      blocked: bool = None, has_cert: bool = None):
+    """Same rows as the CSV export, as a spreadsheet built in constant memory"""
+    if not is_admin(request):
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    
+    path = export_xlsx(event=event or None, department=department or None, blocked=blocked, has_cert=has_cert)
+    return FileResponse(
+        path, filename=_export_filename("xlsx", event),
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Cache-Control": "no-store"},
+        background=BackgroundTask(os.remove, path),
+    )
+
+@app.get("/admin/sync/status")
+def admin_sync_status(request: Request, history: int = 10):
+    """Running sync with per-sheet progress, queued re-run flag and recent run history"""
+    if not is_admin(request):
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    
+    return sync_status(history=max(1, min(history, 50)))
+
+@app.get("/admin/preview_cert")
+async def admin_preview_cert(request: Request, roll_no: str, event_id: str):
+    """Render a participant's certificate as it would look now, streamed from memory (not stored)"""
+    if not is_admin(request):
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+
+    roll_no = roll_no.strip().upper()
+    record = find_event_record(roll_no, event_id)
+    if not record:
+        return JSONResponse({"error": "Record not found"}, status_code=404)
+
+    png = await render_certificate(record["name"], record["year"], record["cert_label"], record.get("department") or "")
+    return StreamingResponse(
+        iter((png,)),
+        media_type="image/png",
+        headers={"Content-Length": str(len(png)), "Cache-Control": "no-store"},
+    )
+
 @app.get("/admin/logout")
 async def admin_logout():
     response = RedirectResponse("/", status_code=302)
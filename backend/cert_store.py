@@ -0,0 +1,139 @@
+"""
+Where finished certificates are stored, and the URL students are sent to.
+
+A CertificateStore takes a rendered PNG (file path or bytes) and returns its
+public URL. CloudinaryStore uploads to the CDN (the original behaviour).
+LocalStore keeps content-addressed files (<sha256>.png) under CERT_STORE_DIR,
+served by the app at /c/<sha256>.png with immutable cache headers, so a
+first hit costs no upload round trip and everything works offline.
+
+CERT_STORE picks the store ("cloudinary" or "local"; default: cloudinary when
+CLOUDINARY_CLOUD_NAME or CLOUDINARY_URL is set, else local). With CERT_STORE=local and
+CERT_REPLICATE_TO_CDN=1, certificates are served locally straight away and
+copied to Cloudinary in the background (see workers.schedule_replication);
+copies that fail are retried by the next pregenerate run.
+"""
+
+import hashlib
+import os
+import re
+import threading
+
+import cloudinary
+import cloudinary.uploader
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CERT_STORE = os.getenv("CERT_STORE") or (
+    "cloudinary" if os.getenv("CLOUDINARY_CLOUD_NAME") or os.getenv("CLOUDINARY_URL") else "local"
+)
+CERT_STORE_DIR = os.getenv("CERT_STORE_DIR", os.path.join(BASE_DIR, "certificates"))
+# Prefix for local certificate URLs (e.g. https://certs.example.com); relative by default
+CERT_PUBLIC_BASE = os.getenv("CERT_PUBLIC_BASE", "").rstrip("/")
+CERT_REPLICATE_TO_CDN = os.getenv("CERT_REPLICATE_TO_CDN", "0") == "1"
+UPLOAD_FOLDER = "markus_certs"
+
+LOCAL_URL_PATH = "/c/"
+_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _read(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    with open(source, "rb") as f:
+        return f.read()
+
+
+class CertificateStore:
+    """Base interface: put(source) -> public URL, where source is a PNG file path or PNG bytes"""
+
+    name = None
+
+    def put(self, source):
+        raise NotImplementedError
+
+
+class CloudinaryStore(CertificateStore):
+    name = "cloudinary"
+
+    def __init__(self, folder=UPLOAD_FOLDER):
+        self.folder = folder
+        if os.getenv("CLOUDINARY_CLOUD_NAME"):
+            cloudinary.config(
+                cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
+                api_key=os.getenv("CLOUDINARY_API_KEY"),
+                api_secret=os.getenv("CLOUDINARY_API_SECRET"),
+                secure=True
+            )
+
+    def put(self, source):
+        if isinstance(source, (bytearray, memoryview)):
+            source = bytes(source)
+        res = cloudinary.uploader.upload(source, folder=self.folder)
+        return res.get("secure_url")
+
+
+class LocalStore(CertificateStore):
+    """
+    Content-addressed files: the name is the sha256 of the PNG, so a stored
+    file never changes and identical certificates are stored once.
+    """
+
+    name = "local"
+
+    def __init__(self, directory=CERT_STORE_DIR, public_base=CERT_PUBLIC_BASE):
+        self.directory = directory
+        self.public_base = public_base
+
+    def path_for(self, digest):
+        """Stored file for a digest, or None for anything that is not a digest"""
+        if not _DIGEST.match(digest):
+            return None
+        return os.path.join(self.directory, f"{digest}.png")
+
+    @property
+    def url_prefix(self):
+        """Every URL this store hands out starts with this"""
+        return f"{self.public_base}{LOCAL_URL_PATH}"
+
+    def url_for(self, digest):
+        return f"{self.url_prefix}{digest}.png"
+
+    def digest_from_url(self, url):
+        """Digest of a URL this store handed out, else None"""
+        prefix = self.url_prefix
+        if not url or not url.startswith(prefix) or not url.endswith(".png"):
+            return None
+        digest = url[len(prefix):-len(".png")]
+        return digest if _DIGEST.match(digest) else None
+
+    def put(self, source):
+        data = _read(source)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        if not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            # Write then rename: the file is either absent or complete
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return self.url_for(digest)
+
+
+STORES = {"cloudinary": CloudinaryStore, "local": LocalStore}
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_certificate_store(name=None):
+    """Shared store instance for `name` (default: CERT_STORE)"""
+    name = name or CERT_STORE
+    store = _stores.get(name)
+    if store is None:
+        if name not in STORES:
+            raise ValueError(f"Unknown CERT_STORE '{name}' (expected one of {', '.join(STORES)})")
+        with _stores_lock:
+            store = _stores.get(name)
+            if store is None:
+                store = _stores[name] = STORES[name]()
+    return store
@@ -0,0 +1,50 @@
+"""
+Certificate versioning by render fingerprint.
+
+Every stored certificate records the fingerprint it was rendered from (see
+CertificateRenderer.fingerprint: template, font and the exact drawn text).
+invalidate_stale_certificates() recomputes the fingerprint of each stored
+certificate and clears only those that no longer match - a corrected name, a
+changed event label, or (for all of them) a new template - so the next
+/generate_cert or pregenerate run renders exactly those again.
+"""
+
+from backend.certificate import get_renderer
+from backend.database import get_rendered_certificates, set_cert_fingerprints, invalidate_certificates
+
+
+def invalidate_stale_certificates(event=None, dry_run=False):
+    """
+    Clear certificates whose current render fingerprint differs from the stored one.
+    Certificates stored before fingerprints existed are assumed current and
+    adopt today's fingerprint. Returns {"checked", "stale", "stale_blocked",
+    "adopted"}; stale_blocked counts the stale rows that are hidden, which are
+    cleared too but not re-rendered until they are shown again.
+    """
+    renderer = get_renderer()
+    try:
+        renderer.assets_hash()
+    except OSError as e:
+        # Without the template nothing can be compared; never clear on a guess
+        print(f"   ⚠️ Certificate version check skipped: {e}")
+        return {"checked": 0, "stale": 0, "stale_blocked": 0, "adopted": 0}
+
+    stale, adopt = [], []
+    stale_blocked = 0
+    rows = get_rendered_certificates(event)
+    for row in rows:
+        fingerprint = renderer.fingerprint(row["name"], row["year"], row["cert_label"], row["department"] or "")
+        if row["cert_fingerprint"] is None:
+            adopt.append((row["id"], fingerprint))
+        elif row["cert_fingerprint"] != fingerprint:
+            stale.append(row["id"])
+            stale_blocked += row["blocked"]
+
+    if not dry_run:
+        if adopt:
+            set_cert_fingerprints(adopt)
+        if stale:
+            invalidate_certificates(stale)
+    if stale:
+        print(f"♻️ {len(stale)} certificate(s) out of date" + (" (dry run)" if dry_run else ", cleared for re-render"))
+    return {"checked": len(rows), "stale": len(stale), "stale_blocked": stale_blocked, "adopted": len(adopt)}
@@ -1,5 +1,8 @@
 from PIL import Image, ImageDraw, ImageFont
+import hashlib
+import io
 import os
+import threading
 
 # Coordinates from request
 # Name: (767, 1184) Left-Middle
@@ -14,66 +17,179 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 TEMPLATE_PATH = os.path.join(BASE_DIR, "Participation.png")
 # We assume a fonts folder exists, or we use default
 FONT_PATH = os.path.join(BASE_DIR, "fonts", "DejaVuSans-Bold.ttf")
+OUTPUT_DIR = os.path.join(BASE_DIR, "generated")
 
-def generate_local_certificate(name, year, event, roll_no, department=""):
-    if not os.path.exists(TEMPLATE_PATH):
-        raise FileNotFoundError(f"Template not found: {TEMPLATE_PATH}")
-
-    img = Image.open(TEMPLATE_PATH)
-    draw = ImageDraw.Draw(img)
-
-    # Load Fonts - try multiple options
-    font_large = None
-    font_small = None
-    
-    # List of fonts to try (in order of preference)
-    font_paths = [
-        os.path.join(BASE_DIR, "fonts", "DejaVuSans-Bold.ttf"),
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",  # Linux/Render
-        "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
-        "/usr/share/fonts/TTF/DejaVuSans-Bold.ttf",
-        "C:/Windows/Fonts/arial.ttf",  # Windows fallback
-        "C:/Windows/Fonts/arialbd.ttf",
-    ]
-    
-    for fp in font_paths:
-        if os.path.exists(fp):
-            try:
-                font_large = ImageFont.truetype(fp, 45)
-                font_small = ImageFont.truetype(fp, 35)
-                print(f"Using font: {fp}")
-                break
-            except Exception as e:
-                print(f"Failed to load {fp}: {e}")
-                continue
-    
-    if not font_large:
-        print("WARNING: No custom font found, using default (may be tiny)")
-        font_large = ImageFont.load_default()
-        font_small = ImageFont.load_default()
+# List of fonts to try (in order of preference)
+FONT_PATHS = [
+    FONT_PATH,
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",  # Linux/Render
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans-Bold.ttf",
+    "C:/Windows/Fonts/arial.ttf",  # Windows fallback
+    "C:/Windows/Fonts/arialbd.ttf",
+]
+
+ROMAN_YEARS = {"1": "I", "2": "II", "3": "III", "4": "IV"}
+FONT_SIZE_LARGE = 45
+FONT_SIZE_SMALL = 35
+
+# Bump when render() changes in a way the template/font/text hashes cannot see
+RENDER_VERSION = 1
 
+
+def certificate_texts(name, year, event, department=""):
+    """The exact (name, department/year, event) strings render() draws"""
     # Convert Year to Roman if numeric
-    roman_map = {"1": "I", "2": "II", "3": "III", "4": "IV"}
     clean_year = str(year).strip()
-    year_roman = roman_map.get(clean_year, clean_year)
+    year_roman = ROMAN_YEARS.get(clean_year, clean_year)
 
     # Format: "Department Year" (e.g., "CSE III Year")
     dept_year_text = f"{department} {year_roman} Year" if department else f"{year_roman} Year"
+    return str(name).upper(), dept_year_text.upper(), str(event).upper()
+
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class CertificateRenderer:
+    """
+    Holds the decoded certificate template and resolved fonts for the lifetime
+    of the process. Each render draws on a copy of the decoded base image, so
+    the PNG decode and font lookup are paid once instead of per certificate.
+    """
+
+    def __init__(self, template_path=TEMPLATE_PATH, font_paths=None):
+        self.template_path = template_path
+        self.font_paths = list(font_paths) if font_paths is not None else list(FONT_PATHS)
+        self.font_path = None
+        self._base = None
+        self._font_large = None
+        self._font_small = None
+        self._assets_hash = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._base is not None
+
+    def load(self):
+        """Decode the template and resolve fonts (no-op once loaded)"""
+        if self._base is not None:
+            return self
+        with self._lock:
+            if self._base is not None:
+                return self
+
+            if not os.path.exists(self.template_path):
+                raise FileNotFoundError(f"Template not found: {self.template_path}")
+
+            with Image.open(self.template_path) as src:
+                src.load()
+                base = src.copy()
+
+            self._load_fonts()
+            self._base = base
+        return self
+
+    def _load_fonts(self):
+        for fp in self.font_paths:
+            if os.path.exists(fp):
+                try:
+                    self._font_large = ImageFont.truetype(fp, FONT_SIZE_LARGE)
+                    self._font_small = ImageFont.truetype(fp, FONT_SIZE_SMALL)
+                    self.font_path = fp
+                    print(f"Using font: {fp}")
+                    return
+                except Exception as e:
+                    print(f"Failed to load {fp}: {e}")
+                    continue
 
-    # Draw Text
-    # Anchor 'lm' = Left Middle
-    draw.text(COORD_NAME, str(name).upper(), fill="black", font=font_large, anchor="lm")
-    draw.text(COORD_YEAR, dept_year_text.upper(), fill="black", font=font_small, anchor="lm")
-    draw.text(COORD_EVENT, str(event).upper(), fill="black", font=font_small, anchor="lm")
-
-    # Footer text removed as requested
-
-    # Output
-    out_dir = os.path.join(BASE_DIR, "generated")
-    os.makedirs(out_dir, exist_ok=True)
-    
-    filename = f"{roll_no}_{event.replace(' ', '_').replace('/', '_')}.png"
-    filepath = os.path.join(out_dir, filename)
-    
-    img.save(filepath)
-    return filepath
+        print("WARNING: No custom font found, using default (may be tiny)")
+        self._font_large = ImageFont.load_default()
+        self._font_small = ImageFont.load_default()
+
+    def assets_hash(self):
+        """
+        Hash of everything a render depends on besides its text: template bytes,
+        the font actually used, sizes, coordinates and RENDER_VERSION. Computed
+        once per renderer (without decoding the template).
+        """
+        if self._assets_hash is not None:
+            return self._assets_hash
+        with self._lock:
+            if self._assets_hash is None:
+                if self._font_large is None:
+                    self._load_fonts()
+                parts = [
+                    RENDER_VERSION, _sha256_file(self.template_path),
+                    _sha256_file(self.font_path) if self.font_path else "default-font",
+                    FONT_SIZE_LARGE, FONT_SIZE_SMALL, COORD_NAME, COORD_YEAR, COORD_EVENT,
+                ]
+                self._assets_hash = hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+        return self._assets_hash
+
+    def fingerprint(self, name, year, event, department=""):
+        """Render fingerprint: equal fingerprints produce identical certificates"""
+        texts = certificate_texts(name, year, event, department)
+        return hashlib.sha256("\x1f".join((self.assets_hash(),) + texts).encode("utf-8")).hexdigest()
+
+    def render(self, name, year, event, department=""):
+        """Draw the certificate text onto a fresh copy of the template and return the image"""
+        self.load()
+        img = self._base.copy()
+        draw = ImageDraw.Draw(img)
+        name_text, dept_year_text, event_text = certificate_texts(name, year, event, department)
+
+        # Draw Text
+        # Anchor 'lm' = Left Middle
+        draw.text(COORD_NAME, name_text, fill="black", font=self._font_large, anchor="lm")
+        draw.text(COORD_YEAR, dept_year_text, fill="black", font=self._font_small, anchor="lm")
+        draw.text(COORD_EVENT, event_text, fill="black", font=self._font_small, anchor="lm")
+
+        # Footer text removed as requested
+        return img
+
+    def render_png(self, name, year, event, department=""):
+        """Render and encode to PNG in memory; returns the bytes (nothing touches the disk)"""
+        buf = io.BytesIO()
+        self.render(name, year, event, department).save(buf, format="PNG")
+        return buf.getvalue()
+
+    def generate(self, name, year, event, roll_no, department="", out_dir=OUTPUT_DIR):
+        """
+        Render a certificate and save it as a PNG, returning the file path
+        (for callers that want a file, like cli_generate.py).
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        filename = f"{roll_no}_{event.replace(' ', '_').replace('/', '_')}.png"
+        filepath = os.path.join(out_dir, filename)
+
+        img = self.render(name, year, event, department)
+        # Write then rename, so a reader never picks up a half-written file
+        tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        img.save(tmp_path, format="PNG")
+        os.replace(tmp_path, filepath)
+        return filepath
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+def get_renderer():
+    """Process-wide shared renderer (template/fonts are loaded lazily on first render)"""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = CertificateRenderer()
+    return _renderer
+
+def render_fingerprint(name, year, event, department=""):
+    return get_renderer().fingerprint(name, year, event, department)
+
+def generate_local_certificate(name, year, event, roll_no, department=""):
+    return get_renderer().generate(name, year, event, roll_no, department=department)
@@ -1,12 +1,75 @@
 import sqlite3
 import os
+import re
+import json
+import time
+import threading
+from contextlib import contextmanager
+from backend.events import describe_event
 
 DB_PATH = "participants.db"
 
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
+# participants columns get_events_for_roll() returns (all covered by idx_roll_lookup)
+LOOKUP_COLUMNS = ("id", "roll_no", "name", "department", "year", "event", "event_id", "cert_url",
+                  "blocked", "member_role", "leader_roll_no")
+
+# Connection tuning (see get_connection)
+BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_KB", 16384))
+MMAP_SIZE = int(os.getenv("SQLITE_MMAP_BYTES", 64 * 1024 * 1024))
+
+_local = threading.local()
+
+# Last data version this process wrote (lets an in-process cache notice its own writes immediately)
+local_data_version = 0
+
+def _connect(path, check_same_thread=True):
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=check_same_thread)
+    conn.row_factory = sqlite3.Row
+    # WAL lets /verify readers run while a sync is writing; NORMAL is durable
+    # across app crashes in WAL mode and skips an fsync per commit
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    return conn
+
+def get_connection():
+    """
+    Long-lived connection for the calling thread (opened on first use, reopened
+    if DB_PATH changes). Rows come back as sqlite3.Row.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.path == DB_PATH:
+        return conn
+    if conn is not None:
+        conn.close()
+    _local.conn = conn = _connect(DB_PATH)
+    _local.path = DB_PATH
+    return conn
+
+def close_connection():
+    """Close the calling thread's connection (it is reopened on next use)"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+@contextmanager
+def transaction():
+    """Cursor on the thread's connection; commits on success, rolls back on error"""
+    conn = get_connection()
+    with conn:
+        yield conn.cursor()
+
+def _add_missing_columns(cursor, table, columns):
+    existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+    for name, decl in columns:
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+def _migrate_participants(cursor):
     # Simple flat structure
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS participants (
@@ -25,61 +88,317 @@ def init_db():
             member_position INTEGER DEFAULT 0
         )
     """)
+    # Databases created before versioning may predate the team/blocking columns
+    _add_missing_columns(cursor, "participants", [
+        ("blocked", "INTEGER DEFAULT 0"),
+        ("team_members", "TEXT"),
+        ("member_role", "TEXT DEFAULT 'leader'"),
+        ("leader_roll_no", "TEXT"),
+        ("member_position", "INTEGER DEFAULT 0"),
+    ])
+
+def _migrate_identity_index(cursor):
+    # One record per roll/event/role/leader - this is the upsert key for sync.
+    # Leaders have a NULL leader_roll_no, hence the IFNULL (NULLs never collide in UNIQUE).
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ux_participant_identity'")
+    if not cursor.fetchone():
+        # Older databases may hold duplicates from the pre-upsert sync; keep the oldest
+        cursor.execute("""
+            DELETE FROM participants WHERE id NOT IN (
+                SELECT MIN(id) FROM participants
+                GROUP BY roll_no, event, member_role, IFNULL(leader_roll_no, '')
+            )
+        """)
+        cursor.execute("""
+            CREATE UNIQUE INDEX ux_participant_identity
+            ON participants(roll_no, event, member_role, IFNULL(leader_roll_no, ''))
+        """)
+
+def _migrate_sync_state(cursor):
+    # Incremental sync state: per-sheet content fingerprint + per-leader row hash
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sync_sheets (
+            sheet_name TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            synced_at REAL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sync_rows (
+            sheet_name TEXT NOT NULL,
+            leader_roll_no TEXT NOT NULL,
+            row_hash TEXT NOT NULL,
+            PRIMARY KEY (sheet_name, leader_roll_no)
+        ) WITHOUT ROWID
+    """)
+
+def _migrate_cert_claims(cursor):
+    # Certificate generation claims (one renderer per roll/event across uvicorn workers)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS cert_claims (
+            roll_no TEXT NOT NULL,
+            event TEXT NOT NULL,
+            owner TEXT NOT NULL,
+            claimed_at REAL NOT NULL,
+            PRIMARY KEY (roll_no, event)
+        )
+    """)
+
+def _migrate_covering_indexes(cursor):
+    # /verify, /generate_cert and the claim poll read only these columns by roll_no
+    # (+ event), so they are answered from the index without touching the table
+    cursor.execute("DROP INDEX IF EXISTS idx_roll_event")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_roll_lookup
+        ON participants(roll_no, event, name, department, year, cert_url, blocked, member_role, leader_roll_no)
+    """)
+    # Replacing a leader's team members (save_participant / sync)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_leader_event_role ON participants(leader_roll_no, event, member_role)")
+
+def _migrate_events(cursor):
+    # One row per canonical event; participants point at it by id
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY,
+            slug TEXT NOT NULL UNIQUE,
+            display_name TEXT NOT NULL,
+            cert_label TEXT NOT NULL
+        )
+    """)
+    _add_missing_columns(cursor, "participants", [("event_id", "INTEGER REFERENCES events(id)")])
     
-    # Add blocked column if missing (migration for existing DB)
-    try:
-        cursor.execute("ALTER TABLE participants ADD COLUMN blocked INTEGER DEFAULT 0")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    
-    # Add team_members column if missing (migration for existing DB)
-    try:
-        cursor.execute("ALTER TABLE participants ADD COLUMN team_members TEXT")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    
-    # Add member_role column if missing (migration for existing DB)
-    try:
-        cursor.execute("ALTER TABLE participants ADD COLUMN member_role TEXT DEFAULT 'leader'")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    
-    # Add leader_roll_no column if missing (migration for existing DB)
-    try:
-        cursor.execute("ALTER TABLE participants ADD COLUMN leader_roll_no TEXT")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    
-    # Add member_position column if missing (migration for existing DB)
-    try:
-        cursor.execute("ALTER TABLE participants ADD COLUMN member_position INTEGER DEFAULT 0")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-    
-    # Index for faster lookup
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_roll_event ON participants(roll_no, event)")
+    # Older syncs stored raw sheet names ("CHILL & SKILL (Responses)"); they
+    # resolve to the same event as their cleaned-up name
+    names = [row[0] for row in cursor.execute("SELECT event FROM participants GROUP BY event ORDER BY MIN(id)")]
+    event_ids = _register_events(cursor, names)
+    cursor.executemany("UPDATE participants SET event_id = ? WHERE event = ?",
+                       [(event_id, name) for name, event_id in event_ids.items()])
     
-    conn.commit()
-    conn.close()
-    print("✅ Database initialized")
+    # Same lookup index, now also keyed by event_id for /generate_cert
+    cursor.execute("DROP INDEX IF EXISTS idx_roll_lookup")
+    cursor.execute("""
+        CREATE INDEX idx_roll_lookup
+        ON participants(roll_no, event_id, event, name, department, year, cert_url, blocked, member_role, leader_roll_no)
+    """)
 
-def save_participant(roll_no, name, dept, year, event, sheet_source, team_members=None):
-    """
-    Save participant (leader) and optionally their team members as separate records.
-    
-    Args:
-        roll_no: Leader's roll number
-        name: Leader's name
-        dept: Department
-        year: Year
-        event: Event name
-        sheet_source: Source sheet name
-        team_members: List of dicts with 'name' and 'roll_no' keys, OR comma-separated string (legacy support)
-    """
-    conn = sqlite3.connect(DB_PATH)
+def _migrate_meta(cursor):
+    # Monotonic counter bumped by every write that changes what /verify shows;
+    # lookup caches in every worker compare against it
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', 0)")
+
+def _migrate_admin_paging(cursor):
+    # Admin participant pages walk (event_id, roll_no, id) with a keyset cursor
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_event_roll ON participants(event_id, roll_no)")
+
+def _migrate_search(cursor):
+    # Full-text index over the admin-searchable columns. External content: the
+    # text lives in participants; _upsert_participants / apply_sheet_sync update
+    # the index set-wise per batch (row triggers make bulk ingestion ~5x slower,
+    # because FTS5 flushes its pending terms at every trigger statement)
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS participants_fts USING fts5(
+            roll_no, name, department, event,
+            content = 'participants', content_rowid = 'id'
+        )
+    """)
+    cursor.execute("INSERT INTO participants_fts (participants_fts) VALUES ('rebuild')")
+
+# Aggregate counters the admin stats read instead of scanning participants:
+# stats_events (per event) and roll_counts (per roll number, whose rows coming
+# and going move the unique_students total). Rows are added and removed only by
+# the ingestion path, which adjusts the counters set-wise per batch
+# (_count_batch_teams); cert_url / blocked updates go through a trigger.
+# check_stats() recomputes everything from scratch to detect and repair drift.
+def _migrate_stats(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stats_totals (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stats_events (
+            event TEXT PRIMARY KEY,
+            total INTEGER NOT NULL,
+            generated INTEGER NOT NULL,
+            blocked INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS roll_counts (
+            roll_no TEXT PRIMARY KEY,
+            n INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS stats_roll_added AFTER INSERT ON roll_counts BEGIN
+            UPDATE stats_totals SET value = value + 1 WHERE name = 'unique_students';
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS stats_roll_removed AFTER DELETE ON roll_counts BEGIN
+            UPDATE stats_totals SET value = value - 1 WHERE name = 'unique_students';
+        END
+    """)
+    # Certificate stored / visibility toggled (one row, or every row for toggle-all)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS stats_cert_state AFTER UPDATE OF cert_url, blocked ON participants
+        WHEN (old.cert_url IS NULL) != (new.cert_url IS NULL)
+          OR (COALESCE(old.blocked, 0) = 1) != (COALESCE(new.blocked, 0) = 1)
+        BEGIN
+            UPDATE stats_events SET
+                generated = generated + (new.cert_url IS NOT NULL) - (old.cert_url IS NOT NULL),
+                blocked = blocked + (COALESCE(new.blocked, 0) = 1) - (COALESCE(old.blocked, 0) = 1)
+            WHERE event = new.event;
+        END
+    """)
+    _rebuild_stats(cursor)
+
+def _migrate_sync_jobs(cursor):
+    # One sync at a time across workers: whoever holds the job_locks row runs it,
+    # triggers that arrive meanwhile only set `pending` (coalesced into one re-run)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS job_locks (
+            name TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            run_id INTEGER,
+            heartbeat_at REAL NOT NULL,
+            pending INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sync_runs (
+            id INTEGER PRIMARY KEY,
+            trigger TEXT NOT NULL,
+            owner TEXT NOT NULL,
+            status TEXT NOT NULL,
+            started_at REAL NOT NULL,
+            finished_at REAL,
+            sheets TEXT NOT NULL DEFAULT '[]',
+            summary TEXT,
+            error TEXT
+        )
+    """)
+
+def _migrate_cert_fingerprints(cursor):
+    # What each stored certificate was rendered from (template/font/text hash)
+    _add_missing_columns(cursor, "participants", [("cert_fingerprint", "TEXT")])
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_cert_fingerprint ON participants(cert_fingerprint)
+        WHERE cert_url IS NOT NULL
+    """)
+
+def _migrate_visibility_filters(cursor):
+    # Department / year selectors (admin filters, bulk show/hide) compare
+    # case-insensitively; NOCASE indexes let them seek instead of scanning
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_department_nocase ON participants(department COLLATE NOCASE)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_year_nocase ON participants(year COLLATE NOCASE)")
+
+def _migrate_search_events(cursor):
+    # Index the canonical event name instead of the stored sheet name, so rows
+    # synced as "CHILL & SKILL (Responses)" are found by searching "mindsprint".
+    # The index reads its text through a view; _index_batch_teams writes the
+    # same values.
+    cursor.execute("""
+        CREATE VIEW IF NOT EXISTS participants_search AS
+        SELECT p.id, p.roll_no, p.name, p.department, COALESCE(e.display_name, p.event) AS event
+        FROM participants p LEFT JOIN events e ON e.id = p.event_id
+    """)
+    cursor.execute("DROP TABLE IF EXISTS participants_fts")
+    cursor.execute("""
+        CREATE VIRTUAL TABLE participants_fts USING fts5(
+            roll_no, name, department, event,
+            content = 'participants_search', content_rowid = 'id'
+        )
+    """)
+    cursor.execute("INSERT INTO participants_fts (participants_fts) VALUES ('rebuild')")
+
+def _expected_stats(cursor):
+    """Recompute every counter from participants: (totals, per_event, roll_counts)"""
+    cursor.execute("""
+        SELECT COUNT(*), COUNT(DISTINCT roll_no), COUNT(DISTINCT event), COUNT(cert_url) FROM participants
+    """)
+    totals = dict(zip(("total_records", "unique_students", "events", "certs_generated"), cursor.fetchone()))
+    cursor.execute("""
+        SELECT event, COUNT(*), COUNT(cert_url), SUM(COALESCE(blocked, 0) = 1)
+        FROM participants GROUP BY event
+    """)
+    per_event = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+    cursor.execute("SELECT roll_no, COUNT(*) FROM participants GROUP BY roll_no")
+    rolls = {row[0]: row[1] for row in cursor.fetchall()}
+    return totals, per_event, rolls
+
+def _rebuild_stats(cursor):
+    totals, per_event, rolls = _expected_stats(cursor)
+    cursor.execute("DELETE FROM stats_events")
+    cursor.executemany("INSERT INTO stats_events (event, total, generated, blocked) VALUES (?, ?, ?, ?)",
+                       [(event,) + counts for event, counts in per_event.items()])
+    cursor.execute("DELETE FROM roll_counts")
+    cursor.execute("INSERT OR REPLACE INTO stats_totals (name, value) VALUES ('unique_students', 0)")
+    # stats_roll_added counts these back up to the number of distinct rolls
+    cursor.executemany("INSERT INTO roll_counts (roll_no, n) VALUES (?, ?)", rolls.items())
+
+# Schema steps in order; PRAGMA user_version records how many have been applied.
+# Only ever append - never edit or reorder a step that has shipped.
+MIGRATIONS = [
+    _migrate_participants,
+    _migrate_identity_index,
+    _migrate_sync_state,
+    _migrate_cert_claims,
+    _migrate_covering_indexes,
+    _migrate_events,
+    _migrate_meta,
+    _migrate_admin_paging,
+    _migrate_search,
+    _migrate_stats,
+    _migrate_sync_jobs,
+    _migrate_cert_fingerprints,
+    _migrate_visibility_filters,
+    _migrate_search_events,
+]
+
+def schema_version():
+    return get_connection().execute("PRAGMA user_version").fetchone()[0]
+
+def _bump_data_version(cursor):
+    """Advance the data version inside the caller's write transaction"""
+    global local_data_version
+    cursor.execute("UPDATE meta SET value = value + 1 WHERE key = 'data_version' RETURNING value")
+    local_data_version = cursor.fetchone()[0]
+
+def get_data_version():
+    row = get_connection().execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+    return row[0] if row else 0
+
+def init_db():
+    """Apply pending migrations. An up-to-date database is only read, never written."""
+    if schema_version() >= len(MIGRATIONS):
+        return
+
+    conn = get_connection()
     cursor = conn.cursor()
-    
-    # Convert team_members to standardized format
+    # Take the write lock first, then re-check: another worker may have migrated meanwhile
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        for step, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            migration(cursor)
+            cursor.execute(f"PRAGMA user_version = {step}")
+            print(f"   🛠️ Migration {step}: {migration.__name__}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    print(f"✅ Database initialized (schema v{len(MIGRATIONS)})")
+
+def _normalize_team_members(team_members):
+    """Team members as a list of {'name', 'roll_no'} dicts (accepts list of dicts, list of names, or comma-separated string)"""
     team_members_data = []
     
     if isinstance(team_members, str):
@@ -96,164 +415,763 @@ def save_participant(roll_no, name, dept, year, event, sheet_source, team_member
                 # String name only
                 if tm.strip():
                     team_members_data.append({"name": tm.strip(), "roll_no": None})
-    
-    # Create display string for team_members column
-    team_members_names = [tm.get('name', '') for tm in team_members_data if tm.get('name')]
-    team_members_str = ", ".join(team_members_names) if team_members_names else None
-    
-    # Upsert leader record (checking roll_no + event + member_role)
-    cursor.execute("""
-        SELECT id FROM participants 
-        WHERE roll_no = ? AND event = ? AND member_role = 'leader'
-    """, (roll_no, event))
-    existing = cursor.fetchone()
-    
-    if existing:
+    return team_members_data
+
+def _register_events(cursor, names):
+    """Make sure every event name has an events row; returns {name: event_id}"""
+    event_ids = {}
+    # First-seen order (not set order): event ids, and so dashboard/export order, are stable across runs
+    for name in dict.fromkeys(names):
+        slug, display, cert_label = describe_event(name)
         cursor.execute("""
-            UPDATE participants 
-            SET name = ?, department = ?, year = ?, sheet_source = ?, team_members = ?
-            WHERE id = ?
-        """, (name, dept, year, sheet_source, team_members_str, existing[0]))
+            INSERT INTO events (slug, display_name, cert_label) VALUES (?, ?, ?)
+            ON CONFLICT(slug) DO UPDATE SET display_name = excluded.display_name, cert_label = excluded.cert_label
+            WHERE events.display_name != excluded.display_name OR events.cert_label != excluded.cert_label
+        """, (slug, display, cert_label))
+        cursor.execute("SELECT id FROM events WHERE slug = ?", (slug,))
+        event_ids[name] = cursor.fetchone()[0]
+    return event_ids
+
+def register_events(names):
+    """Populate the events table (sync calls this with every mapped event name)"""
+    conn = get_connection()
+    with transaction() as cursor:
+        before = conn.total_changes
+        event_ids = _register_events(cursor, names)
+        # Renamed display names / labels show up in cached lookups
+        if conn.total_changes != before:
+            _bump_data_version(cursor)
+    return event_ids
+
+def _load_batch(cursor, leader_keys, member_keys=()):
+    """Fill the _batch_leaders / _batch_members temp tables with (leader_roll_no, event[, roll_no]) keys"""
+    cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS _batch_leaders (
+            leader_roll_no TEXT, event TEXT, PRIMARY KEY (leader_roll_no, event)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS _batch_members (
+            leader_roll_no TEXT, event TEXT, roll_no TEXT, PRIMARY KEY (leader_roll_no, event, roll_no)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("DELETE FROM _batch_leaders")
+    cursor.execute("DELETE FROM _batch_members")
+    cursor.executemany("INSERT OR IGNORE INTO _batch_leaders VALUES (?, ?)", leader_keys)
+    cursor.executemany("INSERT OR IGNORE INTO _batch_members VALUES (?, ?, ?)", member_keys)
+
+# Leader + member rows of every team in _batch_leaders, with the search-indexed columns.
+# CROSS JOIN pins the (small, unanalyzed) temp table as the outer loop; left to
+# itself the planner scans all of participants once per batch.
+_BATCH_TEAM_ROWS = """
+    SELECT p.id, p.roll_no, p.name, p.department, p.event, p.event_id, p.cert_url, p.blocked FROM _batch_leaders l
+    CROSS JOIN participants p ON p.roll_no = l.leader_roll_no AND p.event = l.event AND p.member_role = 'leader'
+    UNION ALL
+    SELECT p.id, p.roll_no, p.name, p.department, p.event, p.event_id, p.cert_url, p.blocked FROM _batch_leaders l
+    CROSS JOIN participants p ON p.leader_roll_no = l.leader_roll_no AND p.event = l.event AND p.member_role = 'member'
+"""
+
+# Same columns as the participants_search view the index is built from
+_BATCH_TEAM_SEARCH_ROWS = f"""
+    SELECT t.id, t.roll_no, t.name, t.department, COALESCE(e.display_name, t.event)
+    FROM ({_BATCH_TEAM_ROWS}) t LEFT JOIN events e ON e.id = t.event_id
+"""
+
+def _index_batch_teams(cursor, delete=False):
+    """Add (or, with delete=True, remove) the batch teams' current rows in participants_fts"""
+    if delete:
+        # External-content delete needs the exact indexed values, so run it before rows change
+        cursor.execute(f"""
+            INSERT INTO participants_fts (participants_fts, rowid, roll_no, name, department, event)
+            SELECT 'delete', * FROM ({_BATCH_TEAM_SEARCH_ROWS})
+        """)
     else:
-        cursor.execute("""
-            INSERT INTO participants (roll_no, name, department, year, event, sheet_source, team_members, member_role, member_position)
-            VALUES (?, ?, ?, ?, ?, ?, ?, 'leader', 0)
-        """, (roll_no, name, dept, year, event, sheet_source, team_members_str))
+        cursor.execute(f"""
+            INSERT INTO participants_fts (rowid, roll_no, name, department, event)
+            SELECT * FROM ({_BATCH_TEAM_SEARCH_ROWS})
+        """)
+
+def _count_batch_teams(cursor, sign):
+    """Add (sign=1) or subtract (sign=-1) the batch teams' current rows in the stats counters"""
+    cursor.execute(f"""
+        INSERT INTO stats_events (event, total, generated, blocked)
+        SELECT event, ? * COUNT(*), ? * COUNT(cert_url), ? * SUM(COALESCE(blocked, 0) = 1)
+        FROM ({_BATCH_TEAM_ROWS}) GROUP BY event
+        ON CONFLICT(event) DO UPDATE SET total = total + excluded.total,
+            generated = generated + excluded.generated, blocked = blocked + excluded.blocked
+    """, (sign, sign, sign))
+    cursor.execute(f"""
+        INSERT INTO roll_counts (roll_no, n)
+        SELECT roll_no, ? * COUNT(*) FROM ({_BATCH_TEAM_ROWS}) GROUP BY roll_no
+        ON CONFLICT(roll_no) DO UPDATE SET n = n + excluded.n
+    """, (sign,))
+    if sign < 0:
+        cursor.execute(f"""
+            DELETE FROM roll_counts WHERE n = 0 AND roll_no IN (SELECT roll_no FROM ({_BATCH_TEAM_ROWS}))
+        """)
+        cursor.execute("DELETE FROM stats_events WHERE total = 0")
+
+def rebuild_search_index():
+    """Re-index every participant (only needed if participants was edited outside this module)"""
+    with transaction() as cursor:
+        cursor.execute("INSERT INTO participants_fts (participants_fts) VALUES ('rebuild')")
+
+def _upsert_participants(cursor, participants):
+    """Bulk upsert of leaders + team members on an open cursor (see save_participants_bulk)"""
+    # A leader listed twice in one batch behaves like two saves in a row: last one wins
+    latest = {}
+    for p in participants:
+        latest[(p["roll_no"], p["event"])] = p
     
-    # Delete existing team member records for this leader/event combination
-    cursor.execute("""
-        DELETE FROM participants 
-        WHERE leader_roll_no = ? AND event = ? AND member_role = 'member'
-    """, (roll_no, event))
+    leader_rows = []
+    member_rows = []
+    leader_keys = []
+    member_keys = []
     
-    # Insert individual records for each team member with their own roll number
-    for idx, member in enumerate(team_members_data, start=1):
-        member_name = member.get('name', '').strip()
-        member_roll = member.get('roll_no') 
+    for p in latest.values():
+        team_members_data = _normalize_team_members(p.get("team_members"))
         
-        # Validation: Members must have a name to be saved
-        if member_name:
-             # If roll number is missing/empty, DO NOT create a certificate-eligible record
-             # We will create a record for display, but flag it or leave roll empty if permitted.
-             # However, User Requirement says: "duplicate roll numbers must result in only one certificate"
-             # and "If a team member’s roll number is missing or empty, leave that member blank"
-             
-             # If we don't have a roll number, we should probably still save them for the admin display
-             # but they effectively won't be able to generate a valid certificate if roll is empty.
-             # But let's check the requirement: "Display each team member based on their roll number"...
-             
-             # Let's save them. If roll is None, they just won't be searchable by roll number on the frontend.
-             # But the user specifically asked "If a team member’s roll number is missing or empty, leave that member blank".
-             # This implies we might skip saving them or save as blank?
-             # "Display each team member based on their roll number" - this suggests roll number is key.
-             
-             # The sync.py ensures we only add members if they have a roll number OR name.
-             # But revised sync.py logic I just wrote:
-             # if not member_name or not member_roll: continue
-             # So we are GUARANTEED to have a roll number coming in from sync.py
-             
-             # But for robustness, let's look at `member_roll`.
-             # If member has no roll number (from legacy calls maybe), we fallback to leader? NO. 
-             # Requirement: "Do not auto-fill, copy, or assume roll numbers for missing team members"
-             
-             final_roll = member_roll if member_roll else f"NO_ROLL_{roll_no}_{idx}" # Fallback placeholder just for DB constraint if any
-             
-             # Actually, roll_no column is NOT NULL in schema?
-             # Let's check schema: roll_no TEXT NOT NULL
-             # So we MUST provide a roll number.
-             # If sync.py filtered them out, we are good.
-             # If we are here, we must have a roll number.
-             
-             if not member_roll:
-                 # If clean sync logic is used, this won't happen.
-                 # If it does happen, we skip saving this member to DB because we can't violate NOT NULL
-                 continue
-
-             cursor.execute("""
-                INSERT INTO participants (
-                    roll_no, name, department, year, event, sheet_source, 
-                    member_role, leader_roll_no, member_position
-                ) VALUES (?, ?, ?, ?, ?, ?, 'member', ?, ?)
-            """, (final_roll, member_name, dept, year, event, sheet_source, roll_no, idx))
+        # Create display string for team_members column
+        team_members_names = [tm.get('name', '') for tm in team_members_data if tm.get('name')]
+        team_members_str = ", ".join(team_members_names) if team_members_names else None
         
-    conn.commit()
-    conn.close()
+        roll_no, event = p["roll_no"], p["event"]
+        leader_rows.append((roll_no, p["name"], p["dept"], p["year"], event, p["sheet_source"], team_members_str))
+        leader_keys.append((roll_no, event))
+        
+        for idx, member in enumerate(team_members_data, start=1):
+            member_name = (member.get('name') or '').strip()
+            member_roll = member.get('roll_no')
+            
+            # Members need a name, and roll_no is NOT NULL - we never auto-fill or
+            # assume roll numbers for missing team members, so those are skipped
+            if not member_name or not member_roll:
+                continue
+            
+            member_rows.append((member_roll, member_name, p["dept"], p["year"], event, p["sheet_source"], roll_no, idx))
+            member_keys.append((roll_no, event, member_roll))
+    
+    if not leader_rows:
+        return
+    
+    _bump_data_version(cursor)
+    
+    # Event ids resolved once per batch, not per row
+    event_ids = _register_events(cursor, [key[1] for key in leader_keys])
+    
+    # Search index + stats: drop the batch teams' current rows now, re-add them after the writes
+    _load_batch(cursor, leader_keys, member_keys)
+    _index_batch_teams(cursor, delete=True)
+    _count_batch_teams(cursor, -1)
+    leader_rows = [row + (event_ids[row[4]],) for row in leader_rows]
+    member_rows = [row + (event_ids[row[4]],) for row in member_rows]
+    
+    cursor.executemany("""
+        INSERT INTO participants (roll_no, name, department, year, event, sheet_source, team_members, event_id, member_role, member_position)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'leader', 0)
+        ON CONFLICT(roll_no, event, member_role, IFNULL(leader_roll_no, '')) DO UPDATE SET
+            name = excluded.name, department = excluded.department, year = excluded.year,
+            sheet_source = excluded.sheet_source, team_members = excluded.team_members, event_id = excluded.event_id
+    """, leader_rows)
+    
+    cursor.executemany("""
+        INSERT INTO participants (
+            roll_no, name, department, year, event, sheet_source,
+            member_role, leader_roll_no, member_position, event_id
+        ) VALUES (?, ?, ?, ?, ?, ?, 'member', ?, ?, ?)
+        ON CONFLICT(roll_no, event, member_role, IFNULL(leader_roll_no, '')) DO UPDATE SET
+            name = excluded.name, department = excluded.department, year = excluded.year,
+            sheet_source = excluded.sheet_source, member_position = excluded.member_position, event_id = excluded.event_id
+    """, member_rows)
+    
+    # Drop member records of these leaders that are no longer on the team
+    cursor.execute("""
+        DELETE FROM participants WHERE id IN (
+            SELECT p.id FROM _batch_leaders l
+            CROSS JOIN participants p
+              ON p.leader_roll_no = l.leader_roll_no AND p.event = l.event AND p.member_role = 'member'
+            WHERE NOT EXISTS (
+                SELECT 1 FROM _batch_members m
+                WHERE m.leader_roll_no = p.leader_roll_no AND m.event = p.event AND m.roll_no = p.roll_no
+            )
+        )
+    """)
+    _index_batch_teams(cursor)
+    _count_batch_teams(cursor, 1)
+
+def save_participants_bulk(participants):
+    """
+    Upsert a whole batch of leaders and their team members in a single transaction.
+    
+    Args:
+        participants: iterable of dicts with keys roll_no, name, dept, year, event,
+                      sheet_source and optional team_members (same formats as save_participant)
+    
+    Each leader's member records are replaced by the given list: members that are
+    no longer listed are deleted, the rest are upserted in place.
+    """
+    with transaction() as cursor:
+        _upsert_participants(cursor, participants)
+
+def save_participant_batches(batches):
+    """
+    save_participants_bulk over an iterable of leader lists, one short
+    transaction per batch: the write lock is released between batches, so
+    /generate_cert and admin writes keep working during a large import, and
+    only one batch is held in memory at a time. Upserts are idempotent, so an
+    interrupted import is finished by running it again (like sync).
+    Returns the number of batches written.
+    """
+    count = 0
+    for participants in batches:
+        with transaction() as cursor:
+            _upsert_participants(cursor, participants)
+        count += 1
+    return count
+
+def get_sheet_sync_state(sheet_name):
+    """Fingerprint and per-leader row hashes stored by the last sync of this sheet"""
+    cursor = get_connection().cursor()
+    cursor.execute("SELECT fingerprint FROM sync_sheets WHERE sheet_name = ?", (sheet_name,))
+    row = cursor.fetchone()
+    cursor.execute("SELECT leader_roll_no, row_hash FROM sync_rows WHERE sheet_name = ?", (sheet_name,))
+    row_hashes = {r[0]: r[1] for r in cursor.fetchall()}
+    return {"fingerprint": row[0] if row else None, "row_hashes": row_hashes}
+
+def apply_sheet_sync(sheet_name, event, fingerprint, changed, removed_rolls, row_hashes):
+    """
+    Apply one sheet's incremental changes and record its new sync state, atomically.
+    
+    Args:
+        changed: leader records (save_participants_bulk format) that are new or modified
+        removed_rolls: leader roll numbers that disappeared from the sheet
+        row_hashes: {leader_roll_no: hash} for the changed leaders
+    """
+    with transaction() as cursor:
+        _upsert_participants(cursor, changed)
+    
+        # Leaders that left the sheet take their team member records with them
+        removed = [(roll, event) for roll in removed_rolls]
+        if removed:
+            _bump_data_version(cursor)
+            _load_batch(cursor, removed)
+            _index_batch_teams(cursor, delete=True)
+            _count_batch_teams(cursor, -1)
+        cursor.executemany("DELETE FROM participants WHERE roll_no = ? AND event = ? AND member_role = 'leader'", removed)
+        cursor.executemany("DELETE FROM participants WHERE leader_roll_no = ? AND event = ? AND member_role = 'member'", removed)
+    
+        cursor.executemany("DELETE FROM sync_rows WHERE sheet_name = ? AND leader_roll_no = ?",
+                           [(sheet_name, roll) for roll in removed_rolls])
+        cursor.executemany("""
+            INSERT INTO sync_rows (sheet_name, leader_roll_no, row_hash) VALUES (?, ?, ?)
+            ON CONFLICT(sheet_name, leader_roll_no) DO UPDATE SET row_hash = excluded.row_hash
+        """, [(sheet_name, roll, h) for roll, h in row_hashes.items()])
+        cursor.execute("""
+            INSERT INTO sync_sheets (sheet_name, fingerprint, synced_at) VALUES (?, ?, ?)
+            ON CONFLICT(sheet_name) DO UPDATE SET fingerprint = excluded.fingerprint, synced_at = excluded.synced_at
+        """, (sheet_name, fingerprint, time.time()))
+
+def save_participant(roll_no, name, dept, year, event, sheet_source, team_members=None):
+    """
+    Save participant (leader) and optionally their team members as separate records.
+    
+    Args:
+        roll_no: Leader's roll number
+        name: Leader's name
+        dept: Department
+        year: Year
+        event: Event name
+        sheet_source: Source sheet name
+        team_members: List of dicts with 'name' and 'roll_no' keys, OR comma-separated string (legacy support)
+    """
+    save_participants_bulk([{
+        "roll_no": roll_no, "name": name, "dept": dept, "year": year,
+        "event": event, "sheet_source": sheet_source, "team_members": team_members,
+    }])
+
+# Participant lookup columns plus the event's slug / display name / certificate label
+_LOOKUP_SELECT = f"""
+    SELECT {", ".join("p." + c for c in LOOKUP_COLUMNS)},
+           e.slug AS event_slug, e.display_name, e.cert_label
+    FROM participants p LEFT JOIN events e ON e.id = p.event_id
+"""
 
 def get_events_for_roll(roll_no):
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM participants WHERE roll_no = ?", (roll_no,))
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    cursor = get_connection().cursor()
+    cursor.execute(_LOOKUP_SELECT + " WHERE p.roll_no = ?", (roll_no,))
+    return [dict(row) for row in cursor.fetchall()]
 
-def update_cert_url(roll_no, event, url):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("UPDATE participants SET cert_url = ? WHERE roll_no = ? AND event = ?", (url, roll_no, event))
-    conn.commit()
-    conn.close()
+def update_cert_url(roll_no, event, url, fingerprint=None):
+    with transaction() as cursor:
+        cursor.execute("UPDATE participants SET cert_url = ?, cert_fingerprint = ? WHERE roll_no = ? AND event = ?",
+                       (url, fingerprint, roll_no, event))
+        _bump_data_version(cursor)
+
+def get_pending_certificates(event=None):
+    """Non-blocked participants that do not have a certificate yet (for pre-generation)"""
+    cursor = get_connection().cursor()
+    query = """
+        SELECT p.id, p.roll_no, p.name, p.department, p.year, p.event, e.cert_label
+        FROM participants p LEFT JOIN events e ON e.id = p.event_id
+        WHERE p.cert_url IS NULL AND COALESCE(p.blocked, 0) = 0
+    """
+    params = ()
+    if event:
+        # Accepts a slug or any name that resolves to it ("TECHNICAL QUIZ", "technical-quiz")
+        query += " AND e.slug = ?"
+        params = (describe_event(event)[0],)
+    cursor.execute(query + " ORDER BY p.event, p.roll_no", params)
+    return [dict(row) for row in cursor.fetchall()]
+
+def update_cert_urls(updates):
+    """
+    Store many certificate URLs in one transaction.
+    updates: iterable of (participant_id, url) or (participant_id, url, fingerprint).
+    Rows that already have a URL are left alone.
+    """
+    with transaction() as cursor:
+        cursor.executemany(
+            "UPDATE participants SET cert_url = ?, cert_fingerprint = ? WHERE id = ? AND cert_url IS NULL",
+            [(u[1], u[2] if len(u) > 2 else None, u[0]) for u in updates]
+        )
+        _bump_data_version(cursor)
+
+def replace_cert_url(old_url, new_url, fingerprint):
+    """Point rows rendered from `fingerprint` at a new copy of the same certificate (e.g. CDN replica)"""
+    with transaction() as cursor:
+        cursor.execute("UPDATE participants SET cert_url = ? WHERE cert_fingerprint = ? AND cert_url = ?",
+                       (new_url, fingerprint, old_url))
+        changed = cursor.rowcount
+        if changed:
+            _bump_data_version(cursor)
+    return changed
+
+def get_cert_urls_with_prefix(prefix, event=None):
+    """Distinct (cert_url, cert_fingerprint) of stored certificates whose URL starts with prefix"""
+    query = """
+        SELECT DISTINCT p.cert_url, p.cert_fingerprint
+        FROM participants p LEFT JOIN events e ON e.id = p.event_id
+        WHERE p.cert_url IS NOT NULL AND substr(p.cert_url, 1, ?) = ?
+    """
+    params = (len(prefix), prefix)
+    if event:
+        query += " AND e.slug = ?"
+        params += (describe_event(event)[0],)
+    return [tuple(row) for row in get_connection().execute(query + " ORDER BY p.cert_url", params)]
+
+def get_cert_url_by_fingerprint(fingerprint):
+    """URL of any stored certificate rendered from exactly this fingerprint (artifact reuse)"""
+    row = get_connection().execute(
+        "SELECT cert_url FROM participants WHERE cert_fingerprint = ? AND cert_url IS NOT NULL LIMIT 1", (fingerprint,)
+    ).fetchone()
+    return row[0] if row else None
+
+def get_rendered_certificates(event=None):
+    """Rows that have a certificate, with what is needed to recompute its render fingerprint"""
+    query = """
+        SELECT p.id, p.name, p.department, p.year, p.event, e.cert_label,
+               p.cert_fingerprint, COALESCE(p.blocked, 0) AS blocked
+        FROM participants p LEFT JOIN events e ON e.id = p.event_id
+        WHERE p.cert_url IS NOT NULL
+    """
+    params = ()
+    if event:
+        query += " AND e.slug = ?"
+        params = (describe_event(event)[0],)
+    return [dict(row) for row in get_connection().execute(query, params).fetchall()]
+
+def set_cert_fingerprints(updates):
+    """Record fingerprints for certificates that have none yet: iterable of (participant_id, fingerprint)"""
+    with transaction() as cursor:
+        cursor.executemany(
+            "UPDATE participants SET cert_fingerprint = ? WHERE id = ? AND cert_fingerprint IS NULL",
+            [(fingerprint, participant_id) for participant_id, fingerprint in updates]
+        )
+
+def invalidate_certificates(ids):
+    """Drop the stored certificate of these participants so it is rendered again; returns the count"""
+    with transaction() as cursor:
+        cursor.execute("""
+            UPDATE participants SET cert_url = NULL, cert_fingerprint = NULL
+            WHERE id IN (SELECT value FROM json_each(?)) AND cert_url IS NOT NULL
+        """, (json.dumps([int(i) for i in ids]),))
+        changed = cursor.rowcount
+        if changed:
+            _bump_data_version(cursor)
+    return changed
+
+def get_cert_url(roll_no, event):
+    cursor = get_connection().cursor()
+    cursor.execute("SELECT cert_url FROM participants WHERE roll_no = ? AND event = ? AND cert_url IS NOT NULL", (roll_no, event))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def claim_certificate(roll_no, event, owner, stale_after=120):
+    """
+    Try to become the only generator of this roll/event certificate.
+    Returns True if the claim is ours (new, already ours, or taken over from a stale owner).
+    """
+    now = time.time()
+    with transaction() as cursor:
+        cursor.execute("""
+            INSERT INTO cert_claims (roll_no, event, owner, claimed_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(roll_no, event) DO UPDATE SET owner = excluded.owner, claimed_at = excluded.claimed_at
+            WHERE cert_claims.owner = excluded.owner OR cert_claims.claimed_at < ?
+        """, (roll_no, event, owner, now, now - stale_after))
+        return cursor.rowcount == 1
+
+def certificate_claimed_by_other(roll_no, event, owner, stale_after=120):
+    """Read-only check: does another owner hold a live claim on this roll/event?"""
+    cursor = get_connection().cursor()
+    cursor.execute(
+        "SELECT 1 FROM cert_claims WHERE roll_no = ? AND event = ? AND owner != ? AND claimed_at >= ?",
+        (roll_no, event, owner, time.time() - stale_after)
+    )
+    return cursor.fetchone() is not None
+
+def release_certificate_claim(roll_no, event, owner):
+    with transaction() as cursor:
+        cursor.execute("DELETE FROM cert_claims WHERE roll_no = ? AND event = ? AND owner = ?", (roll_no, event, owner))
+
+def _start_sync_run(cursor, owner, trigger, now):
+    cursor.execute("INSERT INTO sync_runs (trigger, owner, status, started_at) VALUES (?, ?, 'running', ?)",
+                   (trigger, owner, now))
+    run_id = cursor.lastrowid
+    cursor.execute("UPDATE job_locks SET run_id = ?, heartbeat_at = ? WHERE name = 'sync'", (run_id, now))
+    return run_id
+
+def acquire_sync_lock(owner, trigger, stale_after=600, coalesce=True):
+    """
+    Take the sync lock and open a sync_runs row; returns the run id.
+    If another sync holds the lock (and has heartbeated within stale_after
+    seconds), return None - and with coalesce=True mark it pending: its owner
+    runs once more when it finishes, however many triggers arrived meanwhile.
+    """
+    now = time.time()
+    with transaction() as cursor:
+        cursor.execute("""
+            INSERT INTO job_locks (name, owner, heartbeat_at, pending) VALUES ('sync', ?, ?, 0)
+            ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, heartbeat_at = excluded.heartbeat_at, pending = 0
+            WHERE job_locks.heartbeat_at < ?
+        """, (owner, now, now - stale_after))
+        if cursor.rowcount != 1:
+            if coalesce:
+                cursor.execute("UPDATE job_locks SET pending = 1 WHERE name = 'sync'")
+            return None
+        # A previous owner that went quiet (crashed worker) never finished its run
+        cursor.execute("""
+            UPDATE sync_runs SET status = 'abandoned', finished_at = ? WHERE status = 'running'
+        """, (now,))
+        return _start_sync_run(cursor, owner, trigger, now)
+
+def record_sync_progress(run_id, owner, sheets):
+    """Store per-sheet progress for a running sync and heartbeat its lock"""
+    now = time.time()
+    with transaction() as cursor:
+        cursor.execute("UPDATE sync_runs SET sheets = ? WHERE id = ?", (json.dumps(sheets), run_id))
+        cursor.execute("UPDATE job_locks SET heartbeat_at = ? WHERE name = 'sync' AND owner = ?", (now, owner))
+
+def finish_sync_run(run_id, owner, status, summary=None, error=None, keep=50):
+    """
+    Close a sync run (keeping the last `keep` runs). If triggers were coalesced
+    while it ran, the lock is kept and the id of a new 'coalesced' run is
+    returned; otherwise the lock is released and None is returned.
+    """
+    now = time.time()
+    with transaction() as cursor:
+        cursor.execute("""
+            UPDATE sync_runs SET status = ?, finished_at = ?, summary = ?, error = ? WHERE id = ?
+        """, (status, now, json.dumps(summary) if summary is not None else None, error, run_id))
+        cursor.execute("DELETE FROM sync_runs WHERE id <= (SELECT id FROM sync_runs ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                       (keep,))
+        cursor.execute("""
+            UPDATE job_locks SET pending = 0 WHERE name = 'sync' AND owner = ? AND pending = 1
+        """, (owner,))
+        if cursor.rowcount == 1:
+            return _start_sync_run(cursor, owner, "coalesced", now)
+        cursor.execute("DELETE FROM job_locks WHERE name = 'sync' AND owner = ?", (owner,))
+        return None
+
+def _sync_run_dict(row):
+    run = dict(row)
+    run["sheets"] = json.loads(run["sheets"])
+    run["summary"] = json.loads(run["summary"]) if run["summary"] else None
+    end = run["finished_at"] or time.time()
+    run["seconds"] = round(end - run["started_at"], 2)
+    return run
+
+def get_sync_runs(limit=20):
+    """Most recent sync runs first (sheets/summary decoded, `seconds` = duration so far)"""
+    cursor = get_connection().cursor()
+    cursor.execute("SELECT * FROM sync_runs ORDER BY id DESC LIMIT ?", (limit,))
+    return [_sync_run_dict(row) for row in cursor.fetchall()]
+
+def get_sync_lock():
+    row = get_connection().execute("SELECT * FROM job_locks WHERE name = 'sync'").fetchone()
+    return dict(row) if row else None
 
 def get_all_participants():
     """Get all participants for admin view"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM participants ORDER BY event, roll_no")
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    cursor = get_connection().cursor()
+    cursor.execute("""
+        SELECT p.*, e.slug AS event_slug, e.display_name FROM participants p
+        LEFT JOIN events e ON e.id = p.event_id
+        ORDER BY p.event, p.roll_no
+    """)
+    return [dict(row) for row in cursor.fetchall()]
+
+def _participant_filters(event=None, department=None, blocked=None, has_cert=None, year=None, ids=None):
+    """WHERE clauses + params shared by the admin page, count and bulk visibility queries"""
+    clauses, params = [], []
+    if event:
+        clauses.append("p.event_id = (SELECT id FROM events WHERE slug = ?)")
+        params.append(event)
+    if department:
+        clauses.append("p.department = ? COLLATE NOCASE")
+        params.append(department)
+    if year:
+        clauses.append("p.year = ? COLLATE NOCASE")
+        params.append(year)
+    if ids is not None:
+        # One bound JSON array instead of a variable-length IN (?, ?, ...) list
+        clauses.append("p.id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps([int(i) for i in ids]))
+    if blocked is not None:
+        clauses.append("COALESCE(p.blocked, 0) = ?")
+        params.append(1 if blocked else 0)
+    if has_cert is not None:
+        clauses.append("p.cert_url IS NOT NULL" if has_cert else "p.cert_url IS NULL")
+    return clauses, params
+
+def get_participants_page(after=None, limit=50, event=None, department=None, blocked=None, has_cert=None):
+    """
+    One page of participants ordered by (event_id, roll_no, id), for the admin API.
+    
+    Args:
+        after: the `next` key of the previous page, or None for the first page
+        event: event slug; blocked / has_cert: True, False or None for "any"
+    
+    Returns (rows, next) where next is the key to pass as `after` (None on the last page).
+    """
+    clauses, params = _participant_filters(event, department, blocked, has_cert)
+    if after:
+        # Row-value comparison walks idx_event_roll from the cursor, no OFFSET scan
+        clauses.append("(p.event_id, p.roll_no, p.id) > (?, ?, ?)")
+        params.extend(after)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    
+    cursor = get_connection().cursor()
+    cursor.execute(f"""
+        SELECT p.id, p.roll_no, p.name, p.department, p.year, p.event_id, p.cert_url, p.blocked,
+               p.member_role, p.leader_roll_no, e.slug AS event_slug, e.display_name
+        FROM participants p LEFT JOIN events e ON e.id = p.event_id
+        {where}
+        ORDER BY p.event_id, p.roll_no, p.id
+        LIMIT ?
+    """, params + [limit + 1])
+    rows = [dict(row) for row in cursor.fetchall()]
+    
+    next_key = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_key = (last["event_id"], last["roll_no"], last["id"])
+    return rows, next_key
+
+EXPORT_COLUMNS = ("roll_no", "name", "department", "year", "event", "event_slug", "member_role",
+                  "leader_roll_no", "cert_url", "visible")
+
+def iter_participants_export(event=None, department=None, blocked=None, has_cert=None, batch_size=1000):
+    """
+    Yield participants as EXPORT_COLUMNS tuples, batch_size rows at a time, in
+    (event_id, roll_no, id) order so SQLite walks idx_event_roll and the first
+    rows are ready before the scan finishes (no sort step).
+    
+    Uses its own connection: an export can outlive a request thread and may be
+    resumed from different worker threads, one at a time.
+    """
+    clauses, params = _participant_filters(event, department, blocked, has_cert)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    conn = _connect(DB_PATH, check_same_thread=False)
+    conn.row_factory = None
+    try:
+        cursor = conn.execute(f"""
+            SELECT p.roll_no, p.name, p.department, p.year, COALESCE(e.display_name, p.event), e.slug,
+                   p.member_role, p.leader_roll_no, p.cert_url,
+                   CASE WHEN COALESCE(p.blocked, 0) = 1 THEN 'no' ELSE 'yes' END
+            FROM participants p LEFT JOIN events e ON e.id = p.event_id
+            {where}
+            ORDER BY p.event_id, p.roll_no, p.id
+        """, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+def get_event_counts(department=None, blocked=None, has_cert=None):
+    """
+    Per-event totals under the same filters as get_participants_page. Unfiltered
+    (every dashboard load) they come from the maintained stats_events counters;
+    with filters, from one GROUP BY over participants.
+    """
+    clauses, params = _participant_filters(None, department, blocked, has_cert)
+    if not clauses:
+        return _event_counts_from_stats()
+    return _group_event_counts(clauses, params)
+
+def _event_counts_from_stats():
+    cursor = get_connection().cursor()
+    events = {row["slug"]: row for row in cursor.execute("SELECT id, slug, display_name FROM events")}
+    counts = {}
+    # stats_events is keyed by the stored event name; legacy names share their event's slug
+    for row in cursor.execute("SELECT event, total, generated, blocked FROM stats_events WHERE total > 0"):
+        event = events.get(describe_event(row["event"])[0])
+        if event is None:
+            continue
+        entry = counts.setdefault(event["id"], {
+            "slug": event["slug"], "display_name": event["display_name"], "total": 0, "blocked": 0, "with_cert": 0
+        })
+        entry["total"] += row["total"]
+        entry["blocked"] += row["blocked"]
+        entry["with_cert"] += row["generated"]
+    return [counts[event_id] for event_id in sorted(counts)]
+
+def _group_event_counts(clauses, params):
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    cursor = get_connection().cursor()
+    cursor.execute(f"""
+        SELECT e.slug, e.display_name, COUNT(*) AS total,
+               SUM(COALESCE(p.blocked, 0) = 1) AS blocked,
+               SUM(p.cert_url IS NOT NULL) AS with_cert
+        FROM participants p JOIN events e ON e.id = p.event_id
+        {where}
+        GROUP BY p.event_id
+        ORDER BY p.event_id
+    """, params)
+    return [dict(row) for row in cursor.fetchall()]
+
+def _fts_query(text):
+    """User input -> FTS5 query: every word must match as a prefix ("ali 24cs" -> "ali"* AND "24cs"*)"""
+    terms = re.findall(r"\w+", text.lower())
+    return " AND ".join(f'"{term}"*' for term in terms)
+
+def search_participants(text, limit=20):
+    """Ranked full-text/prefix matches on roll_no, name, department and canonical event name (roll and name weigh most)"""
+    query = _fts_query(text)
+    if not query:
+        return []
+    cursor = get_connection().cursor()
+    cursor.execute("""
+        SELECT p.id, p.roll_no, p.name, p.department, p.year, p.event, p.cert_url, p.blocked,
+               p.member_role, p.leader_roll_no, e.slug AS event_slug, e.display_name
+        FROM participants_fts f
+        JOIN participants p ON p.id = f.rowid
+        LEFT JOIN events e ON e.id = p.event_id
+        WHERE participants_fts MATCH ?
+        ORDER BY bm25(participants_fts, 10.0, 5.0, 1.0, 1.0)
+        LIMIT ?
+    """, (query, limit))
+    return [dict(row) for row in cursor.fetchall()]
+
+def set_cert_visibility(visible, event=None, department=None, year=None, ids=None):
+    """
+    Show/hide certificates for every participant matching the selector, in one
+    UPDATE and one transaction. Selector fields combine with AND; at least one
+    is required (use bulk_toggle_cert_visibility for everyone).
+    Returns the number of participants whose visibility changed.
+    """
+    clauses, params = _participant_filters(event=event, department=department, year=year, ids=ids)
+    if not clauses:
+        raise ValueError("set_cert_visibility needs an event, department, year or ids selector")
+    blocked = 0 if visible else 1
+    # Rows already in the requested state are not rewritten (or counted)
+    clauses.append("COALESCE(p.blocked, 0) != ?")
+    params.append(blocked)
+    
+    with transaction() as cursor:
+        cursor.execute(f"UPDATE participants AS p SET blocked = ? WHERE {' AND '.join(clauses)}", [blocked] + params)
+        changed = cursor.rowcount
+        if changed:
+            _bump_data_version(cursor)
+    return changed
 
 def toggle_cert_visibility(participant_id, visible):
     """Toggle certificate visibility using blocked field"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
     # Set blocked = 1 to hide, blocked = 0 to show
     blocked = 0 if visible else 1
-    cursor.execute("UPDATE participants SET blocked = ? WHERE id = ?", (blocked, participant_id))
-    conn.commit()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute("UPDATE participants SET blocked = ? WHERE id = ?", (blocked, participant_id))
+        _bump_data_version(cursor)
 
 def bulk_toggle_cert_visibility(visible):
     """Bulk toggle certificate visibility for ALL participants"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
     blocked = 0 if visible else 1
-    cursor.execute("UPDATE participants SET blocked = ?", (blocked,))
-    conn.commit()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute("UPDATE participants SET blocked = ?", (blocked,))
+        _bump_data_version(cursor)
 
 def is_participant_blocked(roll_no, event):
     """Check if a participant is blocked from getting certificate"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    cursor = get_connection().cursor()
     cursor.execute("SELECT blocked FROM participants WHERE roll_no = ? AND event = ?", (roll_no, event))
     row = cursor.fetchone()
-    conn.close()
     return row and row[0] == 1
 
 def get_stats():
-    """Get admin stats"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT COUNT(*) FROM participants")
-    total = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(DISTINCT roll_no) FROM participants")
-    unique_students = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(DISTINCT event) FROM participants")
-    events = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM participants WHERE cert_url IS NOT NULL")
-    certs_generated = cursor.fetchone()[0]
-    
-    conn.close()
+    """Get admin stats (maintained counters, see _migrate_stats)"""
+    return _stored_totals(get_connection().cursor())
+
+def _stored_totals(cursor):
+    # stats_events has one row per event, so summing it is constant-cost
+    cursor.execute("""
+        SELECT COALESCE(SUM(total), 0), COUNT(*), COALESCE(SUM(generated), 0),
+               (SELECT value FROM stats_totals WHERE name = 'unique_students')
+        FROM stats_events
+    """)
+    total, events, generated, unique_students = cursor.fetchone()
     return {
         "total_records": total,
-        "unique_students": unique_students,
+        "unique_students": unique_students or 0,
         "events": events,
-        "certs_generated": certs_generated
+        "certs_generated": generated
     }
+
+def get_event_stats():
+    """Per-event total / generated / blocked counts (maintained counters)"""
+    cursor = get_connection().cursor()
+    cursor.execute("SELECT event, total, generated, blocked FROM stats_events ORDER BY event")
+    return [dict(row) for row in cursor.fetchall()]
+
+def check_stats(fix=False):
+    """
+    Recompute all counters from participants and compare with the maintained ones.
+    Returns a list of drift descriptions (empty when consistent); fix=True rewrites the counters.
+    """
+    with transaction() as cursor:
+        totals, per_event, rolls = _expected_stats(cursor)
+        drift = []
+        
+        stored = _stored_totals(cursor)
+        for name, value in totals.items():
+            if stored.get(name) != value:
+                drift.append(f"{name}: stored {stored.get(name)}, actual {value}")
+        
+        cursor.execute("SELECT event, total, generated, blocked FROM stats_events")
+        stored_events = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+        for event in sorted(set(per_event) | set(stored_events)):
+            if stored_events.get(event) != per_event.get(event):
+                drift.append(f"event {event!r} (total, generated, blocked): stored {stored_events.get(event)}, actual {per_event.get(event)}")
+        
+        cursor.execute("SELECT roll_no, n FROM roll_counts")
+        stored_rolls = {row[0]: row[1] for row in cursor.fetchall()}
+        bad_rolls = [roll for roll in set(rolls) | set(stored_rolls) if stored_rolls.get(roll) != rolls.get(roll)]
+        if bad_rolls:
+            drift.append(f"roll_counts: {len(bad_rolls)} roll number(s) off, e.g. {sorted(bad_rolls)[:5]}")
+        
+        if drift and fix:
+            _rebuild_stats(cursor)
+            _bump_data_version(cursor)
+    return drift
@@ -0,0 +1,45 @@
+"""
+Canonical event names.
+
+Each registration sheet maps to one event, stored once in the events table with
+an integer id, a URL slug (used by /generate_cert), the display name shown on
+/verify and the admin dashboard, and the label printed on the certificate.
+The name cleanup below runs when events are registered (sync / migration),
+never per request.
+"""
+
+import re
+
+# Mapping for prettier certificate event names
+EVENT_MAPPING = {
+    "MARKUS 2K26 -  CODE ADAPT (Responses)": "CODE ADAPT",
+    "MARKUS Project Presentation 2k26 (Responses)": "PROJECT PRESENTATION",
+    "MARKUS Technical Quiz (Responses)": "TECHNICAL QUIZ",
+    "CHILL & SKILL (Responses)": "MINDSPRINT",
+    "UI/UX (Responses)": "UI/UX",
+    "Paper (Responses)": "PAPER PRESENTATION",
+    "Markus 2k26 - IPL AUCTION (Responses)": "IPL AUCTION"
+}
+
+_SLUG_STRIP = re.compile(r"[^a-z0-9]+")
+
+
+def display_name(raw_event):
+    """Canonical display name for a sheet name or a stored participants.event value"""
+    if raw_event in EVENT_MAPPING:
+        return EVENT_MAPPING[raw_event]
+    upper = raw_event.upper()
+    # Chill and Skill was renamed to Mindsprint
+    if ("CHILL" in upper and "SKILL" in upper) or "MINDSPRINT" in upper:
+        return "MINDSPRINT"
+    return (raw_event.replace("(Responses)", "").replace("MARKUS 2K26 - ", "")
+            .replace("Markus 2k26 - ", "").replace("MARKUS ", "").strip())
+
+def event_slug(raw_event):
+    """URL key, e.g. "UI/UX (Responses)" -> "ui-ux", "MINDSPRINT" -> "mindsprint" """
+    return _SLUG_STRIP.sub("-", display_name(raw_event).lower()).strip("-")
+
+def describe_event(raw_event):
+    """(slug, display_name, cert_label) row for the events table"""
+    name = display_name(raw_event)
+    return event_slug(raw_event), name, name
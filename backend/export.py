@@ -0,0 +1,81 @@
+"""
+Participant exports for the admin dashboard (CSV and XLSX).
+
+Rows come from database.iter_participants_export in batches, so memory stays
+flat however big the table is. CSV is streamed to the client as batches arrive.
+An .xlsx file is a zip whose directory is written last, so it cannot be sent
+before the query finishes; it is built in xlsxwriter's constant_memory mode
+(each row is flushed to a temp file as it is written) and then sent from disk.
+"""
+
+import csv
+import io
+import os
+import tempfile
+
+import xlsxwriter
+
+from backend.database import EXPORT_COLUMNS, iter_participants_export
+
+# Spreadsheet apps run a CSV cell starting with one of these as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def csv_safe(value):
+    """Form answers go out as text: a leading ' keeps Excel from evaluating them"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def csv_chunks(batches):
+    """One encoded CSV chunk per row batch (header first), BOM so Excel reads UTF-8 names"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([csv_safe(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+
+def write_xlsx(batches, path):
+    """Write row batches to an .xlsx at path; returns the number of data rows"""
+    workbook = xlsxwriter.Workbook(path, {
+        "constant_memory": True,
+        # Participant data is text: "=..." is not a formula and cert links are not hyperlinks
+        # (a sheet holds at most 65,530 of those)
+        "strings_to_formulas": False,
+        "strings_to_urls": False,
+    })
+    sheet = workbook.add_worksheet("Participants")
+    bold = workbook.add_format({"bold": True})
+    # constant_memory writes rows in order, so widths/freeze panes go first
+    sheet.freeze_panes(1, 0)
+    sheet.set_column(0, 0, 14)
+    sheet.set_column(1, 1, 28)
+    sheet.set_column(4, 5, 22)
+    sheet.set_column(8, 8, 48)
+    sheet.write_row(0, 0, EXPORT_COLUMNS, bold)
+
+    count = 0
+    for rows in batches:
+        for row in rows:
+            count += 1
+            sheet.write_row(count, 0, row)
+    workbook.close()
+    return count
+
+def export_csv(**filters):
+    """Iterator of CSV bytes for participants matching the admin filters"""
+    return csv_chunks(iter_participants_export(**filters))
+
+def export_xlsx(**filters):
+    """Build the filtered export in a temp file and return its path (caller removes it)"""
+    fd, path = tempfile.mkstemp(prefix="participants_", suffix=".xlsx")
+    os.close(fd)
+    try:
+        write_xlsx(iter_participants_export(**filters), path)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
@@ -0,0 +1,53 @@
+"""
+HTTP conditional-request helpers (ETag / If-None-Match).
+
+/verify pages are tagged from the roll's records, so a refresh with nothing
+changed is answered with an empty 304. Locally stored certificates (/c/) use
+their content hash as the ETag and are cached as immutable.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from fastapi import Response
+
+# Pages must be revalidated, but a matching ETag costs no rendering
+REVALIDATE = "no-cache"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+_file_hashes = {}  # path -> (mtime_ns, size, sha256)
+_file_hashes_lock = threading.Lock()
+
+
+def etag_for(*parts):
+    """Strong ETag over JSON-serializable parts"""
+    digest = hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+def etag_matches(request, etag):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in [tag.strip() for tag in header.split(",")]
+
+def not_modified(etag, cache_control=REVALIDATE):
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+def file_hash(path):
+    """sha256 of a file's contents, memoized until its mtime/size change"""
+    stat = os.stat(path)
+    cached = _file_hashes.get(path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _file_hashes_lock:
+        _file_hashes[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
@@ -0,0 +1,146 @@
+"""
+Offline bulk import of registration exports (CSV / XLSX).
+Run: python -m backend.importer FILE [FILE ...] [--event NAME] [--batch-size N] [--rejects PATH]
+
+Rows go through the same header detection (resolve_layout) and normalization
+(parse_rows) as sync. Each file is read row by row and written batch by batch,
+one transaction per batch, so memory stays bounded by --batch-size whatever
+the file size and other writers are never locked out for the whole file. A
+file that fails part-way keeps the batches before the error; fix it and import
+it again to finish (rows are upserted, never duplicated).
+
+XLSX is read with openpyxl (read-only mode), imported only when an .xlsx file
+is given. Imported rows are not tracked as sheet sync state, so a later
+sync_data() never deletes them as "removed from the sheet".
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from itertools import islice
+
+from backend.database import init_db, save_participant_batches
+from backend.events import display_name
+from backend.sheet_layout import resolve_layout
+from backend.sheet_parser import parse_rows, MIN_ROLL_LENGTH
+
+BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 2000))
+
+
+def _iter_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.reader(f)
+
+def _iter_xlsx(path):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise RuntimeError("Reading .xlsx files needs openpyxl (pip install openpyxl)") from None
+    # read_only streams the sheet XML instead of loading every cell
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield ["" if cell is None else str(cell) for cell in row]
+    finally:
+        workbook.close()
+
+def iter_file_rows(path):
+    """Rows of a CSV/XLSX export as lists of strings, header row first"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return _iter_csv(path)
+    if ext in (".xlsx", ".xlsm"):
+        return _iter_xlsx(path)
+    raise ValueError(f"Unsupported file type '{ext}' (expected .csv or .xlsx)")
+
+
+def _parse_batches(rows, layout, event_name, sheet_name, batch_size, stats, rejects):
+    """Yield parse_rows() output batch by batch, counting (and optionally recording) rejected rows"""
+    roll_idx = layout.roll
+    line_no = 1  # header
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            return
+        valid = []
+        for row in chunk:
+            line_no += 1
+            if not any(cell.strip() for cell in row):
+                stats["blank"] += 1
+                continue
+            # Same rule parse_rows applies silently, checked here so rejects can be reported
+            if roll_idx == -1 or roll_idx >= len(row) or len(row[roll_idx].strip()) < MIN_ROLL_LENGTH:
+                stats["rejected"] += 1
+                if rejects is not None:
+                    rejects.writerow([sheet_name, line_no, "invalid roll number"] + row)
+                continue
+            valid.append(row)
+
+        leaders, skipped = parse_rows(valid, layout.name, layout.roll, layout.dept, layout.year,
+                                      layout.members, event_name, sheet_name)
+        stats["rows"] += len(chunk)
+        stats["leaders"] += len(leaders)
+        stats["members"] += sum(len(leader["team_members"]) for leader in leaders)
+        stats["skipped_members"] += skipped
+        yield leaders
+
+def import_file(path, event=None, batch_size=BATCH_SIZE, rejects=None):
+    """
+    Import one CSV/XLSX export. The event defaults to the file name run through
+    the sheet-name mapping (e.g. "MARKUS Technical Quiz (Responses).csv").
+    `rejects` is an optional csv.writer that receives every rejected row.
+    Returns a stats dict (rows, leaders, members, rejected, blank, seconds).
+    """
+    sheet_name = os.path.splitext(os.path.basename(path))[0]
+    event_name = display_name(event or sheet_name)
+    stats = {"rows": 0, "leaders": 0, "members": 0, "rejected": 0, "blank": 0, "skipped_members": 0}
+
+    start = time.perf_counter()
+    rows = iter(iter_file_rows(path))
+    headers = next(rows, None)
+    if headers:
+        layout = resolve_layout(headers)
+        if layout.roll == -1:
+            raise ValueError(f"No roll number column found in {path}")
+        save_participant_batches(_parse_batches(rows, layout, event_name, sheet_name, batch_size, stats, rejects))
+    stats["seconds"] = time.perf_counter() - start
+    stats["event"] = event_name
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import participants from CSV/XLSX registration exports")
+    parser.add_argument("files", nargs="+", help=".csv or .xlsx files (first sheet, header row first)")
+    parser.add_argument("--event", help="Event name for every file (default: derived from each file name)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows parsed and written per batch")
+    parser.add_argument("--rejects", help="Write rejected rows (with file and line number) to this CSV")
+    args = parser.parse_args()
+
+    init_db()
+    rejects_file = open(args.rejects, "w", newline="", encoding="utf-8") if args.rejects else None
+    rejects = csv.writer(rejects_file) if rejects_file else None
+    failed = 0
+    try:
+        for path in args.files:
+            print(f"📥 Importing: {path}")
+            try:
+                stats = import_file(path, event=args.event, batch_size=max(1, args.batch_size), rejects=rejects)
+            except Exception as e:
+                failed += 1
+                print(f"   ❌ Import failed (earlier batches were saved; re-run to finish): {e}")
+                continue
+            rate = stats["rows"] / stats["seconds"] if stats["seconds"] else 0
+            print(f"   ✅ {stats['event']}: {stats['leaders']} leaders + {stats['members']} members from "
+                  f"{stats['rows']} rows in {stats['seconds']:.2f}s ({rate:,.0f} rows/s)")
+            if stats["rejected"] or stats["skipped_members"]:
+                print(f"   ⚠️ {stats['rejected']} row(s) rejected (invalid roll number), "
+                      f"{stats['skipped_members']} duplicate member roll(s) skipped")
+    finally:
+        if rejects_file:
+            rejects_file.close()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+In-memory cache of per-roll-number lookups for /verify and /generate_cert.
+
+Entries are bounded (LRU) and expire after a TTL. Every write that changes what
+a participant sees bumps the data version stored in SQLite (meta table), so a
+cached list is only served while the version it was read at is still current.
+Writes from this process are noticed immediately; writes from other workers
+within VERSION_CHECK_INTERVAL seconds.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from backend import database
+
+CACHE_SIZE = int(os.getenv("ROLL_CACHE_SIZE", 5000))
+CACHE_TTL = float(os.getenv("ROLL_CACHE_TTL", 300))
+VERSION_CHECK_INTERVAL = float(os.getenv("ROLL_CACHE_VERSION_CHECK", 1.0))
+
+
+class RollCache:
+    def __init__(self, loader=None, maxsize=CACHE_SIZE, ttl=CACHE_TTL, version_check_interval=VERSION_CHECK_INTERVAL):
+        self.loader = loader or database.get_events_for_roll
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # roll_no -> (version, loaded_at, events)
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked_at = 0.0
+        self._local_version_seen = None
+
+    def data_version(self):
+        """Current data version, re-read from SQLite at most every version_check_interval"""
+        now = time.monotonic()
+        if (self._version is None or database.local_data_version != self._local_version_seen
+                or now - self._version_checked_at >= self.version_check_interval):
+            self._local_version_seen = database.local_data_version
+            self._version = database.get_data_version()
+            self._version_checked_at = now
+        return self._version
+
+    def get(self, roll_no):
+        """Participant records for roll_no (copies, safe to modify)"""
+        version = self.data_version()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(roll_no)
+            if entry and entry[0] == version and now - entry[1] < self.ttl:
+                self._entries.move_to_end(roll_no)
+                self.hits += 1
+                return [dict(e) for e in entry[2]]
+            self.misses += 1
+
+        events = self.loader(roll_no)
+        with self._lock:
+            self._entries[roll_no] = (version, now, events)
+            self._entries.move_to_end(roll_no)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return [dict(e) for e in events]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self._version = None
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "size": len(self._entries),
+            "max_size": self.maxsize,
+            "data_version": self._version,
+        }
+
+
+roll_cache = RollCache()
+
+def get_events_cached(roll_no):
+    return roll_cache.get(roll_no)
@@ -0,0 +1,159 @@
+# pregenerate.py - Render and store (CERT_STORE) every pending certificate ahead of result day
+#
+# Usage:
+#   python backend/pregenerate.py                 # everything without a cert_url
+#   python backend/pregenerate.py --event "UI/UX"
+#   python backend/pregenerate.py --dry-run
+#
+# Only rows with a NULL cert_url are picked up and URLs are written back in
+# batches, so an interrupted run can simply be started again. With
+# CERT_REPLICATE_TO_CDN, certificates whose CDN copy failed are copied again.
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database import init_db, get_pending_certificates, update_cert_urls, get_cert_url_by_fingerprint
+from backend.certificate import render_fingerprint
+from backend.cert_versions import invalidate_stale_certificates
+from backend.workers import (
+    _init_render_worker, _render_job, _store_job, schedule_replication, replicate_local_certificates, UPLOAD_WORKERS
+)
+
+
+def pregenerate(event=None, dry_run=False, render_workers=None, upload_workers=UPLOAD_WORKERS, batch_size=50):
+    init_db()
+    # Certificates whose name/label/template changed since they were rendered become pending again
+    versions = invalidate_stale_certificates(event, dry_run=dry_run)
+    stale = versions["stale"]
+    # With CERT_REPLICATE_TO_CDN, certificates whose CDN copy failed are still local: copy them again
+    local, copied = replicate_local_certificates(event, dry_run=dry_run)
+    if local:
+        print(f"☁️ {local} certificate(s) served from the local store" +
+              (" (dry run)" if dry_run else f", {copied} copied to the CDN"))
+    pending = get_pending_certificates(event)
+    total = len(pending)
+
+    if dry_run:
+        # Nothing was cleared, so the out-of-date certificates come on top of the
+        # pending ones - except hidden rows, which the real run skips
+        total += stale - versions["stale_blocked"]
+        print(f"🎓 {total} certificate(s) would be rendered" + (f" for {event}" if event else "") +
+              f" ({stale} out of date)")
+        for name, count in sorted(Counter(row["event"] for row in pending).items()):
+            print(f"   {name}: {count} pending")
+        return {"pending": total, "stale": stale, "generated": 0, "failed": 0}
+
+    print(f"🎓 {total} certificate(s) pending" + (f" for {event}" if event else ""))
+    if not pending:
+        return {"pending": 0, "stale": stale, "generated": 0, "failed": 0}
+
+    render_workers = render_workers or os.cpu_count() or 1
+    render_pool = ProcessPoolExecutor(
+        max_workers=render_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_render_worker,
+    )
+    upload_pool = ThreadPoolExecutor(max_workers=upload_workers, thread_name_prefix="cert-upload")
+
+    # Keep a bounded window of renders/uploads in flight so memory stays flat
+    max_in_flight = (render_workers + upload_workers) * 2
+    jobs = {}  # future -> (stage, row)
+    rows = iter(pending)
+    batch = []
+    generated = failed = 0
+    start = time.perf_counter()
+
+    def flush():
+        if batch:
+            update_cert_urls(batch)
+            # Locally stored certificates get their CDN copy once the URL is saved
+            for _, url, fingerprint in batch:
+                schedule_replication(url, fingerprint)
+            batch.clear()
+
+    def report():
+        elapsed = time.perf_counter() - start
+        rate = generated / elapsed if elapsed else 0.0
+        print(f"   📈 {generated + failed}/{total} done ({generated} ok, {failed} failed) - {rate:.2f} certs/sec")
+
+    try:
+        while True:
+            while len(jobs) < max_in_flight:
+                row = next(rows, None)
+                if row is None:
+                    break
+                row["fingerprint"] = render_fingerprint(row["name"], row["year"], row["cert_label"], row["department"] or "")
+                url = get_cert_url_by_fingerprint(row["fingerprint"])
+                if url:
+                    # Same text + template as a stored certificate: no render, no upload
+                    batch.append((row["id"], url, row["fingerprint"]))
+                    generated += 1
+                    continue
+                fut = render_pool.submit(
+                    _render_job, row["name"], row["year"], row["cert_label"], row["department"] or ""
+                )
+                jobs[fut] = ("render", row)
+
+            if not jobs:
+                break
+
+            finished, _ = wait(jobs, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                stage, row = jobs.pop(fut)
+                try:
+                    result = fut.result()
+                    if not result:
+                        raise RuntimeError("upload returned no URL")
+                except Exception as e:
+                    failed += 1
+                    print(f"   ❌ {row['roll_no']} / {row['event']}: {e}")
+                    continue
+
+                if stage == "render":
+                    # result is the encoded PNG, passed to the store without a temp file
+                    jobs[upload_pool.submit(_store_job, result)] = ("upload", row)
+                else:
+                    batch.append((row["id"], result, row["fingerprint"]))
+                    generated += 1
+                    if len(batch) >= batch_size:
+                        flush()
+                        report()
+    except KeyboardInterrupt:
+        print("\n⏹️ Interrupted - saving finished certificates, re-run to resume.")
+    finally:
+        flush()
+        render_pool.shutdown(wait=False, cancel_futures=True)
+        upload_pool.shutdown(wait=False, cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Generated {generated} certificate(s), {failed} failed, in {elapsed:.1f}s ({generated / elapsed if elapsed else 0.0:.2f} certs/sec)")
+    return {"pending": total, "stale": stale, "generated": generated, "failed": failed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate and upload pending certificates")
+    parser.add_argument("--event", help="Only this event (slug or name, e.g. technical-quiz)")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be generated")
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (default: all cores)")
+    parser.add_argument("--upload-workers", type=int, default=UPLOAD_WORKERS, help="Concurrent uploads")
+    parser.add_argument("--batch-size", type=int, default=50, help="URLs written per transaction")
+    args = parser.parse_args()
+
+    pregenerate(
+        event=args.event,
+        dry_run=args.dry_run,
+        render_workers=args.workers,
+        upload_workers=args.upload_workers,
+        batch_size=args.batch_size,
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Header-row schema detection for registration sheets.
+
+resolve_layout(headers) maps a header row to the columns sync needs (leader
+name/roll/department/year plus paired team member name/roll columns) in one
+pass over the headers, using precompiled patterns. Layouts are memoized by a
+hash of the header row, so repeat syncs of the same sheet do no rescanning.
+"""
+
+import hashlib
+import re
+import threading
+from collections import namedtuple
+
+# Leader fields, matched against lowercased headers (first header containing any keyword wins)
+FIELD_KEYWORDS = {
+    "name": ["name with initial", "name", "student name", "full name", "leader name"],
+    "roll": ["roll no", "roll", "reg", "registration", "leader roll"],
+    "dept": ["department", "dept", "branch"],
+    "year": ["year", "yr", "batch"],
+}
+FIELD_PATTERNS = {
+    field: re.compile("|".join(re.escape(k) for k in keywords))
+    for field, keywords in FIELD_KEYWORDS.items()
+}
+
+# "Team Member 1 Name", "member 2 roll no", ...
+MEMBER_PATTERN = re.compile(r'(?:team\s*)?member\s*(\d+)')
+MEMBER_ROLL_PATTERN = re.compile(r'roll|reg')
+
+# name/roll/dept/year are header indices (-1 when missing);
+# members is a tuple of (name_idx, roll_idx, member_num) sorted by member number
+SheetLayout = namedtuple("SheetLayout", ["name", "roll", "dept", "year", "members", "unmatched", "ambiguous"])
+
+_CACHE_SIZE = 256
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def header_key(headers):
+    return hashlib.sha1("\x1f".join(headers).encode("utf-8")).hexdigest()
+
+def resolve_layout(headers):
+    """Column layout for a header row (memoized by header hash)"""
+    key = header_key(headers)
+    layout = _cache.get(key)
+    if layout is None:
+        layout = _build_layout(headers)
+        with _cache_lock:
+            if len(_cache) >= _CACHE_SIZE:
+                _cache.clear()
+            _cache[key] = layout
+    return layout
+
+def _build_layout(headers):
+    fields = {field: [] for field in FIELD_PATTERNS}
+    member_names = {}
+    member_rolls = {}
+
+    for idx, h in enumerate(headers):
+        h_lower = h.lower()
+
+        match = MEMBER_PATTERN.search(h_lower)
+        if match:
+            num = match.group(1)
+            if "name" in h_lower:
+                member_names.setdefault(num, []).append(idx)
+            if MEMBER_ROLL_PATTERN.search(h_lower):
+                member_rolls.setdefault(num, []).append(idx)
+
+        for field, pattern in FIELD_PATTERNS.items():
+            if pattern.search(h_lower):
+                fields[field].append(idx)
+
+    def first(field):
+        return fields[field][0] if fields[field] else -1
+
+    members = []
+    ambiguous = []
+    for num in sorted(member_names, key=int):
+        rolls = member_rolls.get(num, [])
+        for name_idx in member_names[num]:
+            members.append((name_idx, rolls[0] if rolls else -1, num))
+        if len(member_names[num]) > 1 or len(rolls) > 1:
+            ambiguous.append(f"member {num}: {len(member_names[num])} name / {len(rolls)} roll columns")
+        elif not rolls:
+            ambiguous.append(f"member {num}: name column without a roll column")
+
+    member_columns = {i for name_idx, roll_idx, _ in members for i in (name_idx, roll_idx) if i != -1}
+    for field, matches in fields.items():
+        # Member columns also say "name"/"roll"; only competing leader columns are ambiguous
+        leader_matches = [i for i in matches if i not in member_columns]
+        if len(leader_matches) > 1:
+            ambiguous.append(f"{field}: {', '.join(repr(headers[i]) for i in leader_matches)}")
+
+    layout = SheetLayout(
+        name=first("name"), roll=first("roll"), dept=first("dept"), year=first("year"),
+        members=tuple(members), unmatched=(), ambiguous=tuple(ambiguous),
+    )
+    used = {layout.name, layout.roll, layout.dept, layout.year} | member_columns
+    return layout._replace(unmatched=tuple(h for i, h in enumerate(headers) if i not in used))
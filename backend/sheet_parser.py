@@ -0,0 +1,78 @@
+"""
+Sheet row parsing.
+
+Takes get_all_values() rows plus the detected column indices and produces the
+leader records sync writes (roll_no, name, dept, year, event, sheet_source,
+team_members) in a single pass. Column lookups are resolved once per sheet
+instead of being bounds-checked per cell, and the per-team dedup set is only
+built for teams that actually list members.
+"""
+
+import sys
+
+MIN_ROLL_LENGTH = 5
+
+# Fallback Year extraction from Roll prefix
+ROLL_PREFIX_YEARS = {"25": "I", "24": "II", "23": "III", "22": "IV"}
+
+# Index that is never < len(row): stands in for "column not found" (-1)
+_MISSING = sys.maxsize
+
+
+def _resolve(idx):
+    return _MISSING if idx == -1 else idx
+
+
+def parse_rows(data_rows, idx_name, idx_roll, idx_dept, idx_year, team_member_cols, event_name, sheet_name):
+    """
+    Parse data rows (no header) into leader records.
+
+    team_member_cols: list of (name_idx, roll_idx, member_num) sorted by member number.
+    Returns (leaders, skipped_duplicate_member_rolls).
+    """
+    i_name, i_roll, i_dept, i_year = _resolve(idx_name), _resolve(idx_roll), _resolve(idx_dept), _resolve(idx_year)
+    member_cols = [(name_idx, _resolve(roll_idx)) for name_idx, roll_idx, _ in team_member_cols]
+    prefix_year = ROLL_PREFIX_YEARS.get
+
+    leaders = []
+    skipped_duplicates = 0
+    for row in data_rows:
+        # Google Sheets drops trailing empty cells, so short rows mean "empty"
+        n = len(row)
+        leader_roll = row[i_roll].strip().upper() if i_roll < n else ""
+
+        # Basic validation for leader
+        if len(leader_roll) < MIN_ROLL_LENGTH:
+            continue
+
+        year = (row[i_year].strip() if i_year < n else "") or prefix_year(leader_roll[:2], "")
+
+        # Team members need a name AND a valid roll number; duplicate rolls
+        # (including the leader's own) only get one certificate
+        team_members_data = []
+        seen = None
+        for name_idx, roll_idx in member_cols:
+            if roll_idx >= n:
+                continue
+            member_roll = row[roll_idx].strip().upper()
+            if len(member_roll) < MIN_ROLL_LENGTH:
+                continue
+            member_name = row[name_idx].strip() if name_idx < n else ""
+            if not member_name:
+                continue
+            if member_roll == leader_roll or (seen is not None and member_roll in seen):
+                skipped_duplicates += 1
+                continue
+            if seen is None:
+                seen = set()
+            seen.add(member_roll)
+            team_members_data.append({"name": member_name, "roll_no": member_roll})
+
+        leaders.append({
+            "roll_no": leader_roll,
+            "name": row[i_name].strip().upper() if i_name < n else "",
+            "dept": row[i_dept].strip() if i_dept < n else "",
+            "year": year,
+            "event": event_name, "sheet_source": sheet_name, "team_members": team_members_data,
+        })
+    return leaders, skipped_duplicates
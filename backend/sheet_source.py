@@ -0,0 +1,165 @@
+"""
+Where sync reads registration sheets from.
+
+A SheetSource returns a sheet as get_all_values()-style rows (header row first).
+GoogleSheetSource talks to Google Sheets through gspread; LocalSheetSource reads
+CSV/JSON exports from a directory so the whole sync can run offline.
+fetch_sheets() pulls several sheets concurrently with per-sheet retry.
+"""
+
+import csv
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import gspread
+from google.oauth2.service_account import Credentials
+
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
+
+FETCH_WORKERS = int(os.getenv("SYNC_FETCH_WORKERS", 4))
+FETCH_RETRIES = int(os.getenv("SYNC_FETCH_RETRIES", 3))
+FETCH_BACKOFF = float(os.getenv("SYNC_FETCH_BACKOFF", 1.0))
+
+
+def get_credentials():
+    # Check env var first (Render)
+    json_env = os.getenv("GOOGLE_CREDENTIALS_JSON")
+    if json_env:
+        creds_dict = json.loads(json_env)
+        return Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
+
+    # Local file
+    json_path = os.path.join(os.path.dirname(__file__), "markus.json")
+    if not os.path.exists(json_path):
+        print("❌ DB Sync Error: Credentials not found.")
+        return None
+    return Credentials.from_service_account_file(json_path, scopes=SCOPES)
+
+def get_client():
+    creds = get_credentials()
+    if not creds:
+        return None
+    return gspread.authorize(creds)
+
+
+class SheetSource:
+    """Base interface: fetch(sheet_name) -> list of rows (lists of strings), header row first"""
+
+    def fetch(self, sheet_name):
+        raise NotImplementedError
+
+    def is_retryable(self, exc):
+        """Whether a failed fetch is worth retrying (network blips yes, missing sheets no)"""
+        return True
+
+
+class GoogleSheetSource(SheetSource):
+    def __init__(self, creds):
+        self.creds = creds
+        self._local = threading.local()
+
+    def _client(self):
+        # One gspread client (and HTTP session) per fetch thread
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = gspread.authorize(self.creds)
+        return client
+
+    def fetch(self, sheet_name):
+        spreadsheet = self._client().open(sheet_name)
+
+        # Special handling for UI/UX sheet to target 'Form Responses 1'
+        if "UI/UX" in sheet_name:
+            try:
+                sheet = spreadsheet.worksheet("Form Responses 1")
+            except gspread.WorksheetNotFound:
+                print(f"   ⚠️ 'Form Responses 1' not found in {sheet_name}, falling back to first sheet")
+                sheet = spreadsheet.sheet1
+        else:
+            sheet = spreadsheet.sheet1
+
+        return sheet.get_all_values()
+
+    def is_retryable(self, exc):
+        return not isinstance(exc, (gspread.SpreadsheetNotFound, gspread.WorksheetNotFound))
+
+
+class LocalSheetSource(SheetSource):
+    """
+    Reads sheets from a directory of exports named after the sheet, e.g.
+    "UI_UX (Responses).csv" or "Paper (Responses).json" ('/' becomes '_').
+    JSON files hold a list of rows, exactly like get_all_values().
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    @staticmethod
+    def filename_for(sheet_name):
+        return sheet_name.replace("/", "_")
+
+    def path_for(self, sheet_name):
+        base = os.path.join(self.directory, self.filename_for(sheet_name))
+        for ext in (".csv", ".json"):
+            if os.path.exists(base + ext):
+                return base + ext
+        raise FileNotFoundError(f"No .csv or .json export for '{sheet_name}' in {self.directory}")
+
+    def fetch(self, sheet_name):
+        path = self.path_for(sheet_name)
+        if path.endswith(".json"):
+            with open(path, encoding="utf-8") as f:
+                return [[str(cell) for cell in row] for row in json.load(f)]
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            return [row for row in csv.reader(f)]
+
+    def is_retryable(self, exc):
+        return not isinstance(exc, FileNotFoundError)
+
+
+def get_sheet_source(directory=None):
+    """Local exports when SHEET_SOURCE_DIR (or `directory`) is set, otherwise Google Sheets"""
+    directory = directory or os.getenv("SHEET_SOURCE_DIR")
+    if directory:
+        return LocalSheetSource(directory)
+    creds = get_credentials()
+    if not creds:
+        return None
+    return GoogleSheetSource(creds)
+
+
+def fetch_with_retry(source, sheet_name, retries=FETCH_RETRIES, backoff=FETCH_BACKOFF):
+    attempt = 0
+    while True:
+        try:
+            return source.fetch(sheet_name)
+        except Exception as e:
+            attempt += 1
+            if attempt > retries or not source.is_retryable(e):
+                raise
+            delay = backoff * (2 ** (attempt - 1)) * (1 + random.random() * 0.25)
+            print(f"   ⚠️ Fetch failed for {sheet_name} ({e}), retry {attempt}/{retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+def fetch_sheets(source, sheet_names, max_workers=FETCH_WORKERS, retries=FETCH_RETRIES, backoff=FETCH_BACKOFF):
+    """
+    Fetch sheets concurrently. Yields (sheet_name, rows, error, seconds) in the
+    order of `sheet_names`, so whatever consumes them stays deterministic.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="sheet-fetch") as pool:
+        def timed_fetch(name):
+            start = time.perf_counter()
+            rows = fetch_with_retry(source, name, retries, backoff)
+            return rows, time.perf_counter() - start
+
+        futures = [(name, pool.submit(timed_fetch, name)) for name in sheet_names]
+        for name, fut in futures:
+            try:
+                rows, seconds = fut.result()
+                yield name, rows, None, seconds
+            except Exception as e:
+                yield name, None, e, None
@@ -0,0 +1,63 @@
+"""
+Single-flight certificate generation.
+
+Within a worker, concurrent requests for the same key share one asyncio task.
+Across uvicorn workers, a row in cert_claims decides which worker renders;
+the others poll the database until the winner has stored the URL.
+"""
+
+import asyncio
+import os
+import socket
+
+from backend.database import claim_certificate, certificate_claimed_by_other, release_certificate_claim, get_cert_url
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+CLAIM_POLL_INTERVAL = float(os.getenv("CERT_CLAIM_POLL_INTERVAL", 0.25))
+CLAIM_STALE_AFTER = float(os.getenv("CERT_CLAIM_STALE_AFTER", 120))
+
+_inflight = {}
+
+
+async def run_once(key, produce):
+    """
+    Await the in-flight job for `key`, starting `produce()` if there is none.
+    The job is shielded so one client disconnecting does not cancel it for the others.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(produce())
+        _inflight[key] = task
+        task.add_done_callback(lambda _t: _inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+async def claim_or_wait(roll_no, event, produce):
+    """
+    Run `produce()` only if this worker holds the SQLite claim for roll/event.
+    Otherwise wait for whichever worker does to store the certificate URL
+    (taking the claim over if that worker goes quiet for CLAIM_STALE_AFTER).
+    Database calls run in threads: a claim write can wait on SQLite's busy
+    timeout while a sync holds the write lock, and must not stall the loop.
+    """
+    while True:
+        # Waiting is read-only; the claim write is only tried once nobody holds a live claim
+        held = await asyncio.to_thread(certificate_claimed_by_other, roll_no, event, WORKER_ID, CLAIM_STALE_AFTER)
+        if not held and await asyncio.to_thread(claim_certificate, roll_no, event, WORKER_ID, CLAIM_STALE_AFTER):
+            break
+        await asyncio.sleep(CLAIM_POLL_INTERVAL)
+        url = await asyncio.to_thread(get_cert_url, roll_no, event)
+        if url:
+            return url
+
+    try:
+        # Another worker may have finished between our last poll and the claim
+        url = await asyncio.to_thread(get_cert_url, roll_no, event)
+        if url:
+            return url
+        return await produce()
+    finally:
+        await asyncio.to_thread(release_certificate_claim, roll_no, event, WORKER_ID)
+
+async def generate_once(roll_no, event, produce):
+    """Deduplicate certificate generation for (roll_no, event) in-process and across workers"""
+    return await run_once((roll_no, event), lambda: claim_or_wait(roll_no, event, produce))
@@ -0,0 +1,34 @@
+"""
+Admin stats consistency check.
+Run: python -m backend.stats_check [--fix]
+
+Recomputes every maintained counter (per-event totals, unique students) from
+the participants table and reports any drift; --fix rewrites the counters.
+"""
+
+import argparse
+import sys
+
+from backend.database import init_db, check_stats, get_stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Check maintained admin stats against participants")
+    parser.add_argument("--fix", action="store_true", help="Rewrite the counters when they drifted")
+    args = parser.parse_args()
+
+    init_db()
+    drift = check_stats(fix=args.fix)
+    if not drift:
+        print(f"✅ Stats consistent: {get_stats()}")
+        return 0
+
+    print(f"⚠️ {len(drift)} counter(s) drifted:")
+    for line in drift:
+        print(f"   {line}")
+    if args.fix:
+        print(f"🛠️ Counters rebuilt: {get_stats()}")
+        return 0
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
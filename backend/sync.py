@@ -1,10 +1,13 @@
-import gspread
-from google.oauth2.service_account import Credentials
-import pandas as pd
-import os
 import json
-import re
-from backend.database import save_participant, init_db
+import argparse
+import hashlib
+import time
+from backend.database import init_db, get_sheet_sync_state, apply_sheet_sync, register_events
+from backend.events import EVENT_MAPPING, display_name  # EVENT_MAPPING re-exported for older callers
+from backend.sheet_parser import parse_rows
+from backend.sheet_layout import resolve_layout
+from backend.cert_versions import invalidate_stale_certificates
+from backend.sheet_source import get_client, get_sheet_source, fetch_sheets  # get_client re-exported for older callers
 
 # Sheet Configs
 SHEETS = [
@@ -17,170 +20,132 @@ SHEETS = [
     "Markus 2k26 - IPL AUCTION (Responses)"
 ]
 
-def get_client():
-    scope = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
+def parse_sheet(rows, event_name, sheet_name):
+    """Turn raw sheet values (header row first) into leader records with their team members"""
+    headers = rows[0]
+    print(f"   Headers: {headers[:5]}...")  # Debug: show first 5 headers
     
-    # Check env var first (Render)
-    json_env = os.getenv("GOOGLE_CREDENTIALS_JSON")
-    if json_env:
-        creds_dict = json.loads(json_env)
-        creds = Credentials.from_service_account_info(creds_dict, scopes=scope)
-    else:
-        # Local file
-        json_path = os.path.join(os.path.dirname(__file__), "markus.json")
-        if not os.path.exists(json_path):
-            print("❌ DB Sync Error: Credentials not found.")
-            return None
-        creds = Credentials.from_service_account_file(json_path, scopes=scope)
+    # Column layout (memoized per distinct header row)
+    layout = resolve_layout(headers)
+    if layout.roll == -1:
+        # Without roll numbers every stored row would look removed: fail the sheet instead
+        raise ValueError(f"No roll number column found in {sheet_name}")
     
-    return gspread.authorize(creds)
-
-def find_column(headers, keywords):
-    """Smart search for column index"""
-    for idx, h in enumerate(headers):
-        h_lower = h.lower()
-        for k in keywords:
-            if k in h_lower:
-                return idx
-    return -1
-
-
-# Mapping for prettier certificate event names
-EVENT_MAPPING = {
-    "MARKUS 2K26 -  CODE ADAPT (Responses)": "CODE ADAPT",
-    "MARKUS Project Presentation 2k26 (Responses)": "PROJECT PRESENTATION",
-    "MARKUS Technical Quiz (Responses)": "TECHNICAL QUIZ",
-    "CHILL & SKILL (Responses)": "MINDSPRINT",
-    "UI/UX (Responses)": "UI/UX",
-    "Paper (Responses)": "PAPER PRESENTATION",
-    "Markus 2k26 - IPL AUCTION (Responses)": "IPL AUCTION"
-}
-
-def sync_data():
+    print(f"   Column indices - Name:{layout.name}, Roll:{layout.roll}, Dept:{layout.dept}, Year:{layout.year}")
+    if layout.members:
+        print(f"   Team member columns: {[(f'Name:{n}, Roll:{r}') for n, r, _ in layout.members]}")
+    for problem in layout.ambiguous:
+        print(f"   ⚠️ Ambiguous headers - {problem}")
+    if layout.unmatched:
+        print(f"   Unmatched headers: {list(layout.unmatched)}")
+    
+    # Process Rows (normalization, validation, year fallback, member dedup)
+    leaders, skipped_duplicates = parse_rows(
+        rows[1:], layout.name, layout.roll, layout.dept, layout.year, layout.members, event_name, sheet_name
+    )
+    if skipped_duplicates:
+        print(f"   ⚠️ Skipped {skipped_duplicates} duplicate team member roll(s)")
+    return leaders
+
+
+def _sheet_fingerprint(event_name, rows):
+    return hashlib.sha256(json.dumps([event_name, rows], ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def _row_hash(leader):
+    return hashlib.sha256(json.dumps(leader, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def sync_data(full=False, source=None, on_sheet=None):
+    """
+    Incremental sync: sheets whose content fingerprint is unchanged are skipped,
+    and within a changed sheet only inserted/updated/removed leaders are written.
+    Pass full=True to re-apply every row regardless of stored hashes.
+    
+    Sheets are fetched concurrently from `source` (default: get_sheet_source()),
+    then parsed and written one at a time in SHEETS order. `on_sheet(result)` is
+    called after each sheet with its status, timings and row counts.
+    """
     print("🔄 Syncing Data...")
     init_db()
-    client = get_client()
-    if not client: return
+    source = source or get_sheet_source()
+    if not source: return
+    register_events(EVENT_MAPPING.values())
+
+    summary = {"sheets_skipped": 0, "sheets_failed": 0, "unchanged": 0, "inserted": 0, "updated": 0, "deleted": 0}
 
-    for sheet_name in SHEETS:
+    for sheet_name, rows, error, seconds in fetch_sheets(source, SHEETS):
         print(f"📊 Processing: {sheet_name}")
         # Determine pretty event name
-        event_name = EVENT_MAPPING.get(sheet_name, sheet_name.replace(" (Responses)", "").replace("Markus 2k26 - ", "").strip())
+        event_name = display_name(sheet_name)
+        start = time.perf_counter()
+        result = {"sheet": sheet_name, "status": "failed", "fetch_seconds": seconds and round(seconds, 2),
+                  "rows": len(rows) if rows else 0}
         
         try:
-            spreadsheet = client.open(sheet_name)
-            
-            # Special handling for UI/UX sheet to target 'Form Responses 1'
-            if "UI/UX" in sheet_name:
-                try:
-                    sheet = spreadsheet.worksheet("Form Responses 1")
-                except gspread.WorksheetNotFound:
-                    print(f"   ⚠️ 'Form Responses 1' not found in {sheet_name}, falling back to first sheet")
-                    sheet = spreadsheet.sheet1
-            else:
-                sheet = spreadsheet.sheet1
-                
-            rows = sheet.get_all_values()
-            if not rows: continue
-
-            headers = rows[0]
-            print(f"   Headers: {headers[:5]}...")  # Debug: show first 5 headers
-            
-            # Find Column Indices - expanded keywords
-            idx_name = find_column(headers, ["name with initial", "name", "student name", "full name", "leader name"])
-            idx_roll = find_column(headers, ["roll no", "roll", "reg", "registration", "leader roll"])
-            idx_dept = find_column(headers, ["department", "dept", "branch"])
-            idx_year = find_column(headers, ["year", "yr", "batch"])
-            
-            # Find team member columns (paired name and roll columns)
-            # Look for patterns like "Team Member 1 Name", "Team Member 1 Roll No"
-            team_member_cols = []  # List of (name_idx, roll_idx) tuples
-            
-            for idx, h in enumerate(headers):
-                h_lower = h.lower()
-                # Match patterns like "team member 1", "member 1", etc.
-                match = re.search(r'(?:team\s*)?member\s*(\d+)', h_lower)
-                if match:
-                    member_num = match.group(1)
-                    if 'name' in h_lower:
-                        # Find corresponding roll column for this member number
-                        roll_idx = -1
-                        for idx2, h2 in enumerate(headers):
-                            h2_lower = h2.lower()
-                            # Check for "team member X" or "member X" paired with roll/reg
-                            if f'member {member_num}' in h2_lower.replace('  ', ' ') and ('roll' in h2_lower or 'reg' in h2_lower):
-                                roll_idx = idx2
-                                break
-                            # Regex fallback
-                            if re.search(rf'(?:team\s*)?member\s*{member_num}', h2_lower) and ('roll' in h2_lower or 'reg' in h2_lower):
-                                roll_idx = idx2
-                                break
-                        team_member_cols.append((idx, roll_idx, member_num))
-            
-            # Sort by member number
-            team_member_cols.sort(key=lambda x: int(x[2]))
-            
-            print(f"   Column indices - Name:{idx_name}, Roll:{idx_roll}, Dept:{idx_dept}, Year:{idx_year}")
-            if team_member_cols:
-                print(f"   Team member columns: {[(f'Name:{n}, Roll:{r}') for n, r, _ in team_member_cols]}")
-            
-            # Process Rows
-            count = 0
-            for row in rows[1:]:
-                # Safely get leader values
-                leader_roll = row[idx_roll].strip().upper() if idx_roll != -1 and idx_roll < len(row) else ""
-                
-                # Basic validation for leader
-                if not leader_roll or len(leader_roll) < 5: continue
-                
-                leader_name = row[idx_name].strip().upper() if idx_name != -1 and idx_name < len(row) else ""
-                dept = row[idx_dept].strip() if idx_dept != -1 and idx_dept < len(row) else ""
-                year = row[idx_year].strip() if idx_year != -1 and idx_year < len(row) else ""
-                
-                # Fallback Year extraction from Roll
-                if not year:
-                    if leader_roll.startswith("25"): year = "I"
-                    elif leader_roll.startswith("24"): year = "II"
-                    elif leader_roll.startswith("23"): year = "III"
-                    elif leader_roll.startswith("22"): year = "IV"
-                
-                # Extract team members with individual roll numbers
-                team_members_data = []  # List of {name, roll_no} dicts
-                processed_rolls = set()  # Track rolls to prevent duplicates
-                processed_rolls.add(leader_roll)  # Leader's roll is already used
-                
-                for name_idx, roll_idx, member_num in team_member_cols:
-                    member_name = row[name_idx].strip() if name_idx < len(row) else ""
-                    member_roll = ""
-                    if roll_idx != -1 and roll_idx < len(row):
-                        member_roll = row[roll_idx].strip().upper()
-                    
-                    # Skip if no name OR no roll number (as per requirements)
-                    if not member_name or not member_roll:
-                        continue
-                    
-                    # Skip if roll number is too short (invalid)
-                    if len(member_roll) < 5:
-                        continue
-                    
-                    # Skip duplicate roll numbers (one certificate per roll)
-                    if member_roll in processed_rolls:
-                        print(f"   ⚠️ Skipping duplicate roll: {member_roll}")
-                        continue
-                    
-                    processed_rolls.add(member_roll)
-                    team_members_data.append({
-                        "name": member_name,
-                        "roll_no": member_roll
-                    })
-                
-                # Save leader and team members
-                save_participant(leader_roll, leader_name, dept, year, event_name, sheet_name, team_members_data)
-                count += 1
-            print(f"   ✅ Saved {count} records.")
+            if error:
+                raise error
+            print(f"   Fetched {len(rows)} rows in {seconds:.2f}s")
+            if not rows:
+                result["status"] = "empty"
+                continue
+
+            fingerprint = _sheet_fingerprint(event_name, rows)
+            state = get_sheet_sync_state(sheet_name)
+            if not full and state["fingerprint"] == fingerprint:
+                summary["sheets_skipped"] += 1
+                summary["unchanged"] += len(state["row_hashes"])
+                result["status"] = "unchanged"
+                print("   ⏭️ Unchanged since last sync, skipping.")
+                continue
+
+            # Last row wins when a leader registered more than once
+            leaders = {}
+            for leader in parse_sheet(rows, event_name, sheet_name):
+                leaders[leader["roll_no"]] = leader
+            if not leaders and state["row_hashes"] and not full:
+                # An emptied or mangled sheet must not wipe the event (certificates, hidden flags)
+                raise ValueError(f"No valid rows, but {len(state['row_hashes'])} stored; "
+                                 "run a full sync (--full) to remove them")
+            row_hashes = {roll: _row_hash(leader) for roll, leader in leaders.items()}
+
+            old_hashes = {} if full else state["row_hashes"]
+            changed = [leader for roll, leader in leaders.items() if old_hashes.get(roll) != row_hashes[roll]]
+            removed = [roll for roll in state["row_hashes"] if roll not in leaders]
+            inserted = sum(1 for leader in changed if leader["roll_no"] not in state["row_hashes"])
+
+            # Apply changes + new sync state for the whole sheet in one transaction
+            apply_sheet_sync(sheet_name, event_name, fingerprint, changed, removed,
+                             {leader["roll_no"]: row_hashes[leader["roll_no"]] for leader in changed})
+
+            summary["unchanged"] += len(leaders) - len(changed)
+            summary["inserted"] += inserted
+            summary["updated"] += len(changed) - inserted
+            summary["deleted"] += len(removed)
+            result.update(status="applied", leaders=len(leaders), inserted=inserted,
+                          updated=len(changed) - inserted, deleted=len(removed))
+            print(f"   ✅ {len(leaders)} records: {inserted} new, {len(changed) - inserted} updated, "
+                  f"{len(removed)} removed, {len(leaders) - len(changed)} unchanged.")
 
         except Exception as e:
+            summary["sheets_failed"] += 1
+            result["error"] = str(e)
             print(f"   ❌ Error processing {sheet_name}: {e}")
+        finally:
+            result["seconds"] = round(time.perf_counter() - start, 2)
+            if on_sheet:
+                on_sheet(result)
+
+    # Corrected names/labels (or a new template) make stored certificates stale
+    summary["certs_invalidated"] = invalidate_stale_certificates()["stale"]
+
+    print(f"📋 Sync summary: {summary['sheets_skipped']} sheet(s) skipped, {summary['sheets_failed']} failed, {summary['unchanged']} row(s) unchanged, "
+          f"applied {summary['inserted']} inserted / {summary['updated']} updated / {summary['deleted']} deleted, "
+          f"{summary['certs_invalidated']} certificate(s) to re-render.")
+    return summary
 
 if __name__ == "__main__":
-    sync_data()
+    parser = argparse.ArgumentParser(description="Sync participants from the registration sheets")
+    parser.add_argument("--full", action="store_true", help="Re-apply every row, ignoring stored hashes")
+    parser.add_argument("--source-dir", help="Read CSV/JSON sheet exports from this directory instead of Google Sheets")
+    args = parser.parse_args()
+    sync_data(full=args.full, source=get_sheet_source(args.source_dir))
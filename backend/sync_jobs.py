@@ -0,0 +1,101 @@
+"""
+Background sync jobs.
+
+At most one sync runs at a time across all uvicorn workers: the job_locks row
+in SQLite decides who runs. A trigger that arrives while a sync is running is
+coalesced - the lock is marked pending and its owner runs exactly one more
+sync when the current one ends, however many triggers came in. Every run is
+recorded in sync_runs with per-sheet progress, so any worker can report status.
+"""
+
+import os
+import threading
+import traceback
+
+from backend.database import (
+    acquire_sync_lock, record_sync_progress, finish_sync_run, get_sync_runs, get_sync_lock
+)
+from backend.singleflight import WORKER_ID
+from backend.sync import SHEETS, sync_data
+
+# A lock whose owner has not heartbeated (once per sheet) for this long is taken over
+SYNC_LOCK_STALE_AFTER = float(os.getenv("SYNC_LOCK_STALE_AFTER", 600))
+SYNC_HISTORY = int(os.getenv("SYNC_HISTORY", 50))
+
+
+def run_sync(trigger="manual", full=False, source=None):
+    """
+    Run a sync in the calling thread if no other sync holds the lock.
+    Returns the id of the (first) run, or None if the trigger was coalesced
+    into a sync that is already running.
+    """
+    run_id = acquire_sync_lock(WORKER_ID, trigger, SYNC_LOCK_STALE_AFTER)
+    if run_id is not None:
+        _run_until_idle(run_id, full, source)
+    return run_id
+
+def run_scheduled_sync(full=False, source=None):
+    """
+    Periodic-sync entry point: like run_sync, but a tick that finds a sync
+    already running is skipped rather than queued. Returns the status of the
+    last run ("success", "errors", "failed"), or None if skipped.
+    """
+    run_id = acquire_sync_lock(WORKER_ID, "scheduled", SYNC_LOCK_STALE_AFTER, coalesce=False)
+    if run_id is None:
+        return None
+    return _run_until_idle(run_id, full, source)
+
+def _run_until_idle(run_id, full, source):
+    """Run, then run again while triggers were coalesced; returns the last run's status"""
+    status = None
+    while run_id is not None:
+        run_id, status = _run_once(run_id, full, source)
+    return status
+
+def _run_once(run_id, full, source):
+    """Execute one sync run; returns (follow-up run id if triggers were coalesced, status)"""
+    sheets = []
+
+    def on_sheet(result):
+        sheets.append(result)
+        record_sync_progress(run_id, WORKER_ID, sheets)
+
+    summary, error = None, None
+    try:
+        summary = sync_data(full=full, source=source, on_sheet=on_sheet)
+        if summary is None:
+            error = "No sheet source (credentials not found)"
+    except Exception as e:
+        traceback.print_exc()
+        error = str(e)
+
+    if error:
+        status = "failed"
+    else:
+        status = "errors" if summary["sheets_failed"] else "success"
+    return finish_sync_run(run_id, WORKER_ID, status, summary=summary, error=error, keep=SYNC_HISTORY), status
+
+def trigger_sync(trigger="manual", full=False, source=None):
+    """
+    Start a sync in a background thread, or coalesce into the running one.
+    Returns {"status": "started", "run_id": ...} or {"status": "queued"}.
+    """
+    run_id = acquire_sync_lock(WORKER_ID, trigger, SYNC_LOCK_STALE_AFTER)
+    if run_id is None:
+        return {"status": "queued"}
+
+    threading.Thread(target=_run_until_idle, args=(run_id, full, source), name="sync-job", daemon=True).start()
+    return {"status": "started", "run_id": run_id}
+
+def sync_status(history=10):
+    """Current run (with per-sheet progress), whether a re-run is queued, and recent runs"""
+    lock = get_sync_lock()
+    runs = get_sync_runs(history)
+    current = next((run for run in runs if lock and run["id"] == lock["run_id"]), None)
+    return {
+        "running": lock is not None,
+        "pending": bool(lock and lock["pending"]),
+        "sheets_total": len(SHEETS),
+        "current": current,
+        "history": [run for run in runs if run is not current],
+    }
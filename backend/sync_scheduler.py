@@ -0,0 +1,73 @@
+"""
+Periodic incremental sync inside the app.
+
+start_scheduler() (called from the FastAPI startup hook) launches an asyncio
+task that sleeps, then runs sync_jobs.run_scheduled_sync() in a worker thread,
+so neither startup nor request handling waits on a sync. Each delay is jittered
+so several uvicorn workers do not fire together; the sync lock makes sure only
+one of them actually runs a tick, the others skip it. After a run with sheet
+errors the interval doubles (up to SYNC_MAX_BACKOFF_SECONDS) until a clean run.
+
+SYNC_INTERVAL_SECONDS=0 disables the scheduler.
+"""
+
+import asyncio
+import os
+import random
+
+from backend.sync_jobs import run_scheduled_sync
+
+SYNC_INTERVAL_SECONDS = float(os.getenv("SYNC_INTERVAL_SECONDS", 900))
+SYNC_INITIAL_DELAY_SECONDS = float(os.getenv("SYNC_INITIAL_DELAY_SECONDS", 60))
+SYNC_JITTER = float(os.getenv("SYNC_JITTER", 0.1))  # +/- fraction of each delay
+SYNC_MAX_BACKOFF_SECONDS = float(os.getenv("SYNC_MAX_BACKOFF_SECONDS", 3600))
+
+_task = None
+
+
+def next_delay(interval, failures, jitter=SYNC_JITTER, max_backoff=SYNC_MAX_BACKOFF_SECONDS, rand=random.random):
+    """Seconds until the next tick: interval doubled per consecutive failure (capped), +/- jitter"""
+    delay = interval * (2 ** failures) if failures else interval
+    delay = min(delay, max(interval, max_backoff))
+    return delay * (1 + jitter * (2 * rand() - 1))
+
+async def sync_loop(interval=SYNC_INTERVAL_SECONDS, initial_delay=SYNC_INITIAL_DELAY_SECONDS, run=run_scheduled_sync):
+    failures = 0
+    delay = next_delay(initial_delay, 0)
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(delay)
+        try:
+            status = await loop.run_in_executor(None, run)
+        except Exception as e:
+            print(f"❌ Scheduled sync crashed: {e}")
+            status = "failed"
+
+        if status is None:
+            print("⏭️ Scheduled sync skipped: a sync is already running")
+        elif status == "success":
+            failures = 0
+        else:
+            failures += 1
+            print(f"⚠️ Scheduled sync {status} ({failures} in a row), backing off")
+        delay = next_delay(interval, failures)
+
+def start_scheduler():
+    """Start the periodic sync task on the running event loop (no-op if disabled or started)"""
+    global _task
+    if SYNC_INTERVAL_SECONDS <= 0 or _task is not None:
+        return None
+    _task = asyncio.get_running_loop().create_task(sync_loop())
+    print(f"⏰ Periodic sync every {SYNC_INTERVAL_SECONDS:.0f}s (first in ~{SYNC_INITIAL_DELAY_SECONDS:.0f}s)")
+    return _task
+
+async def stop_scheduler():
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
@@ -0,0 +1,127 @@
+"""
+Executor pools that keep certificate work off the asyncio event loop.
+
+Rendering is CPU-bound Pillow work, so it runs in a small pool of worker
+processes that each hold a warm CertificateRenderer and hand back the encoded
+PNG bytes - no file is written on the way. Storing a certificate
+(a Cloudinary upload, or a local write - see cert_store) and CDN replication
+are blocking I/O, so they run in a thread pool. Both sizes come from the
+environment (RENDER_WORKERS / UPLOAD_WORKERS).
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from backend.certificate import get_renderer
+from backend.cert_store import get_certificate_store, CERT_REPLICATE_TO_CDN
+from backend.database import replace_cert_url, get_cert_urls_with_prefix
+
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", min(4, os.cpu_count() or 1)))
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", 8))
+
+_render_pool = None
+_upload_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_render_worker():
+    # Runs once in each worker process: decode template + resolve fonts up front
+    get_renderer().load()
+
+def _render_job(name, year, event, department=""):
+    return get_renderer().render_png(name, year, event, department)
+
+def _store_job(png):
+    return get_certificate_store().put(png)
+
+def _replicate_job(url, fingerprint):
+    """Copy a locally stored certificate to Cloudinary and point its rows at the CDN URL"""
+    local = get_certificate_store("local")
+    digest = local.digest_from_url(url)
+    if digest is None:
+        return None
+    try:
+        cdn_url = get_certificate_store("cloudinary").put(local.path_for(digest))
+    except Exception as e:
+        # The local copy keeps being served; the next pregenerate run retries the copy
+        print(f"⚠️ CDN replication failed for {url}: {e}")
+        return None
+    replace_cert_url(url, cdn_url, fingerprint)
+    return cdn_url
+
+def schedule_replication(url, fingerprint):
+    """
+    With CERT_REPLICATE_TO_CDN, queue a background copy of a local certificate
+    to Cloudinary. Call after `url` has been stored for the participant(s).
+    """
+    if not CERT_REPLICATE_TO_CDN or get_certificate_store("local").digest_from_url(url) is None:
+        return None
+    return get_upload_pool().submit(_replicate_job, url, fingerprint)
+
+def replicate_local_certificates(event=None, dry_run=False):
+    """
+    With CERT_REPLICATE_TO_CDN, copy every certificate still served from the
+    local store (its earlier copy failed) and wait for the copies.
+    Returns (certificates still local, copies made).
+    """
+    if not CERT_REPLICATE_TO_CDN:
+        return 0, 0
+    pending = get_cert_urls_with_prefix(get_certificate_store("local").url_prefix, event)
+    if dry_run or not pending:
+        return len(pending), 0
+    futures = [get_upload_pool().submit(_replicate_job, url, fingerprint) for url, fingerprint in pending]
+    return len(pending), sum(1 for future in futures if future.exception() is None and future.result())
+
+
+def get_render_pool():
+    global _render_pool
+    if _render_pool is None:
+        with _pool_lock:
+            if _render_pool is None:
+                # spawn: never fork a process that is already running the event loop's threads
+                _render_pool = ProcessPoolExecutor(
+                    max_workers=RENDER_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_render_worker,
+                )
+    return _render_pool
+
+def get_upload_pool():
+    global _upload_pool
+    if _upload_pool is None:
+        with _pool_lock:
+            if _upload_pool is None:
+                _upload_pool = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix="cert-upload")
+    return _upload_pool
+
+def start_pools():
+    """Create both pools and start the render workers so the first request finds them warm"""
+    pool = get_render_pool()
+    get_upload_pool()
+    for _ in range(RENDER_WORKERS):
+        pool.submit(_init_render_worker)
+
+def shutdown_pools():
+    global _render_pool, _upload_pool
+    with _pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=False, cancel_futures=True)
+            _render_pool = None
+        if _upload_pool is not None:
+            _upload_pool.shutdown(wait=False, cancel_futures=True)
+            _upload_pool = None
+
+
+async def render_certificate(name, year, event, department=""):
+    """Render in the process pool and return the PNG bytes"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_render_pool(), partial(_render_job, name, year, event, department))
+
+async def store_certificate(png):
+    """Store PNG bytes (or a file path) in the thread pool (CERT_STORE) and return the public URL"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_upload_pool(), partial(_store_job, png))
@@ -0,0 +1,114 @@
+"""
+Concurrent Read-During-Sync Benchmark
+Run: python bench_db_concurrency.py [--rows N] [--readers N] [--writes N]
+
+Reader threads keep looking up roll numbers (what /verify does) while a writer
+repeatedly upserts a whole sheet (what sync does). Compares:
+  - legacy: new connection per call, rollback journal (the old database.py)
+  - pooled: database.get_connection() (per-thread connection, WAL)
+and reports reader latency percentiles, lookups/sec and "database is locked" errors.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend import database
+from backend.database import init_db, get_events_for_roll, save_participants_bulk, close_connection
+from bench_ingest import synthetic_leaders
+
+def legacy_lookup(roll_no):
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM participants WHERE roll_no = ?", (roll_no,))
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+def legacy_bulk_save(leaders):
+    conn = sqlite3.connect(database.DB_PATH, timeout=30)
+    database._upsert_participants(conn.cursor(), leaders)
+    conn.commit()
+    conn.close()
+
+def run(label, lookup, bulk_save, leaders, readers, writes):
+    rolls = [l["roll_no"] for l in leaders]
+    stop = threading.Event()
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def reader():
+        local = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                lookup(random.choice(rolls))
+                local.append(time.perf_counter() - start)
+            except sqlite3.OperationalError:
+                with lock:
+                    errors[0] += 1
+        close_connection()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    start = time.perf_counter()
+    for _ in range(writes):
+        bulk_save(leaders)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for t in threads:
+        t.join()
+
+    latencies.sort()
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else float("nan")
+    print(f"{label:<8} {len(latencies) / elapsed:10.0f} {pct(0.5):8.2f} {pct(0.99):8.2f} {latencies[-1] * 1000 if latencies else 0:9.1f} "
+          f"{errors[0]:7d} {elapsed:8.2f}")
+
+def fresh_db(tmpdir, label, journal_mode):
+    database.DB_PATH = os.path.join(tmpdir, f"{label}.db")
+    with contextlib.redirect_stdout(io.StringIO()):
+        init_db()
+    close_connection()
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+    conn.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000, help="Leaders per simulated sheet")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writes", type=int, default=5, help="Full-sheet upserts while readers run")
+    args = parser.parse_args()
+
+    leaders = synthetic_leaders(args.rows)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        print(f"=== {args.rows} leaders, {args.readers} reader threads, {args.writes} sheet writes ===")
+        print(f"{'mode':<8} {'lookups/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>9} {'locked':>7} {'write s':>8}")
+
+        fresh_db(tmpdir, "legacy", "DELETE")
+        legacy_bulk_save(leaders)
+        run("legacy", legacy_lookup, legacy_bulk_save, leaders, args.readers, args.writes)
+
+        fresh_db(tmpdir, "pooled", "WAL")
+        save_participants_bulk(leaders)
+        run("pooled", get_events_for_roll, save_participants_bulk, leaders, args.readers, args.writes)
+        close_connection()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Admin Export Benchmark
+Run: python bench_export.py [rows ...]
+
+Loads synthetic participants at each size (default 1k and 100k) and reports,
+for the CSV and XLSX exports: time to the first chunk, total time and peak
+Python memory (tracemalloc). Peak memory should not grow with the row count.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend import database
+from backend.database import init_db, save_participants_bulk
+from backend.export import export_csv, export_xlsx
+from bench_search import synthetic_leaders
+
+def measure(fn):
+    start = time.perf_counter()
+    first, size = fn(start)
+    total = time.perf_counter() - start
+    # Second pass for memory: tracemalloc slows xlsxwriter several times over
+    tracemalloc.start()
+    fn(time.perf_counter())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first * 1000, total, peak / 1024 / 1024, size
+
+def run_csv(start):
+    first, size = None, 0
+    for chunk in export_csv():
+        if first is None:
+            first = time.perf_counter() - start
+        size += len(chunk)
+    return first, size
+
+def run_xlsx(start):
+    path = export_xlsx()
+    try:
+        return time.perf_counter() - start, os.path.getsize(path)
+    finally:
+        os.remove(path)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("rows", nargs="*", type=int, default=[1000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'format':<6} {'first chunk ms':>15} {'total s':>8} {'peak MB':>8} {'size MB':>8}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            database.DB_PATH = os.path.join(tmpdir, "participants.db")
+            with contextlib.redirect_stdout(io.StringIO()):
+                init_db()
+            save_participants_bulk(synthetic_leaders(rows))
+            for label, fn in (("csv", run_csv), ("xlsx", run_xlsx)):
+                first, total, peak, size = measure(fn)
+                print(f"{rows:>8} {label:<6} {first:15.1f} {total:8.2f} {peak:8.2f} {size / 1024 / 1024:8.2f}")
+            database.close_connection()
+
+if __name__ == "__main__":
+    main()
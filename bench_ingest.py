@@ -0,0 +1,75 @@
+"""
+Sheet Ingestion Benchmark
+Run: python bench_ingest.py [sizes...] [--per-row-max N]
+Example: python bench_ingest.py 1000 10000 100000
+
+Compares one save_participant() call per sheet row (one connection + commit
+each, like the old sync loop) with a single save_participants_bulk() call.
+The per-row path is skipped above --per-row-max rows because it is fsync-bound.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend import database
+from backend.database import init_db, save_participant, save_participants_bulk
+
+def synthetic_leaders(n, members_per_team=2):
+    leaders = []
+    for i in range(n):
+        roll = f"24CS{i:06d}"
+        leaders.append({
+            "roll_no": roll, "name": f"STUDENT {i}", "dept": "CSE", "year": "II",
+            "event": "TECHNICAL QUIZ", "sheet_source": "MARKUS Technical Quiz (Responses)",
+            "team_members": [
+                {"name": f"MEMBER {i}-{m}", "roll_no": f"24MB{i:06d}{m}"} for m in range(members_per_team)
+            ],
+        })
+    return leaders
+
+def fresh_db(tmpdir, label):
+    database.DB_PATH = os.path.join(tmpdir, f"{label}.db")
+    if os.path.exists(database.DB_PATH):
+        os.remove(database.DB_PATH)
+    init_db()
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("sizes", nargs="*", type=int, default=[1000, 10000, 100000])
+    parser.add_argument("--per-row-max", type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        print(f"{'rows':>8} {'per-row (s)':>12} {'bulk (s)':>10} {'bulk rows/s':>12} {'speedup':>8}")
+        for n in args.sizes:
+            leaders = synthetic_leaders(n)
+
+            per_row = None
+            if n <= args.per_row_max:
+                fresh_db(tmpdir, f"per_row_{n}")
+                per_row = timed(lambda: [
+                    save_participant(l["roll_no"], l["name"], l["dept"], l["year"], l["event"],
+                                     l["sheet_source"], l["team_members"])
+                    for l in leaders
+                ])
+
+            fresh_db(tmpdir, f"bulk_{n}")
+            bulk = timed(lambda: save_participants_bulk(leaders))
+
+            per_row_text = f"{per_row:12.2f}" if per_row is not None else f"{'skipped':>12}"
+            speedup = f"{per_row / bulk:7.1f}x" if per_row is not None else f"{'-':>8}"
+            print(f"{n:>8} {per_row_text} {bulk:10.2f} {n / bulk:12.0f} {speedup}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Sheet Parsing Benchmark
+Run: python bench_parse.py [rows]
+
+Times backend.sheet_parser.parse_rows against the original per-row loop
+(reference copy in test_sheet_parser.py) and a pandas DataFrame variant,
+on a noisy synthetic sheet and on a clean sheet of full teams.
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.sheet_parser import parse_rows, MIN_ROLL_LENGTH, ROLL_PREFIX_YEARS
+from test_sheet_parser import COLUMNS, legacy_parse_rows, synthetic_rows
+
+def pandas_parse_rows(data_rows, idx_name, idx_roll, idx_dept, idx_year, team_member_cols, event_name, sheet_name):
+    """Column-wise DataFrame version: normalization, year fallback and member melt/dedup as pandas ops"""
+    if not data_rows or idx_roll == -1:
+        return []
+    df = pd.DataFrame(data_rows, dtype=object)
+
+    def column(frame, idx):
+        if idx == -1 or idx not in frame.columns:
+            return pd.Series("", index=frame.index, dtype=object)
+        return frame[idx].fillna("")
+
+    roll = column(df, idx_roll).str.strip().str.upper()
+    valid = roll.str.len() >= MIN_ROLL_LENGTH
+    df, roll = df[valid], roll[valid]
+
+    name = column(df, idx_name).str.strip().str.upper()
+    dept = column(df, idx_dept).str.strip()
+    year = column(df, idx_year).str.strip()
+    year = year.where(year != "", roll.str[:2].map(ROLL_PREFIX_YEARS).fillna(""))
+
+    members_by_row = {}
+    if team_member_cols:
+        members = pd.concat([
+            pd.DataFrame({
+                "row": df.index, "order": order, "leader": roll.to_numpy(),
+                "name": column(df, name_idx).str.strip().to_numpy(),
+                "roll": column(df, roll_idx).str.strip().str.upper().to_numpy(),
+            })
+            for order, (name_idx, roll_idx, _) in enumerate(team_member_cols)
+        ], ignore_index=True)
+        members = members[(members["name"] != "") & (members["roll"].str.len() >= MIN_ROLL_LENGTH)]
+        members = members.sort_values(["row", "order"], kind="stable")
+        members = members[~((members["roll"] == members["leader"]) | members.duplicated(["row", "roll"]))]
+        for row_id, m_name, m_roll in zip(members["row"].tolist(), members["name"].tolist(), members["roll"].tolist()):
+            members_by_row.setdefault(row_id, []).append({"name": m_name, "roll_no": m_roll})
+
+    return [
+        {"roll_no": r, "name": n, "dept": d, "year": y, "event": event_name, "sheet_source": sheet_name,
+         "team_members": members_by_row.get(row_id, [])}
+        for row_id, r, n, d, y in zip(df.index.tolist(), roll.tolist(), name.tolist(), dept.tolist(), year.tolist())
+    ]
+
+def full_team_rows(n):
+    return [
+        ["t", f" student {i} ", f"24cs{i:05d}", "CSE", "", f"member {i}a", f"24ma{i:05d}",
+         f"member {i}b", f"24mb{i:05d}", "extra"]
+        for i in range(n)
+    ]
+
+def best_of(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    parsers = [
+        ("original row loop", legacy_parse_rows),
+        ("sheet_parser.parse_rows", lambda *a, **k: parse_rows(*a, **k)[0]),
+        ("pandas DataFrame", pandas_parse_rows),
+    ]
+    for label, rows in (("noisy synthetic sheet", synthetic_rows(n)), ("clean full-team sheet", full_team_rows(n))):
+        print(f"=== {n} rows: {label} ===")
+        baseline = expected = None
+        for name, fn in parsers:
+            seconds, result = best_of(lambda: fn(rows, event_name="QUIZ", sheet_name="Quiz", **COLUMNS))
+            if baseline is None:
+                baseline, expected = seconds, result
+            same = "same output" if result == expected else "OUTPUT DIFFERS"
+            print(f"{name:<26} {seconds * 1000:8.1f} ms  ({baseline / seconds:.2f}x)  {same}")
+
+if __name__ == "__main__":
+    main()
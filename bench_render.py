@@ -0,0 +1,46 @@
+"""
+Certificate Rendering Micro-benchmark
+Run: python bench_render.py [iterations]
+
+Compares the cold path (fresh renderer per certificate: template decode +
+font lookup every time) with the warm path (one shared renderer).
+"""
+
+import io
+import sys
+import os
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.certificate import CertificateRenderer
+
+SAMPLE = dict(name="John Doe", year="3", event="PROJECT PRESENTATION", department="CSE")
+
+def encode(img):
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf
+
+def bench(label, fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed / iterations * 1000:8.2f} ms/cert")
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"=== Certificate render benchmark ({iterations} iterations) ===")
+
+    bench("cold render", lambda: CertificateRenderer().render(**SAMPLE), iterations)
+
+    warm = CertificateRenderer().load()
+    bench("warm render", lambda: warm.render(**SAMPLE), iterations)
+
+    bench("cold render + PNG encode", lambda: encode(CertificateRenderer().render(**SAMPLE)), iterations)
+    bench("warm render + PNG encode", lambda: encode(warm.render(**SAMPLE)), iterations)
+
+if __name__ == "__main__":
+    main()
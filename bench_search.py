@@ -0,0 +1,93 @@
+"""
+Admin Search Benchmark
+Run: python bench_search.py [rows]
+
+Loads synthetic participants (default 100k) and compares per-query latency of
+search_participants() (FTS5 prefix index) with a LIKE '%...%' scan over the
+same columns.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend import database
+from backend.database import init_db, save_participants_bulk, search_participants, get_connection, close_connection
+
+SYLLABLES = ["A", "RU", "PRI", "YA", "KAR", "THI", "DIV", "SU", "RE", "SH", "NI", "VI", "JAY", "MEE", "NA",
+             "RA", "HUL", "LAK", "SHMI", "GO", "PAL", "DEE", "PA", "SAN", "JAI", "MO", "HAN", "KA", "VYA"]
+DEPARTMENTS = ["CSE", "IT", "ECE", "EEE", "MECH", "CIVIL", "BCA", "MCA"]
+EVENTS = ["TECHNICAL QUIZ", "CODE ADAPT", "PAPER PRESENTATION", "UI/UX", "IPL AUCTION"]
+
+def synthetic_name(rng):
+    first = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3)))
+    return f"{first} {rng.choice(SYLLABLES)[:1]}"
+
+def synthetic_leaders(n):
+    rng = random.Random(42)
+    return [{
+        "roll_no": f"{rng.choice(['22', '23', '24', '25'])}{rng.choice(DEPARTMENTS)}{i:06d}",
+        "name": synthetic_name(rng),
+        "dept": rng.choice(DEPARTMENTS), "year": "II", "event": EVENTS[i % len(EVENTS)],
+        "sheet_source": "bench", "team_members": [],
+    } for i in range(n)]
+
+def like_search(text, limit=20):
+    pattern = f"%{text}%"
+    cursor = get_connection().cursor()
+    cursor.execute("""
+        SELECT id, roll_no, name, department, event FROM participants
+        WHERE roll_no LIKE ? OR name LIKE ? OR department LIKE ? OR event LIKE ?
+        LIMIT ?
+    """, (pattern, pattern, pattern, pattern, limit))
+    return cursor.fetchall()
+
+def time_queries(fn, queries, repeat):
+    samples = []
+    for _ in range(repeat):
+        for q in queries:
+            start = time.perf_counter()
+            fn(q)
+            samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95)]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("rows", nargs="?", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database.DB_PATH = os.path.join(tmpdir, "participants.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            init_db()
+        start = time.perf_counter()
+        save_participants_bulk(synthetic_leaders(args.rows))
+        print(f"=== {args.rows} participants loaded in {time.perf_counter() - start:.1f}s (search index maintained by the bulk upsert) ===")
+
+        queries = {
+            "roll prefix": ["24CSE0001", "23IT00", "25MCA0099"],
+            "partial name": ["priya", "karthi", "lakshmi"],
+            "name + dept": ["priya cse", "mohan ece"],
+            "broad prefix": ["ka"],  # worst case: a large share of rows match and get ranked
+            "no match": ["zzzz"],
+        }
+        print(f"{'query':<14} {'FTS p50 ms':>11} {'FTS p95 ms':>11} {'LIKE p50 ms':>12} {'LIKE p95 ms':>12}")
+        for label, qs in queries.items():
+            fts = time_queries(search_participants, qs, args.repeat)
+            like = time_queries(like_search, qs, max(1, args.repeat // 4))
+            print(f"{label:<14} {fts[0]:11.2f} {fts[1]:11.2f} {like[0]:12.2f} {like[1]:12.2f}")
+        close_connection()
+
+if __name__ == "__main__":
+    main()
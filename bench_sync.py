@@ -0,0 +1,82 @@
+"""
+Offline Sync Benchmark
+Run: python bench_sync.py [rows_per_sheet] [--latency SECONDS]
+
+Writes synthetic CSV exports for every sheet in SHEETS to a temp directory
+and times:
+  - fetching all sheets one after another vs concurrently (with simulated latency)
+  - a full sync, then an incremental sync with nothing changed
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend import database
+from backend.database import init_db
+from backend.sheet_source import LocalSheetSource, fetch_sheets
+from backend.sync import SHEETS, sync_data
+
+HEADERS = ["Timestamp", "Name with initial", "Roll No", "Department", "Year",
+           "Team Member 1 Name", "Team Member 1 Roll No", "Team Member 2 Name", "Team Member 2 Roll No"]
+
+class SlowLocalSheetSource(LocalSheetSource):
+    """Local exports plus a fixed delay per fetch, to stand in for the Sheets API round trip"""
+
+    def __init__(self, directory, latency):
+        super().__init__(directory)
+        self.latency = latency
+
+    def fetch(self, sheet_name):
+        time.sleep(self.latency)
+        return super().fetch(sheet_name)
+
+def write_exports(directory, rows_per_sheet):
+    for s, sheet_name in enumerate(SHEETS):
+        path = os.path.join(directory, LocalSheetSource.filename_for(sheet_name) + ".csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADERS)
+            for i in range(rows_per_sheet):
+                writer.writerow([
+                    "t", f"student {i}", f"24CS{s}{i:06d}", "CSE", "2",
+                    f"member {i}a", f"24MA{s}{i:06d}", f"member {i}b", f"24MB{s}{i:06d}",
+                ])
+
+def timed(label, fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    print(f"{label:<36} {time.perf_counter() - start:8.2f} s")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("rows_per_sheet", nargs="?", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated seconds per sheet fetch")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write_exports(tmpdir, args.rows_per_sheet)
+        database.DB_PATH = os.path.join(tmpdir, "participants.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            init_db()
+
+        slow = SlowLocalSheetSource(tmpdir, args.latency)
+        print(f"=== {len(SHEETS)} sheets x {args.rows_per_sheet} rows, {args.latency}s simulated latency ===")
+        timed("fetch sequential (1 worker)", lambda: list(fetch_sheets(slow, SHEETS, max_workers=1)))
+        timed(f"fetch concurrent ({len(SHEETS)} workers)", lambda: list(fetch_sheets(slow, SHEETS, max_workers=len(SHEETS))))
+
+        local = LocalSheetSource(tmpdir)
+        timed("full sync (no latency)", lambda: sync_data(source=local))
+        timed("incremental sync, nothing changed", lambda: sync_data(source=local))
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ import os
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from backend.certificate import generate_local_certificate
+from backend.certificate import get_renderer
 
 def main():
     print("=== Certificate Generator CLI ===")
@@ -33,7 +33,7 @@ def main():
 
         print("\nGenerating certificate...")
         
-        filepath = generate_local_certificate(
+        filepath = get_renderer().generate(
             name=name,
             year=year,
             event=event,
@@ -0,0 +1,48 @@
+"""
+Shared pytest fixtures.
+
+Each test gets its own database and certificate store under tmp_path; the
+module globals they replace are restored by monkeypatch afterwards.
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend import cert_store, database
+from backend.lookup_cache import roll_cache
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Point DB_PATH at a not-yet-created database in tmp_path"""
+    path = str(tmp_path / "participants.db")
+    monkeypatch.setattr(database, "DB_PATH", path)
+    # Cached lookups are keyed by data version, which restarts with every database
+    roll_cache.clear()
+    yield path
+    database.close_connection()
+    roll_cache.clear()
+
+@pytest.fixture
+def temp_db(db_path):
+    """Fresh database with every migration applied"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        database.init_db()
+    return db_path
+
+@pytest.fixture
+def local_store(tmp_path, monkeypatch):
+    """LocalStore in tmp_path, used as the shared "local" store and by the app's /c/ route"""
+    import app
+
+    store = cert_store.LocalStore(str(tmp_path / "certificates"), public_base="")
+    monkeypatch.setitem(cert_store._stores, "local", store)
+    monkeypatch.setattr(app, "local_store", store)
+    return store
@@ -0,0 +1,82 @@
+"""
+Admin participant API checks
+Run: python -m pytest test_admin_api.py
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+from backend.database import save_participants_bulk, update_cert_url, toggle_cert_visibility, get_participants_page, get_data_version
+
+client = TestClient(app.app)
+client.cookies.set("admin_session", "authenticated")
+
+@pytest.fixture
+def participants(temp_db):
+    leaders = []
+    for i in range(7):
+        leaders.append({
+            "roll_no": f"24CS{i:03d}", "name": f"QUIZ {i}", "dept": "CSE" if i % 2 else "IT", "year": "II",
+            "event": "TECHNICAL QUIZ", "sheet_source": "Quiz Sheet",
+            "team_members": [{"name": f"MEMBER {i}", "roll_no": f"24MB{i:03d}"}],
+        })
+        leaders.append({
+            "roll_no": f"24CS{i:03d}", "name": f"CODE {i}", "dept": "CSE", "year": "II",
+            "event": "CODE ADAPT", "sheet_source": "Code Sheet", "team_members": [],
+        })
+    save_participants_bulk(leaders)
+
+def test_keyset_pages_cover_every_row_once(participants):
+    seen = []
+    cursor = ""
+    while True:
+        page = client.get("/admin/api/participants", params={"limit": 4, "cursor": cursor}).json()
+        seen.extend(p["id"] for p in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)) == 21
+
+def test_filters_and_event_counts(participants):
+    update_cert_url("24CS001", "CODE ADAPT", "https://example.com/c.png")
+    rows, _ = get_participants_page(event="code-adapt", limit=100)
+    toggle_cert_visibility(rows[0]["id"], visible=False)
+
+    quiz_cse = client.get("/admin/api/participants", params={"event": "technical-quiz", "department": "cse"}).json()
+    assert {p["roll_no"] for p in quiz_cse["items"]} == {"24CS001", "24CS003", "24CS005", "24MB001", "24MB003", "24MB005"}
+
+    with_cert = client.get("/admin/api/participants", params={"has_cert": "true"}).json()["items"]
+    assert [(p["roll_no"], p["event_slug"]) for p in with_cert] == [("24CS001", "code-adapt")]
+    hidden = client.get("/admin/api/participants", params={"blocked": "true"}).json()["items"]
+    assert [p["id"] for p in hidden] == [rows[0]["id"]]
+
+    counts = {e["slug"]: e for e in client.get("/admin/api/event-counts").json()["events"]}
+    assert counts["technical-quiz"]["total"] == 14 and counts["code-adapt"]["total"] == 7
+    assert (counts["code-adapt"]["with_cert"], counts["code-adapt"]["blocked"]) == (1, 1)
+
+def test_bulk_visibility_by_selector(participants):
+    version = get_data_version()
+
+    hidden = client.post("/admin/visibility", json={"visible": False, "event": "technical-quiz", "department": "cse"}).json()
+    assert hidden["changed"] == 6
+    assert get_data_version() == version + 1  # one bump for the whole batch
+    # Already hidden: nothing changes, nothing is invalidated
+    assert client.post("/admin/visibility", json={"visible": False, "event": "technical-quiz", "department": "cse"}).json()["changed"] == 0
+    assert get_data_version() == version + 1
+
+    code_rows, _ = get_participants_page(event="code-adapt", limit=100)
+    ids = [p["id"] for p in code_rows[:3]]
+    assert client.post("/admin/visibility", json={"visible": False, "ids": ids}).json()["changed"] == 3
+    assert client.post("/admin/visibility", json={"visible": True, "year": "ii"}).json()["changed"] == 9
+
+    counts = {e["slug"]: e["blocked"] for e in client.get("/admin/api/event-counts").json()["events"]}
+    assert counts == {"technical-quiz": 0, "code-adapt": 0}
+    assert client.post("/admin/visibility", json={"visible": False}).status_code == 400
+
+def test_requires_admin_and_valid_cursor(participants):
+    assert TestClient(app.app).get("/admin/api/participants").status_code == 401
+    assert client.get("/admin/api/participants", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert TestClient(app.app).post("/admin/visibility", json={"visible": False, "ids": [1]}).status_code == 401
+    assert TestClient(app.app).get("/admin/cache-stats").status_code == 401
+    assert set(client.get("/admin/cache-stats").json()) >= {"hits", "misses", "size"}
@@ -0,0 +1,56 @@
+"""
+Bulk participant ingestion checks
+Run: python -m pytest test_bulk_save.py
+"""
+
+from backend import database
+from backend.database import save_participant, save_participants_bulk, get_all_participants
+
+def team(roll, members, name="LEADER"):
+    return {
+        "roll_no": roll, "name": name, "dept": "CSE", "year": "II", "event": "QUIZ",
+        "sheet_source": "Quiz Sheet", "team_members": [{"name": n, "roll_no": r} for n, r in members],
+    }
+
+def rows_by_role():
+    rows = get_all_participants()
+    leaders = {r["roll_no"]: r for r in rows if r["member_role"] == "leader"}
+    members = {(r["leader_roll_no"], r["roll_no"]): r for r in rows if r["member_role"] == "member"}
+    return leaders, members
+
+def test_bulk_replaces_team_members(temp_db):
+    save_participants_bulk([team("24CS001", [("ALICE", "24CS101"), ("BOB", "24CS102")])])
+    save_participants_bulk([team("24CS001", [("BOB", "24CS102"), ("CAROL", "24CS103")], name="RENAMED")])
+
+    leaders, members = rows_by_role()
+    assert leaders["24CS001"]["name"] == "RENAMED"
+    assert leaders["24CS001"]["team_members"] == "BOB, CAROL"
+    assert set(members) == {("24CS001", "24CS102"), ("24CS001", "24CS103")}
+    assert members[("24CS001", "24CS102")]["member_position"] == 1
+
+def test_bulk_is_idempotent_and_keeps_admin_state(temp_db):
+    batch = [team("24CS001", [("ALICE", "24CS101")]), team("24CS002", [])]
+    save_participants_bulk(batch)
+    database.update_cert_url("24CS101", "QUIZ", "https://example/cert.png")
+    save_participants_bulk(batch)
+
+    leaders, members = rows_by_role()
+    assert len(get_all_participants()) == 3
+    assert members[("24CS001", "24CS101")]["cert_url"] == "https://example/cert.png"
+
+def test_duplicate_leader_in_batch_last_wins(temp_db):
+    save_participants_bulk([
+        team("24CS001", [("ALICE", "24CS101")], name="FIRST"),
+        team("24CS001", [("BOB", "24CS102")], name="SECOND"),
+    ])
+    leaders, members = rows_by_role()
+    assert leaders["24CS001"]["name"] == "SECOND"
+    assert set(members) == {("24CS001", "24CS102")}
+
+def test_single_save_matches_bulk(temp_db):
+    save_participant("24CS001", "LEADER", "CSE", "II", "QUIZ", "Quiz Sheet", [{"name": "ALICE", "roll_no": "24CS101"}])
+    save_participant("24CS001", "LEADER", "CSE", "II", "QUIZ", "Quiz Sheet", "Legacy Name Only")
+    leaders, members = rows_by_role()
+    # Names without roll numbers are never saved as member records
+    assert leaders["24CS001"]["team_members"] == "Legacy Name Only"
+    assert members == {}
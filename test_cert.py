@@ -11,7 +11,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from backend.database import get_events_for_roll, init_db
-from backend.certificate import generate_local_certificate
+from backend.certificate import get_renderer
 from backend.sync import sync_data
 
 def test_generate(roll_no):
@@ -36,13 +36,11 @@ def test_generate(roll_no):
         print(f"   Department: {event['department']}")
         
         # Generate certificate
-        clean_event = event['event'].replace("(Responses)", "").replace("MARKUS 2K26 - ", "").replace("MARKUS ", "").strip()
-        
         try:
-            filepath = generate_local_certificate(
+            filepath = get_renderer().generate(
                 name=event['name'] or "TEST NAME",
                 year=event['year'] or "I",
-                event=clean_event,
+                event=event['cert_label'],
                 roll_no=roll_no,
                 department=event['department'] or ""
             )
@@ -0,0 +1,132 @@
+"""
+Certificate store checks (in-memory render, local content-addressed store, /c/ route, CDN replication)
+Run: python -m pytest test_cert_store.py
+"""
+
+import asyncio
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+from backend import cert_store, workers
+from backend.cert_store import CertificateStore, get_certificate_store
+from backend.certificate import CertificateRenderer
+from backend.database import save_participants_bulk, update_cert_url, get_all_participants
+
+client = TestClient(app.app)
+PNG = b"\x89PNG\r\n\x1a\n not really a certificate"
+
+def test_local_store_is_content_addressed(local_store, tmp_path):
+    store = local_store
+    path = str(tmp_path / "cert.png")
+    with open(path, "wb") as f:
+        f.write(PNG)
+
+    url = store.put(PNG)
+    assert store.put(path) == url and store.put(bytearray(PNG)) == url
+    digest = store.digest_from_url(url)
+    assert url == f"/c/{digest}.png" and os.listdir(store.directory) == [f"{digest}.png"]
+    assert store.digest_from_url("https://res.cloudinary.com/x.png") is None
+    assert store.path_for("../../etc/passwd") is None
+
+def test_served_with_immutable_headers(local_store):
+    url = local_store.put(PNG)
+
+    response = client.get(url)
+    assert response.status_code == 200 and response.content == PNG
+    assert response.headers["cache-control"] == app.IMMUTABLE
+    repeat = client.get(url, headers={"If-None-Match": response.headers["etag"]})
+    assert repeat.status_code == 304
+    assert client.get("/c/" + "0" * 64 + ".png").status_code == 404
+    assert client.get("/c/not-a-digest.png").status_code == 404
+
+def test_replication_swaps_in_cdn_url(temp_db, local_store, monkeypatch):
+    save_participants_bulk([{"roll_no": r, "name": "SAME", "dept": "CSE", "year": "II", "event": "QUIZ",
+                             "sheet_source": "s", "team_members": []} for r in ("24CS001", "24CS002")])
+
+    class FakeCdn(CertificateStore):
+        name = "cloudinary"
+        def put(self, source):
+            assert open(source, "rb").read() == PNG
+            return "https://cdn.example.com/cert.png"
+
+    monkeypatch.setitem(cert_store._stores, "cloudinary", FakeCdn())
+    url = local_store.put(PNG)
+    for roll in ("24CS001", "24CS002"):
+        update_cert_url(roll, "QUIZ", url, "fp1")
+    assert workers._replicate_job(url, "fp1") == "https://cdn.example.com/cert.png"
+    assert {p["cert_url"] for p in get_all_participants()} == {"https://cdn.example.com/cert.png"}
+
+def test_rendered_in_memory_and_stored_without_a_file(local_store, tmp_path):
+    renderer = CertificateRenderer()
+    png = renderer.render_png("ALICE", "2", "TECHNICAL QUIZ", "CSE")
+    assert png.startswith(b"\x89PNG")
+
+    # Same image the file-writing path (cli_generate.py) produces
+    with open(renderer.generate("ALICE", "2", "TECHNICAL QUIZ", "24CS001", "CSE", out_dir=str(tmp_path)), "rb") as f:
+        assert f.read() == png
+
+    store = local_store
+    url = store.put(png)
+    with open(store.path_for(store.digest_from_url(url)), "rb") as f:
+        assert f.read() == png
+    assert os.listdir(store.directory) == [os.path.basename(store.path_for(store.digest_from_url(url)))]
+
+def test_rendered_and_stored_through_the_pools(local_store, monkeypatch):
+    # Real pools: a spawned render worker and the upload thread pool
+    monkeypatch.setattr(workers, "RENDER_WORKERS", 1)
+    monkeypatch.setattr(workers, "UPLOAD_WORKERS", 1)
+    monkeypatch.setattr(cert_store, "CERT_STORE", "local")
+
+    async def generate():
+        png = await workers.render_certificate("ALICE", "2", "TECHNICAL QUIZ", "CSE")
+        return png, await workers.store_certificate(png)
+
+    try:
+        png, url = asyncio.run(generate())
+    finally:
+        workers.shutdown_pools()
+
+    assert png == CertificateRenderer().render_png("ALICE", "2", "TECHNICAL QUIZ", "CSE")
+    assert png.startswith(b"\x89PNG\r\n\x1a\n")
+    digest = local_store.digest_from_url(url)
+    assert url == f"/c/{digest}.png"
+    with open(local_store.path_for(digest), "rb") as f:
+        assert f.read() == png
+    response = client.get(url)
+    assert response.status_code == 200 and response.content == png
+
+def test_preview_requires_admin():
+    response = client.get("/admin/preview_cert", params={"roll_no": "24CS001", "event_id": "quiz"})
+    assert response.status_code == 401
+
+def test_unknown_store_name():
+    with pytest.raises(ValueError):
+        get_certificate_store("s3")
+
+def test_failed_replication_is_retried(temp_db, local_store, monkeypatch):
+    save_participants_bulk([{"roll_no": "24CS001", "name": "ALICE", "dept": "CSE", "year": "II", "event": "QUIZ",
+                             "sheet_source": "s", "team_members": []}])
+    uploads = []
+
+    class FlakyCdn(CertificateStore):
+        name = "cloudinary"
+        def put(self, source):
+            uploads.append(source)
+            if len(uploads) == 1:
+                raise ConnectionError("CDN unreachable")
+            return "https://cdn.example.com/cert.png"
+
+    monkeypatch.setitem(cert_store._stores, "cloudinary", FlakyCdn())
+    monkeypatch.setattr(workers, "CERT_REPLICATE_TO_CDN", True)
+    url = local_store.put(PNG)
+    update_cert_url("24CS001", "QUIZ", url, "fp1")
+
+    assert workers.replicate_local_certificates(dry_run=True) == (1, 0)
+    assert workers.replicate_local_certificates() == (1, 0)  # copy fails: still served locally
+    assert get_all_participants()[0]["cert_url"] == url
+    assert workers.replicate_local_certificates() == (1, 1)
+    assert get_all_participants()[0]["cert_url"] == "https://cdn.example.com/cert.png"
+    assert workers.replicate_local_certificates() == (0, 0)
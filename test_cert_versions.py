@@ -0,0 +1,76 @@
+"""
+Render fingerprint / certificate versioning checks
+Run: python -m pytest test_cert_versions.py
+"""
+
+import contextlib
+import io
+import shutil
+
+from backend.database import (
+    save_participants_bulk, update_cert_url, get_all_participants, get_cert_url_by_fingerprint,
+    get_data_version, check_stats, set_cert_visibility
+)
+from backend.certificate import CertificateRenderer, TEMPLATE_PATH, render_fingerprint
+from backend.cert_versions import invalidate_stale_certificates
+from backend.pregenerate import pregenerate
+
+def leader(roll, name):
+    return {"roll_no": roll, "name": name, "dept": "CSE", "year": "II", "event": "TECHNICAL QUIZ",
+            "sheet_source": "Quiz Sheet", "team_members": []}
+
+def store_rendered(roll, name):
+    fingerprint = render_fingerprint(name, "II", "TECHNICAL QUIZ", "CSE")
+    update_cert_url(roll, "TECHNICAL QUIZ", f"https://example.com/{roll}.png", fingerprint)
+    return fingerprint
+
+def test_only_changed_names_are_invalidated(temp_db):
+    save_participants_bulk([leader("24CS001", "ALICE"), leader("24CS002", "BOB"), leader("24CS003", "CAROL")])
+    with contextlib.redirect_stdout(io.StringIO()):
+        store_rendered("24CS001", "ALICE")
+        bob = store_rendered("24CS002", "BOB")
+        # Rendered before fingerprints existed: trusted and adopted
+        update_cert_url("24CS003", "TECHNICAL QUIZ", "https://example.com/old.png")
+
+        # Sheet correction: ALICE -> ALICE K; BOB unchanged ("bob" renders identically)
+        save_participants_bulk([leader("24CS001", "ALICE K"), leader("24CS002", "bob")])
+        version = get_data_version()
+        result = invalidate_stale_certificates()
+
+    assert result == {"checked": 3, "stale": 1, "stale_blocked": 0, "adopted": 1}
+    urls = {p["roll_no"]: p["cert_url"] for p in get_all_participants()}
+    assert urls == {"24CS001": None, "24CS002": "https://example.com/24CS002.png", "24CS003": "https://example.com/old.png"}
+    assert get_data_version() == version + 1
+    assert get_cert_url_by_fingerprint(bob) == "https://example.com/24CS002.png"
+    assert check_stats() == []
+
+    # Nothing changed since: a second check is a no-op
+    assert invalidate_stale_certificates() == {"checked": 2, "stale": 0, "stale_blocked": 0, "adopted": 0}
+
+def test_template_change_changes_every_fingerprint(tmp_path):
+    tweaked = str(tmp_path / "Participation.png")
+    shutil.copy(TEMPLATE_PATH, tweaked)
+    with open(tweaked, "ab") as f:
+        f.write(b"\0")
+    with contextlib.redirect_stdout(io.StringIO()):
+        original, changed = CertificateRenderer(), CertificateRenderer(template_path=tweaked)
+        assert original.fingerprint("ALICE", "2", "QUIZ") == original.fingerprint("alice", "II", "quiz")
+        assert original.fingerprint("ALICE", "2", "QUIZ") != changed.fingerprint("ALICE", "2", "QUIZ")
+
+def test_dry_run_counts_out_of_date_certificates(temp_db):
+    save_participants_bulk([leader("24CS001", "ALICE"), leader("24CS002", "BOB"), leader("24CS003", "CAROL")])
+    with contextlib.redirect_stdout(io.StringIO()):
+        store_rendered("24CS001", "ALICE")
+        store_rendered("24CS002", "BOB")
+        save_participants_bulk([leader("24CS001", "ALICE K")])
+        result = pregenerate(dry_run=True)
+
+    # CAROL was never rendered, ALICE's name changed; nothing is cleared by a dry run
+    assert (result["pending"], result["stale"]) == (2, 1)
+    assert get_all_participants()[0]["cert_url"] == "https://example.com/24CS001.png"
+
+    # A hidden out-of-date certificate is not rendered again, so it is not counted
+    with contextlib.redirect_stdout(io.StringIO()):
+        set_cert_visibility(False, ids=[get_all_participants()[0]["id"]])
+        result = pregenerate(dry_run=True)
+    assert (result["pending"], result["stale"]) == (1, 1)
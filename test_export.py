@@ -0,0 +1,67 @@
+"""
+Admin CSV/XLSX export checks
+Run: python -m pytest test_export.py
+"""
+
+import csv
+import io
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+from backend import database, export
+from backend.database import save_participants_bulk, update_cert_url, toggle_cert_visibility, get_all_participants
+
+client = TestClient(app.app)
+client.cookies.set("admin_session", "authenticated")
+
+@pytest.fixture
+def participants(temp_db):
+    save_participants_bulk([
+        {"roll_no": "24CS001", "name": "=ALICE", "dept": "CSE", "year": "II", "event": "TECHNICAL QUIZ",
+         "sheet_source": "Quiz Sheet", "team_members": [{"name": "BOB", "roll_no": "24CS002"}]},
+        {"roll_no": "24CS003", "name": "CHARLIE", "dept": "IT", "year": "III", "event": "CODE ADAPT",
+         "sheet_source": "Code Sheet", "team_members": []},
+    ])
+    update_cert_url("24CS001", "TECHNICAL QUIZ", "https://example.com/a.png")
+    ids = {p["roll_no"]: p["id"] for p in get_all_participants()}
+    toggle_cert_visibility(ids["24CS002"], visible=False)
+
+def test_csv_export_and_filters(participants):
+    response = client.get("/admin/export.csv")
+    assert response.status_code == 200 and "attachment" in response.headers["content-disposition"]
+    rows = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig"))))
+    assert tuple(rows[0]) == database.EXPORT_COLUMNS
+    # Grouped by event in registration order (the dashboard order), rolls sorted within each event
+    assert [r[0] for r in rows[1:]] == ["24CS001", "24CS002", "24CS003"]
+    by_roll = {r[0]: r for r in rows[1:]}
+    # Formula-looking form answers are neutralised for Excel
+    assert by_roll["24CS001"][1] == "'=ALICE" and by_roll["24CS001"][8] == "https://example.com/a.png"
+    assert by_roll["24CS002"][9] == "no" and by_roll["24CS002"][6] == "member"
+
+    quiz = client.get("/admin/export.csv", params={"event": "technical-quiz", "blocked": "false"})
+    assert [r[0] for r in csv.reader(io.StringIO(quiz.content.decode("utf-8-sig")))][1:] == ["24CS001"]
+
+def test_csv_cells_never_start_a_formula():
+    rows = [("+1", "-2", "@SUM(A1)", "\tx", "24CS001", 3, None, "a=b")]
+    text = b"".join(export.csv_chunks([rows])).decode("utf-8-sig")
+    assert list(csv.reader(io.StringIO(text)))[1] == ["'+1", "'-2", "'@SUM(A1)", "'\tx", "24CS001", "3", "", "a=b"]
+
+def test_batches_stream_in_index_order(participants):
+    batches = list(database.iter_participants_export(batch_size=2))
+    assert [len(b) for b in batches] == [2, 1]
+
+def test_xlsx_export(participants):
+    response = client.get("/admin/export.xlsx", params={"event": "technical-quiz"})
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.content)) as book:
+        sheet = book.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    # constant_memory writes inline strings; names stay text, never formulas
+    assert "=ALICE" in sheet and "<f>" not in sheet
+    assert "24CS002" in sheet and "CODE ADAPT" not in sheet
+
+def test_requires_admin():
+    assert TestClient(app.app).get("/admin/export.csv").status_code == 401
+    assert TestClient(app.app).get("/admin/export.xlsx").status_code == 401
@@ -0,0 +1,47 @@
+"""
+Conditional GET checks for /verify
+Run: python -m pytest test_http_cache.py
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+from backend.database import save_participants_bulk, update_cert_url
+
+client = TestClient(app.app)
+
+@pytest.fixture
+def participants(temp_db):
+    save_participants_bulk([{
+        "roll_no": "24CS001", "name": "ALICE", "dept": "CSE", "year": "II", "event": "TECHNICAL QUIZ",
+        "sheet_source": "Quiz Sheet", "team_members": [],
+    }])
+
+def test_verify_etag_and_304(participants):
+    first = client.get("/verify", params={"roll_no": "24cs001"})
+    assert first.status_code == 200 and "TECHNICAL QUIZ" in first.text
+    etag = first.headers["etag"]
+
+    repeat = client.get("/verify", params={"roll_no": "24CS001"}, headers={"If-None-Match": etag})
+    assert repeat.status_code == 304 and repeat.content == b""
+
+    update_cert_url("24CS001", "TECHNICAL QUIZ", "https://example.com/c.png")
+    changed = client.get("/verify", params={"roll_no": "24CS001"}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+def test_post_form_redirects_to_get():
+    response = client.post("/verify", data={"roll_no": " 24cs001 "}, follow_redirects=False)
+    assert response.status_code == 303
+    assert response.headers["location"] == "/verify?roll_no=24CS001"
+
+def test_old_links_with_event_names_still_resolve(participants):
+    update_cert_url("24CS001", "TECHNICAL QUIZ", "https://example.com/c.png")
+    for event_id in ("technical-quiz", "TECHNICAL QUIZ"):
+        response = client.get("/generate_cert", params={"roll_no": "24cs001", "event_id": event_id}, follow_redirects=False)
+        assert response.headers["location"] == "https://example.com/c.png"
+    assert client.get("/generate_cert", params={"roll_no": "24CS001", "event_id": "UI/UX"}).status_code == 404
+
+def test_generated_files_are_not_served():
+    # Local certificates are only served content-addressed, from /c/<sha256>.png
+    assert client.get("/certificates/24CS001_TECHNICAL_QUIZ.png").status_code == 404
@@ -0,0 +1,124 @@
+"""
+Offline CSV/XLSX import checks
+Run: python -m pytest test_import.py
+"""
+
+import csv
+import io
+import threading
+
+import xlsxwriter
+
+from backend import database
+from backend.database import (
+    get_all_participants, get_stats, check_stats, save_participant_batches, save_participants_bulk, update_cert_url
+)
+from backend.importer import import_file
+
+HEADERS = ["Timestamp", "Name with Initial", "Roll No", "Department", "Year",
+           "Team Member 1 Name", "Team Member 1 Roll No"]
+
+def write_csv(directory, name, rows):
+    path = str(directory / name)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows([HEADERS] + rows)
+    return path
+
+def test_csv_import_in_small_batches(temp_db, tmp_path):
+    path = write_csv(tmp_path, "MARKUS Technical Quiz (Responses).csv", [
+        ["t", "alice", "24cs001", "CSE", "", "Bob", "24CS002"],
+        ["t", "nobody", "123", "CSE", "II", "", ""],
+        ["", "", "", "", "", "", ""],
+        ["t", "carol", "24CS003", "IT", "III", "Carol", "24CS003"],
+        ["t", "dave", "23CS004", "ECE", "", "", ""],
+    ])
+    rejects = io.StringIO()
+    stats = import_file(path, batch_size=2, rejects=csv.writer(rejects))
+
+    assert stats["event"] == "TECHNICAL QUIZ"
+    assert (stats["rows"], stats["leaders"], stats["members"]) == (5, 3, 1)
+    assert (stats["rejected"], stats["blank"], stats["skipped_members"]) == (1, 1, 1)
+    assert next(csv.reader(io.StringIO(rejects.getvalue())))[:4] == [
+        "MARKUS Technical Quiz (Responses)", "3", "invalid roll number", "t"]
+
+    people = {p["roll_no"]: p for p in get_all_participants()}
+    assert set(people) == {"24CS001", "24CS002", "24CS003", "23CS004"}
+    assert people["24CS001"]["name"] == "ALICE" and people["24CS001"]["year"] == "II"
+    assert people["24CS002"]["leader_roll_no"] == "24CS001"
+    assert get_stats()["total_records"] == 4 and check_stats() == []
+
+def test_xlsx_import(temp_db, tmp_path):
+    path = str(tmp_path / "MARKUS Project Presentation 2k26 (Responses).xlsx")
+    book = xlsxwriter.Workbook(path)
+    sheet = book.add_worksheet()
+    for row_no, row in enumerate([HEADERS,
+                                  ["t", "alice", "24cs001", "CSE", "2", "Bob", "24CS002"],
+                                  ["t", "=carl", "24IT003", "IT", 3, None, None]]):
+        for col, value in enumerate(row):
+            if value is not None:
+                sheet.write_string(row_no, col, value) if isinstance(value, str) else sheet.write_number(row_no, col, value)
+    book.close()
+
+    stats = import_file(path)
+    assert stats["event"] == "PROJECT PRESENTATION"
+    assert (stats["rows"], stats["leaders"], stats["members"], stats["rejected"]) == (2, 2, 1, 0)
+    people = {p["roll_no"]: p for p in get_all_participants()}
+    assert set(people) == {"24CS001", "24CS002", "24IT003"}
+    # Formula-looking text stays text; numeric cells come back as strings
+    assert people["24IT003"]["name"] == "=CARL" and people["24IT003"]["year"] == "3"
+    assert people["24CS002"]["leader_roll_no"] == "24CS001"
+
+def quiz_leader(roll, name):
+    return {"roll_no": roll, "name": name, "dept": "CSE", "year": "II", "event": "TECHNICAL QUIZ",
+            "sheet_source": "quiz", "team_members": []}
+
+def test_failed_file_keeps_earlier_batches(temp_db):
+    def batches():
+        yield [quiz_leader("24CS001", "ALICE")]
+        raise ValueError("bad row further down the file")
+    try:
+        save_participant_batches(batches())
+    except ValueError:
+        pass
+    assert [p["roll_no"] for p in get_all_participants()] == ["24CS001"]
+
+    # Importing the fixed file again finishes the job without duplicates
+    save_participant_batches(iter([[quiz_leader("24CS001", "ALICE")], [quiz_leader("24CS002", "BOB")]]))
+    assert get_stats()["total_records"] == 2 and check_stats() == []
+
+def test_other_writers_run_during_an_import(temp_db, monkeypatch):
+    monkeypatch.setattr(database, "BUSY_TIMEOUT_MS", 200)
+    save_participants_bulk([quiz_leader("24CS900", "ZED")])
+    outcome = []
+
+    def store_url():
+        try:
+            update_cert_url("24CS900", "TECHNICAL QUIZ", "https://example.com/zed.png")
+            outcome.append("stored")
+        except Exception as e:
+            outcome.append(e)
+        finally:
+            database.close_connection()
+
+    def batches():
+        for i in range(3):
+            yield [quiz_leader(f"24CS{i:03d}", f"P{i}")]
+            # Mid-import (the file is still being read): a certificate is stored meanwhile
+            writer = threading.Thread(target=store_url)
+            writer.start()
+            writer.join()
+
+    assert save_participant_batches(batches()) == 3
+    assert outcome == ["stored"] * 3
+    assert get_stats()["total_records"] == 4
+
+def test_rejects_unknown_layouts(temp_db, tmp_path):
+    path = write_csv(tmp_path, "x.csv", [])
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Timestamp,Email\nt,a@b.c\n")
+    for bad in (path, path[:-4] + ".txt"):
+        try:
+            import_file(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad} should not import")
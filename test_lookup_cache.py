@@ -0,0 +1,67 @@
+"""
+Roll-number lookup cache checks
+Run: python -m pytest test_lookup_cache.py
+"""
+
+import sqlite3
+
+import pytest
+
+from backend import database
+from backend.database import (
+    save_participants_bulk, get_all_participants, toggle_cert_visibility,
+    update_cert_url, get_data_version
+)
+from backend.lookup_cache import RollCache
+
+@pytest.fixture
+def participants(temp_db):
+    save_participants_bulk([{
+        "roll_no": "24CS001", "name": "ALICE", "dept": "CSE", "year": "II", "event": "TECHNICAL QUIZ",
+        "sheet_source": "Quiz Sheet", "team_members": [],
+    }])
+
+def test_hits_until_a_write_bumps_the_version(participants):
+    cache = RollCache(version_check_interval=60)
+
+    assert cache.get("24CS001")[0]["cert_url"] is None
+    cache.get("24CS001")
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Writes from this process are seen without waiting for the version check interval
+    version = get_data_version()
+    update_cert_url("24CS001", "TECHNICAL QUIZ", "https://example.com/c.png")
+    assert get_data_version() == version + 1
+    assert cache.get("24CS001")[0]["cert_url"] == "https://example.com/c.png"
+
+    toggle_cert_visibility(get_all_participants()[0]["id"], visible=False)
+    assert cache.get("24CS001")[0]["blocked"] == 1
+    assert cache.stats()["misses"] == 3
+
+def test_other_worker_writes_are_seen_after_version_check(participants):
+    cache = RollCache(version_check_interval=0)
+    cache.get("24CS001")
+
+    # Another worker process: its own connection, same SQLite version counter
+    conn = sqlite3.connect(database.DB_PATH)
+    with conn:
+        conn.execute("UPDATE participants SET blocked = 1")
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'data_version'")
+    conn.close()
+
+    assert cache.get("24CS001")[0]["blocked"] == 1
+    assert cache.misses == 2
+
+def test_lru_bound_and_copies():
+    calls = []
+    cache = RollCache(loader=lambda roll: calls.append(roll) or [{"roll_no": roll}], maxsize=2)
+    cache.data_version = lambda: 1
+
+    cache.get("A")[0]["roll_no"] = "mutated"
+    cache.get("B")
+    cache.get("A")
+    cache.get("C")  # evicts B, the least recently used
+    assert cache.get("A") == [{"roll_no": "A"}]
+    cache.get("B")
+    assert calls == ["A", "B", "C", "B"]
+    assert cache.stats()["size"] == 2
@@ -0,0 +1,90 @@
+"""
+Schema migration checks
+Run: python -m pytest test_migrations.py
+"""
+
+import contextlib
+import io
+import sqlite3
+
+from backend import database
+from backend.database import init_db, get_connection, get_events_for_roll, MIGRATIONS
+
+def quiet_init():
+    with contextlib.redirect_stdout(io.StringIO()):
+        init_db()
+
+def test_upgrades_unversioned_database(db_path):
+    # Pre-team-members schema with a duplicate row from the old insert-only sync
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE participants (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, roll_no TEXT NOT NULL, name TEXT,
+            department TEXT, year TEXT, event TEXT NOT NULL, sheet_source TEXT, cert_url TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX idx_roll_event ON participants(roll_no, event)")
+    conn.executemany("INSERT INTO participants (roll_no, name, event) VALUES (?, ?, ?)",
+                     [("24CS001", "ALICE", "QUIZ"), ("24CS001", "ALICE", "QUIZ")])
+    conn.commit()
+    conn.close()
+
+    quiet_init()
+
+    assert database.schema_version() == len(MIGRATIONS)
+    rows = get_events_for_roll("24CS001")
+    assert len(rows) == 1
+    assert rows[0]["blocked"] == 0 and rows[0]["member_role"] == "leader"
+    indexes = {r[0] for r in get_connection().execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert "idx_roll_event" not in indexes
+    assert {"idx_roll_lookup", "idx_leader_event_role", "ux_participant_identity"} <= indexes
+
+def test_legacy_event_names_share_one_event(temp_db):
+    # Rows written before the events table existed: raw sheet name and cleaned name
+    conn = get_connection()
+    with conn:
+        conn.execute("UPDATE participants SET event_id = NULL")
+        conn.executemany("INSERT INTO participants (roll_no, name, event) VALUES (?, ?, ?)",
+                         [("24CS001", "ALICE", "CHILL & SKILL (Responses)"), ("24CS002", "BOB", "MINDSPRINT")])
+        conn.execute(f"PRAGMA user_version = {MIGRATIONS.index(database._migrate_events)}")
+    quiet_init()
+
+    [first], [second] = get_events_for_roll("24CS001"), get_events_for_roll("24CS002")
+    assert first["event_slug"] == "mindsprint" and first["event_id"] == second["event_id"]
+    assert first["display_name"] == first["cert_label"] == "MINDSPRINT"
+    # The rebuilt search index holds the canonical name, not the sheet name
+    assert {p["roll_no"] for p in database.search_participants("mindsprint")} == {"24CS001", "24CS002"}
+
+def test_warm_start_does_not_write(temp_db):
+    conn = get_connection()
+    before = conn.total_changes
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        init_db()
+
+    assert conn.total_changes == before
+    assert not conn.in_transaction
+    assert output.getvalue() == ""
+
+def test_lookup_uses_covering_index(temp_db):
+    plan = get_connection().execute(
+        f"EXPLAIN QUERY PLAN SELECT {', '.join(database.LOOKUP_COLUMNS)} FROM participants WHERE roll_no = ?",
+        ("24CS001",)
+    ).fetchall()
+    assert "COVERING INDEX idx_roll_lookup" in plan[0][3]
+
+def test_batch_team_rows_drive_from_the_batch(temp_db):
+    # The batch table is tiny but unanalyzed; participants must be searched per key, never scanned
+    cursor = get_connection().cursor()
+    database._load_batch(cursor, [("24CS001", "QUIZ")])
+    plan = [row[3] for row in cursor.execute(f"EXPLAIN QUERY PLAN {database._BATCH_TEAM_ROWS}")]
+    assert not any(step.startswith("SCAN p") for step in plan), plan
+
+def test_visibility_selectors_use_nocase_indexes(temp_db):
+    cursor = get_connection().cursor()
+    for column, index in (("department", "idx_department_nocase"), ("year", "idx_year_nocase")):
+        clauses, params = database._participant_filters(**{column: "cse"})
+        plan = [row[3] for row in cursor.execute(
+            f"EXPLAIN QUERY PLAN UPDATE participants AS p SET blocked = 1 WHERE {clauses[0]}", params)]
+        assert any(index in step for step in plan), plan
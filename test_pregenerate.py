@@ -0,0 +1,47 @@
+"""
+Bulk pre-generation checks (real render/upload pools, local store)
+Run: python -m pytest test_pregenerate.py
+"""
+
+import contextlib
+import io
+
+from backend import cert_store
+from backend.database import save_participants_bulk, get_all_participants, check_stats
+from backend.pregenerate import pregenerate
+
+def leader(roll, name):
+    return {"roll_no": roll, "name": name, "dept": "CSE", "year": "II", "event": "TECHNICAL QUIZ",
+            "sheet_source": "Quiz Sheet", "team_members": []}
+
+def run(**kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return pregenerate(render_workers=1, upload_workers=1, batch_size=2, **kwargs)
+
+def test_batches_store_urls_and_count_failures(temp_db, local_store, monkeypatch):
+    monkeypatch.setattr(cert_store, "CERT_STORE", "local")
+    save_participants_bulk([leader("24CS001", "ALICE"), leader("24CS002", "BOB"), leader("24CS003", "CAROL")])
+    put = local_store.put
+    calls = []
+
+    def flaky_put(source):
+        calls.append(source)
+        if len(calls) == 1:
+            raise ConnectionError("disk full")
+        return put(source)
+
+    monkeypatch.setattr(local_store, "put", flaky_put)
+    result = run()
+    assert (result["pending"], result["generated"], result["failed"]) == (3, 2, 1)
+
+    urls = [p["cert_url"] for p in get_all_participants()]
+    assert urls.count(None) == 1
+    for url in filter(None, urls):
+        with open(local_store.path_for(local_store.digest_from_url(url)), "rb") as f:
+            assert f.read().startswith(b"\x89PNG")
+
+    # The next run picks up only the failed one
+    result = run()
+    assert (result["pending"], result["generated"], result["failed"]) == (1, 1, 0)
+    assert all(p["cert_url"] for p in get_all_participants()) and check_stats() == []
+    assert run()["pending"] == 0
@@ -0,0 +1,81 @@
+"""
+Header layout detection checks
+Run: python test_sheet_layout.py
+"""
+
+import os
+import re
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.sheet_layout import resolve_layout
+
+def legacy_find_column(headers, keywords):
+    for idx, h in enumerate(headers):
+        h_lower = h.lower()
+        for k in keywords:
+            if k in h_lower:
+                return idx
+    return -1
+
+def legacy_member_columns(headers):
+    """The O(headers^2) member pairing sync_data used before resolve_layout"""
+    team_member_cols = []
+    for idx, h in enumerate(headers):
+        h_lower = h.lower()
+        match = re.search(r'(?:team\s*)?member\s*(\d+)', h_lower)
+        if match:
+            member_num = match.group(1)
+            if 'name' in h_lower:
+                roll_idx = -1
+                for idx2, h2 in enumerate(headers):
+                    h2_lower = h2.lower()
+                    if f'member {member_num}' in h2_lower.replace('  ', ' ') and ('roll' in h2_lower or 'reg' in h2_lower):
+                        roll_idx = idx2
+                        break
+                    if re.search(rf'(?:team\s*)?member\s*{member_num}', h2_lower) and ('roll' in h2_lower or 'reg' in h2_lower):
+                        roll_idx = idx2
+                        break
+                team_member_cols.append((idx, roll_idx, member_num))
+    team_member_cols.sort(key=lambda x: int(x[2]))
+    return team_member_cols
+
+HEADER_ROWS = [
+    ["Timestamp", "Name with initial", "Roll No", "Department", "Year",
+     "Team Member 1 Name", "Team Member 1 Roll No", "Team Member 2 Name", "Team Member 2 Roll No"],
+    ["Timestamp", "Email", "Leader Name", "Leader Roll", "Branch", "Batch",
+     "Member  2 name", "member 2 reg no", "Member 1 Name", "Member 1 Registration"],
+    ["Timestamp", "Student Name", "Registration Number", "Dept", "Yr", "Team Member 3 Name"],
+    ["Timestamp", "Full Name", "Email"],
+]
+
+def test_matches_legacy_detection():
+    for headers in HEADER_ROWS:
+        layout = resolve_layout(headers)
+        assert layout.name == legacy_find_column(headers, ["name with initial", "name", "student name", "full name", "leader name"])
+        assert layout.roll == legacy_find_column(headers, ["roll no", "roll", "reg", "registration", "leader roll"])
+        assert layout.dept == legacy_find_column(headers, ["department", "dept", "branch"])
+        assert layout.year == legacy_find_column(headers, ["year", "yr", "batch"])
+        assert list(layout.members) == legacy_member_columns(headers)
+
+def test_reports_problems_and_memoizes():
+    headers = ["Timestamp", "Name", "Roll No", "Student Name", "Team Member 1 Name", "T-shirt size"]
+    layout = resolve_layout(headers)
+    assert layout.members == ((4, -1, "1"),)
+    assert any(p.startswith("member 1") for p in layout.ambiguous)
+    assert any(p.startswith("name:") for p in layout.ambiguous)
+    assert layout.unmatched == ("Timestamp", "Student Name", "T-shirt size")
+    assert resolve_layout(list(headers)) is layout
+
+def test_member_numbers_match_exactly():
+    # The old substring check paired "member 1" with the "member 10" roll column
+    headers = ["Roll No", "Member 10 Roll No", "Member 1 Name", "Member 1 Roll No", "Member 10 Name"]
+    assert resolve_layout(headers).members == ((2, 3, "1"), (4, 1, "10"))
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,105 @@
+"""
+Regression check: backend.sheet_parser vs the original sync_data row loop
+Run: python test_sheet_parser.py
+"""
+
+import os
+import random
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backend.sheet_parser import parse_rows
+
+HEADERS = ["Timestamp", "Name", "Roll No", "Department", "Year",
+           "Team Member 1 Name", "Team Member 1 Roll No",
+           "Team Member 2 Name", "Team Member 2 Roll No",
+           "Team Member 3 Name"]  # member 3 has no roll column
+COLUMNS = dict(idx_name=1, idx_roll=2, idx_dept=3, idx_year=4,
+               team_member_cols=[(5, 6, "1"), (7, 8, "2"), (9, -1, "3")])
+
+def legacy_parse_rows(data_rows, idx_name, idx_roll, idx_dept, idx_year, team_member_cols, event_name, sheet_name):
+    """The row loop sync_data used before parsing moved to backend.sheet_parser (reference implementation)"""
+    leaders = []
+    for row in data_rows:
+        leader_roll = row[idx_roll].strip().upper() if idx_roll != -1 and idx_roll < len(row) else ""
+        if not leader_roll or len(leader_roll) < 5: continue
+
+        leader_name = row[idx_name].strip().upper() if idx_name != -1 and idx_name < len(row) else ""
+        dept = row[idx_dept].strip() if idx_dept != -1 and idx_dept < len(row) else ""
+        year = row[idx_year].strip() if idx_year != -1 and idx_year < len(row) else ""
+
+        if not year:
+            if leader_roll.startswith("25"): year = "I"
+            elif leader_roll.startswith("24"): year = "II"
+            elif leader_roll.startswith("23"): year = "III"
+            elif leader_roll.startswith("22"): year = "IV"
+
+        team_members_data = []
+        processed_rolls = {leader_roll}
+        for name_idx, roll_idx, member_num in team_member_cols:
+            member_name = row[name_idx].strip() if name_idx < len(row) else ""
+            member_roll = ""
+            if roll_idx != -1 and roll_idx < len(row):
+                member_roll = row[roll_idx].strip().upper()
+            if not member_name or not member_roll:
+                continue
+            if len(member_roll) < 5:
+                continue
+            if member_roll in processed_rolls:
+                continue
+            processed_rolls.add(member_roll)
+            team_members_data.append({"name": member_name, "roll_no": member_roll})
+
+        leaders.append({
+            "roll_no": leader_roll, "name": leader_name, "dept": dept, "year": year,
+            "event": event_name, "sheet_source": sheet_name, "team_members": team_members_data,
+        })
+    return leaders
+
+def random_roll(rng):
+    return rng.choice(["", "  ", "23", "abc1", f"{rng.choice(['22', '23', '24', '25', '21'])}cs{rng.randint(0, 40):03d}"])
+
+def random_row(rng):
+    row = [
+        "ts",
+        rng.choice(["", " alice ", "Bob", "carl d"]),
+        random_roll(rng),
+        rng.choice(["", "CSE ", " IT"]),
+        rng.choice(["", "", "1", " III "]),
+    ]
+    for _ in range(2):
+        row += [rng.choice(["", " Dan ", "Eve"]), random_roll(rng)]
+    row.append(rng.choice(["", "Frank"]))
+    # Google Sheets drops trailing empty cells, so rows are often short
+    return row[:rng.randint(2, len(row))]
+
+def synthetic_rows(n, seed=7):
+    rng = random.Random(seed)
+    return [random_row(rng) for _ in range(n)]
+
+def test_parse_rows_matches_legacy():
+    rows = synthetic_rows(5000)
+    expected = legacy_parse_rows(rows, event_name="QUIZ", sheet_name="Quiz", **COLUMNS)
+    actual, _ = parse_rows(rows, event_name="QUIZ", sheet_name="Quiz", **COLUMNS)
+    assert actual == expected
+
+def test_edge_cases():
+    rows = [
+        ["t", "x", "24cs001", "", "", "Dup", "24CS001", "Ok", "24cs002"],  # member repeats leader roll
+        ["t", "y", "23cs003", "ME", "", "A", "23cs004", "B", "23CS004"],   # member repeated in team
+        ["t", "z"],                                                        # no roll at all
+    ]
+    actual, skipped = parse_rows(rows, event_name="E", sheet_name="S", **COLUMNS)
+    assert actual == legacy_parse_rows(rows, event_name="E", sheet_name="S", **COLUMNS)
+    assert [m["roll_no"] for m in actual[0]["team_members"]] == ["24CS002"]
+    assert [m["roll_no"] for m in actual[1]["team_members"]] == ["23CS004"]
+    assert skipped == 2
+    assert parse_rows([], event_name="E", sheet_name="S", **COLUMNS) == ([], 0)
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"✅ {name}")
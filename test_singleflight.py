@@ -0,0 +1,67 @@
+"""
+Single-flight certificate generation checks (in-process sharing, cross-worker claims)
+Run: python -m pytest test_singleflight.py
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend import singleflight
+from backend.database import save_participants_bulk, claim_certificate, update_cert_url, get_connection
+from backend.singleflight import generate_once
+
+URL = "https://example.com/24CS001.png"
+
+@pytest.fixture
+def participant(temp_db, monkeypatch):
+    monkeypatch.setattr(singleflight, "CLAIM_POLL_INTERVAL", 0.01)
+    save_participants_bulk([{"roll_no": "24CS001", "name": "ALICE", "dept": "CSE", "year": "II",
+                             "event": "QUIZ", "sheet_source": "s", "team_members": []}])
+
+def counting_produce(calls):
+    async def produce():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return URL
+    return produce
+
+def claims():
+    return get_connection().execute("SELECT roll_no, event, owner FROM cert_claims").fetchall()
+
+def test_concurrent_requests_share_one_render(participant):
+    calls = []
+
+    async def main():
+        return await asyncio.gather(*(generate_once("24CS001", "QUIZ", counting_produce(calls)) for _ in range(20)))
+
+    assert asyncio.run(main()) == [URL] * 20
+    assert len(calls) == 1
+    assert claims() == []
+
+def test_waits_for_the_worker_holding_the_claim(participant):
+    assert claim_certificate("24CS001", "QUIZ", "other-worker")
+    calls = []
+
+    async def main():
+        waiter = asyncio.ensure_future(generate_once("24CS001", "QUIZ", counting_produce(calls)))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        # The other worker finishes and stores the URL
+        await asyncio.to_thread(update_cert_url, "24CS001", "QUIZ", "https://example.com/other.png")
+        return await waiter
+
+    assert asyncio.run(main()) == "https://example.com/other.png"
+    assert calls == []
+
+def test_stale_claim_is_taken_over(participant):
+    assert claim_certificate("24CS001", "QUIZ", "crashed-worker")
+    conn = get_connection()
+    with conn:
+        conn.execute("UPDATE cert_claims SET claimed_at = ?", (time.time() - 3600,))
+    calls = []
+
+    assert asyncio.run(generate_once("24CS001", "QUIZ", counting_produce(calls))) == URL
+    assert len(calls) == 1
+    assert claims() == []
@@ -0,0 +1,65 @@
+"""
+Maintained admin stats checks
+Run: python -m pytest test_stats.py
+"""
+
+from backend.database import (
+    save_participants_bulk, apply_sheet_sync, update_cert_url, update_cert_urls,
+    toggle_cert_visibility, bulk_toggle_cert_visibility, get_stats, get_event_stats, check_stats,
+    get_all_participants, get_connection, get_event_counts
+)
+from backend import database
+
+def team(roll, members, event="QUIZ"):
+    return {
+        "roll_no": roll, "name": "LEADER", "dept": "CSE", "year": "II", "event": event,
+        "sheet_source": "Sheet", "team_members": [{"name": r, "roll_no": r} for r in members],
+    }
+
+def test_counters_follow_every_write_path(temp_db):
+    save_participants_bulk([team("24CS001", ["24CS101", "24CS102"]), team("24CS002", []),
+                            team("24CS001", ["24CS102"], event="CODE")])
+    assert get_stats() == {"total_records": 6, "unique_students": 4, "events": 2, "certs_generated": 0}
+
+    # Member swapped out, certificate stored, one row hidden, a leader removed
+    save_participants_bulk([team("24CS001", ["24CS102", "24CS103"])])
+    update_cert_url("24CS001", "QUIZ", "https://example.com/a.png")
+    ids = {(p["roll_no"], p["event"]): p["id"] for p in get_all_participants()}
+    update_cert_urls([(ids[("24CS102", "CODE")], "https://example.com/b.png")])
+    toggle_cert_visibility(ids[("24CS002", "QUIZ")], visible=False)
+    apply_sheet_sync("Code Sheet", "CODE", "fp", [], ["24CS001"], {})
+
+    assert get_stats() == {"total_records": 4, "unique_students": 4, "events": 1, "certs_generated": 1}
+    assert get_event_stats() == [{"event": "QUIZ", "total": 4, "generated": 1, "blocked": 1}]
+    assert check_stats() == []
+
+    bulk_toggle_cert_visibility(False)
+    assert get_event_stats()[0]["blocked"] == 4
+    assert check_stats() == []
+
+def test_dashboard_event_counts_come_from_counters(temp_db):
+    save_participants_bulk([team("24CS001", ["24CS101"], event="CHILL & SKILL (Responses)"),
+                            team("24CS002", [], event="MINDSPRINT"), team("24CS003", [], event="CODE")])
+    update_cert_url("24CS002", "MINDSPRINT", "https://example.com/a.png")
+    toggle_cert_visibility(get_all_participants()[0]["id"], visible=False)
+
+    # Legacy and cleaned names of one event are reported together, as the GROUP BY does
+    counts = get_event_counts()
+    assert counts == database._group_event_counts([], ())
+    assert [(e["slug"], e["total"], e["with_cert"], e["blocked"]) for e in counts] == [
+        ("mindsprint", 3, 1, 1), ("code", 1, 0, 0)]
+    assert get_event_counts(has_cert=True) == [
+        {"slug": "mindsprint", "display_name": "MINDSPRINT", "total": 1, "blocked": 0, "with_cert": 1}]
+
+def test_check_reports_and_fixes_drift(temp_db):
+    save_participants_bulk([team("24CS001", ["24CS101"])])
+    # A write behind the module's back
+    conn = get_connection()
+    with conn:
+        conn.execute("INSERT INTO participants (roll_no, name, event) VALUES ('24CS999', 'X', 'QUIZ')")
+
+    drift = check_stats()
+    assert any("total" in line for line in drift) and any("roll_counts" in line for line in drift)
+    check_stats(fix=True)
+    assert check_stats() == []
+    assert get_stats()["unique_students"] == 3
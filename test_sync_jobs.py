@@ -0,0 +1,76 @@
+"""
+Sync job manager checks (single-instance lock, coalescing, run history)
+Run: python -m pytest test_sync_jobs.py
+"""
+
+import contextlib
+import csv
+import io
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+from backend.database import acquire_sync_lock, finish_sync_run, get_sync_runs, get_sync_lock, get_connection
+from backend.sheet_source import LocalSheetSource
+from backend.sync import SHEETS
+from backend.sync_jobs import run_sync, sync_status
+
+HEADERS = ["Timestamp", "Name with initial", "Roll No", "Department", "Year"]
+
+@pytest.fixture
+def source(temp_db, tmp_path):
+    """One quiz registration in the exports of every mapped sheet"""
+    for sheet_name in SHEETS:
+        rows = [["t", "alice", "24cs001", "CSE", "II"]] if "Quiz" in sheet_name else []
+        path = os.path.join(tmp_path, LocalSheetSource.filename_for(sheet_name) + ".csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows([HEADERS] + rows)
+    return LocalSheetSource(str(tmp_path))
+
+def test_run_records_per_sheet_progress(source):
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_id = run_sync("manual", source=source)
+
+    run = get_sync_runs()[0]
+    assert run["id"] == run_id and run["status"] == "success" and run["finished_at"]
+    assert [s["sheet"] for s in run["sheets"]] == SHEETS
+    quiz = next(s for s in run["sheets"] if "Quiz" in s["sheet"])
+    assert (quiz["status"], quiz["rows"], quiz["inserted"]) == ("applied", 2, 1)
+    assert run["summary"]["inserted"] == 1
+    assert get_sync_lock() is None
+
+def test_triggers_while_running_are_coalesced(source):
+    # Another worker holds the lock
+    other = acquire_sync_lock("other-worker", "manual")
+    assert other is not None
+    assert run_sync("manual", source=source) is None
+    assert run_sync("scheduled", source=source) is None
+    assert get_sync_lock()["pending"] == 1
+    assert sync_status()["running"] and sync_status()["pending"]
+
+    # Its owner picks up exactly one follow-up run, then the lock is free
+    follow_up = finish_sync_run(other, "other-worker", "success", summary={})
+    assert follow_up is not None and get_sync_lock()["pending"] == 0
+    assert finish_sync_run(follow_up, "other-worker", "success", summary={}) is None
+    assert [r["trigger"] for r in get_sync_runs()] == ["coalesced", "manual"]
+    assert get_sync_lock() is None
+
+def test_stale_lock_is_taken_over(source):
+    stale = acquire_sync_lock("crashed-worker", "manual")
+    conn = get_connection()
+    with conn:
+        conn.execute("UPDATE job_locks SET heartbeat_at = ?", (time.time() - 3600,))
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert run_sync("manual", source=source) is not None
+    statuses = {r["id"]: r["status"] for r in get_sync_runs()}
+    assert statuses[stale] == "abandoned"
+
+def test_status_endpoint(temp_db):
+    assert TestClient(app.app).get("/admin/sync/status").status_code == 401
+    admin = TestClient(app.app)
+    admin.cookies.set("admin_session", "authenticated")
+    status = admin.get("/admin/sync/status").json()
+    assert status["running"] is False and status["sheets_total"] == len(SHEETS)
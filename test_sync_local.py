@@ -0,0 +1,128 @@
+"""
+Offline sync checks using LocalSheetSource (CSV exports in a temp directory)
+Run: python -m pytest test_sync_local.py
+"""
+
+import contextlib
+import csv
+import io
+import os
+
+from backend import database
+from backend.database import get_all_participants, get_events_for_roll, search_participants
+from backend.sheet_source import LocalSheetSource, fetch_sheets
+from backend.sync import SHEETS, sync_data
+
+HEADERS = ["Timestamp", "Name with initial", "Roll No", "Department", "Year",
+           "Team Member 1 Name", "Team Member 1 Roll No"]
+
+def write_sheet(directory, sheet_name, rows, headers=HEADERS):
+    path = os.path.join(directory, LocalSheetSource.filename_for(sheet_name) + ".csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows([headers] + rows)
+
+def setup(tmpdir, rows_for_quiz):
+    for sheet_name in SHEETS:
+        write_sheet(tmpdir, sheet_name, [])
+    write_sheet(tmpdir, "MARKUS Technical Quiz (Responses)", rows_for_quiz)
+    return tmpdir
+
+def quiet_sync(tmpdir, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return sync_data(source=LocalSheetSource(tmpdir), **kwargs)
+
+def test_local_sync_and_incremental_changes(temp_db, tmp_path):
+    tmpdir = setup(tmp_path, [
+        ["t", "alice", "23cs001", "CSE", "3", "Bob", "23cs002"],
+        ["t", "carl", "24it003", "IT", "", "", ""],
+    ])
+
+    summary = quiet_sync(tmpdir)
+    assert summary["inserted"] == 2
+    rows = {(p["roll_no"], p["member_role"]): p for p in get_all_participants()}
+    assert rows[("23CS001", "leader")]["name"] == "ALICE"
+    assert rows[("23CS002", "member")]["leader_roll_no"] == "23CS001"
+    assert rows[("24IT003", "leader")]["year"] == "II"  # year fallback from roll prefix
+
+    # Nothing changed: every sheet is skipped
+    summary = quiet_sync(tmpdir)
+    assert summary["sheets_skipped"] == len(SHEETS)
+    assert summary["inserted"] == summary["updated"] == summary["deleted"] == 0
+
+    # One row edited, one row removed
+    write_sheet(tmpdir, "MARKUS Technical Quiz (Responses)", [
+        ["t", "alice b", "23cs001", "CSE", "3", "Dan", "23cs009"],
+    ])
+    summary = quiet_sync(tmpdir)
+    assert (summary["inserted"], summary["updated"], summary["deleted"]) == (0, 1, 1)
+    rolls = sorted((p["roll_no"], p["member_role"]) for p in get_all_participants())
+    assert rolls == [("23CS001", "leader"), ("23CS009", "member")]
+
+def test_sync_registers_events_and_slug_lookup(temp_db, tmp_path):
+    tmpdir = setup(tmp_path, [["t", "alice", "23cs001", "CSE", "3", "Bob", "23cs002"]])
+    quiet_sync(tmpdir)
+
+    [record] = get_events_for_roll("23CS002")
+    assert record["event_slug"] == "technical-quiz"
+    assert record["event"] == "TECHNICAL QUIZ" and record["member_role"] == "member"
+    assert record["display_name"] == record["cert_label"] == "TECHNICAL QUIZ"
+    # Every mapped event exists even before anyone registered for it
+    slugs = {row[0] for row in database.get_connection().execute("SELECT slug FROM events")}
+    assert {"mindsprint", "ui-ux", "code-adapt", "technical-quiz"} <= slugs
+
+def test_search_index_follows_sync(temp_db, tmp_path):
+    tmpdir = setup(tmp_path, [
+        ["t", "alice", "23cs001", "CSE", "3", "Bob", "23cs002"],
+        ["t", "carl", "24it003", "IT", "", "", ""],
+    ])
+    quiet_sync(tmpdir)
+    assert [p["roll_no"] for p in search_participants("bob")] == ["23CS002"]
+    assert {p["roll_no"] for p in search_participants("23cs")} == {"23CS001", "23CS002"}
+
+    # Rename, member swap and a removed leader all reach the index
+    write_sheet(tmpdir, "MARKUS Technical Quiz (Responses)", [
+        ["t", "alicia", "23cs001", "CSE", "3", "Dan", "23cs009"],
+    ])
+    quiet_sync(tmpdir)
+    assert search_participants("alice") == search_participants("bob") == search_participants("carl") == []
+    assert [p["roll_no"] for p in search_participants("alic")] == ["23CS001"]
+    assert [p["roll_no"] for p in search_participants("dan quiz")] == ["23CS009"]
+    # External-content check: index matches participants exactly
+    database.get_connection().execute("INSERT INTO participants_fts (participants_fts, rank) VALUES ('integrity-check', 1)")
+
+def test_search_finds_legacy_sheet_names_by_event(temp_db):
+    legacy = {"roll_no": "23CS001", "name": "ALICE", "dept": "CSE", "year": "III",
+              "event": "CHILL & SKILL (Responses)", "sheet_source": "CHILL & SKILL (Responses)", "team_members": []}
+    database.save_participants_bulk([legacy])
+    assert [p["roll_no"] for p in search_participants("mindsprint")] == ["23CS001"]
+
+    # Re-saving replaces the indexed row (the delete must match the canonical name)
+    database.save_participants_bulk([dict(legacy, name="ALICIA")])
+    assert [p["name"] for p in search_participants("mind ali")] == ["ALICIA"]
+    database.get_connection().execute("INSERT INTO participants_fts (participants_fts, rank) VALUES ('integrity-check', 1)")
+
+def test_sheet_without_rolls_never_deletes(temp_db, tmp_path):
+    quiz = "MARKUS Technical Quiz (Responses)"
+    tmpdir = setup(tmp_path, [["t", "alice", "23cs001", "CSE", "3", "Bob", "23cs002"]])
+    quiet_sync(tmpdir)
+    before = get_all_participants()
+
+    # Roll header renamed: the layout has no roll column
+    renamed = ["Timestamp", "Name with initial", "Student ID", "Department", "Year"]
+    write_sheet(tmpdir, quiz, [["t", "alice", "23cs001", "CSE", "3"]], headers=renamed)
+    summary = quiet_sync(tmpdir)
+    assert summary["sheets_failed"] == 1 and summary["deleted"] == 0
+    assert get_all_participants() == before
+
+    # Rows present but none valid: refused too, unless it is an explicit full resync
+    write_sheet(tmpdir, quiz, [["t", "alice", "1", "CSE", "3", "", ""]])
+    assert quiet_sync(tmpdir)["sheets_failed"] == 1
+    assert get_all_participants() == before
+    assert quiet_sync(tmpdir, full=True)["deleted"] == 1
+    assert get_all_participants() == []
+
+def test_missing_export_is_reported_not_retried(tmp_path):
+    results = list(fetch_sheets(LocalSheetSource(str(tmp_path)), ["Nope (Responses)"], retries=3, backoff=10))
+    name, rows, error, _ = results[0]
+    assert name == "Nope (Responses)" and rows is None
+    assert isinstance(error, FileNotFoundError)
@@ -0,0 +1,67 @@
+"""
+Periodic sync scheduler checks
+Run: python -m pytest test_sync_scheduler.py
+"""
+
+import asyncio
+import contextlib
+import io
+
+import pytest
+
+from backend import sync_scheduler
+from backend.database import acquire_sync_lock, get_sync_lock
+from backend.sync_jobs import run_scheduled_sync
+from backend.sync_scheduler import next_delay, sync_loop
+
+def test_backoff_and_jitter():
+    no_jitter = lambda: 0.5
+    assert next_delay(60, 0, rand=no_jitter) == 60
+    assert next_delay(60, 3, rand=no_jitter) == 480
+    assert next_delay(60, 20, max_backoff=3600, rand=no_jitter) == 3600
+    assert next_delay(60, 0, jitter=0.1, rand=lambda: 0.0) == 54
+    assert next_delay(60, 0, jitter=0.1, rand=lambda: 1.0) == 66
+
+def test_tick_is_skipped_while_a_sync_runs(temp_db):
+    acquire_sync_lock("other-worker", "manual")
+    assert run_scheduled_sync() is None
+    # Skipped, not queued behind the running sync
+    assert get_sync_lock()["pending"] == 0
+
+def test_loop_keeps_running_after_failures():
+    calls = []
+    results = iter(["errors", None, "failed", "success"])
+
+    def fake_run():
+        calls.append(len(calls))
+        return next(results, "success")
+
+    async def main():
+        task = asyncio.get_running_loop().create_task(sync_loop(interval=0.001, initial_delay=0, run=fake_run))
+        while len(calls) < 5:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(main())
+    assert len(calls) >= 5
+
+def test_backoff_grows_to_the_cap_and_resets(monkeypatch):
+    # No jitter, 4s cap; sleeps are recorded instead of waited out
+    monkeypatch.setattr(sync_scheduler, "next_delay",
+                        lambda interval, failures: next_delay(interval, failures, jitter=0, max_backoff=4))
+    results = iter(["errors", None, "failed", "failed", "failed", "success", "failed"])
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+        if len(delays) == 8:
+            raise asyncio.CancelledError
+
+    monkeypatch.setattr(sync_scheduler.asyncio, "sleep", fake_sleep)
+    with contextlib.redirect_stdout(io.StringIO()), pytest.raises(asyncio.CancelledError):
+        asyncio.run(sync_loop(interval=1, initial_delay=0, run=lambda: next(results)))
+    # A skipped tick (None) neither counts as a failure nor resets the streak
+    assert delays == [0, 2, 2, 4, 4, 4, 1, 2]